@@ -0,0 +1,188 @@
+'''Merenje vremena i vršne memorije glavnih metoda ocenjivanja na populacijama različite veličine.
+
+Mere se Bootstrapping.fit, interval i intervalBCa, PSU.minimalni_interval, ONK.fit, fitsig, vestacke i ridge,
+SSU.__init__ i ocene SSU (stratifikovana, količnička i regresiona), za svaku kombinaciju
+parametara (k, n) i za svaku populaciju: očišćeni TU.dta i sintetičke populacije od 10^5 i 10^6
+jedinica (klase.sinteza, prave se jednom i čuvaju u folderu .kes).
+
+Za svaki slučaj priprema (npr. pravljenje objekta) se ne meri, a zajednička memorija ONK.MODELI se
+prazni pre svake pripreme, pa se ne meri čitanje ocena zapamćenih pri zagrevanju; merenje se
+ponavlja dok ukupno vreme ne pređe --minVreme (najviše --ponavljanja puta) i prijavljuje se medijana. Vršna memorija
+se meri jednim dodatnim izvršavanjem pod tracemalloc (memorija koju zauzme merena metoda, u MB).
+Rezultati se porede sa sačuvanom osnovom (benchmark/osnova.json); slučaj je sporiji ako je odnos
+vremena veći od --prag, i tada program vraća izlazni kod 1.
+
+Pokretanje iz korena repozitorijuma:
+    python benchmark/ocenjivanje.py                   # poređenje sa osnovom
+    python benchmark/ocenjivanje.py --sacuvaj         # merenje i čuvanje nove osnove
+    python benchmark/ocenjivanje.py --velicine TU 100000 --slucajevi ONK.fit SSU.__init__'''
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import NamedTuple, Callable
+import numpy as np
+import pandas as pd
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+from klase.Bootstrapping import Bootstrapping
+from klase.ONK import ONK, MODELI
+from klase.Sampling import PSU, SSU
+from klase.priprema import Priprema
+from klase.sinteza import sintetickaPopulacija
+from klase.ucitavanje import KES, ucitaj
+
+OSNOVA = os.path.join(KOREN, 'benchmark', 'osnova.json')
+VELICINE = ['TU', 100_000, 1_000_000]
+REGRESORI = ['starost', 'satiRada', 'obrazovanje', 'region', 'urban', 'zene']
+KATEGORIJE = ['region', 'urban', 'zene']
+STRATUMI = ['region', 'zene']
+
+
+class Slucaj(NamedTuple):
+    '''Merena metoda: priprema (df, **parametri) -> objekat se ne meri, merenje (objekat, df, **parametri) se meri.'''
+    naziv: str
+    priprema: Callable
+    merenje: Callable
+    parametri: dict = {}
+
+
+def _bootstrap(df, k, n):
+    bs = Bootstrapping(df, n=n)
+    bs.fit(k)
+    return bs
+
+
+def _onk(df):
+    model = ONK()
+    model.fit(df[REGRESORI], df['plata'], kategorije=KATEGORIJE)
+    return model
+
+
+def _ssu(df, n):
+    return SSU(df, df['obrazovanje'], df['plata'], n, STRATUMI)
+
+
+SLUCAJEVI = [
+    Slucaj('Bootstrapping.fit', lambda df, k, n: Bootstrapping(df, n=n), lambda bs, df, k, n: bs.fit(k),
+           {'k': [100, 1000], 'n': [100, 1000]}),
+    Slucaj('Bootstrapping.interval', _bootstrap, lambda bs, df, k, n: bs.interval(), {'k': [1000, 10000], 'n': [100]}),
+    Slucaj('Bootstrapping.intervalBCa', _bootstrap, lambda bs, df, k, n: bs.intervalBCa(), {'k': [1000, 10000], 'n': [100]}),
+    Slucaj('PSU.minimalni_interval', lambda df, k, n: PSU(df, df['obrazovanje'], df['plata'], n),
+           lambda psu, df, k, n: psu.minimalni_interval(k), {'k': [300, 3000], 'n': [100, 1000]}),
+    Slucaj('ONK.fit', lambda df: ONK(), lambda model, df: model.fit(df[REGRESORI], df['plata'], kategorije=KATEGORIJE)),
+    Slucaj('ONK.fitsig', _onk, lambda model, df: model.fitsig(prikaz=False)),
+    Slucaj('ONK.vestacke', lambda df: ONK(), lambda model, df: model.vestacke(KATEGORIJE + ['obr3'], df)),
+    Slucaj('ONK.ridge', lambda df: None, lambda _, df: ONK.ridge(df[REGRESORI], df['plata'], kategorije=KATEGORIJE)),
+    Slucaj('SSU.__init__', lambda df, n: None, lambda _, df, n: _ssu(df, n), {'n': [100, 1000]}),
+    Slucaj('SSU.stratifikovanaOcena', _ssu, lambda ssu, df, n: ssu.stratifikovanaOcena(), {'n': [100, 1000]}),
+    Slucaj('SSU.kolicnickaOcena', _ssu, lambda ssu, df, n: ssu.kolicnickaOcena(), {'n': [100, 1000]}),
+    Slucaj('SSU.regresionaOcena', _ssu, lambda ssu, df, n: ssu.regresionaOcena(), {'n': [100, 1000]}),
+]
+
+
+def populacija(velicina):
+    '''Očišćeni TU.dta ('TU') ili sintetička populacija date veličine, kao DataFrame.'''
+    if velicina == 'TU':
+        return Priprema().primeni(ucitaj())
+    folder = os.path.join(KES, f'sinteza-{velicina}')
+    if os.path.isfile(os.path.join(folder, 'meta.json')):
+        from klase.Populacija import Populacija
+        pop = Populacija(folder)
+    else:
+        pop = sintetickaPopulacija(velicina, folder)
+    return pop.uzmi(np.arange(pop.N)).reset_index(drop=True)
+
+
+def kombinacije(parametri):
+    '''Sve kombinacije vrednosti parametara, kao rečnici.'''
+    return [dict(zip(parametri, vrednosti)) for vrednosti in itertools.product(*parametri.values())]
+
+
+def izmeri(slucaj, df, parametri, ponavljanja = 5, minVreme = 0.2):
+    '''Medijana vremena (s) i vršna memorija (MB) jednog slučaja za date parametre.'''
+    slucaj.merenje(slucaj.priprema(df, **parametri), df, **parametri)  # zagrevanje (lenji uvozi)
+    vremena = []
+    while not vremena or (len(vremena) < ponavljanja and sum(vremena) < minVreme):
+        MODELI.isprazni()
+        objekat = slucaj.priprema(df, **parametri)
+        t = time.perf_counter()
+        slucaj.merenje(objekat, df, **parametri)
+        vremena.append(time.perf_counter() - t)
+    MODELI.isprazni()
+    objekat = slucaj.priprema(df, **parametri)
+    tracemalloc.start()
+    try:
+        slucaj.merenje(objekat, df, **parametri)
+        vrh = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return float(np.median(vremena)), vrh / 2**20
+
+
+def kljuc(naziv, velicina, parametri):
+    return f"{naziv}|{velicina}|{','.join(f'{k}={v}' for k, v in parametri.items())}"
+
+
+def pokreni(velicine = VELICINE, slucajevi = None, ponavljanja = 5, minVreme = 0.2):
+    '''Meri sve izabrane slučajeve na svim populacijama.
+
+    Rezultat:
+    ----------
+    pd.DataFrame
+        Po jedan red za slučaj, populaciju i kombinaciju parametara: vreme (s) i memorija (MB).'''
+    izabrani = [s for s in SLUCAJEVI if slucajevi is None or s.naziv in slucajevi]
+    redovi = []
+    for velicina in velicine:
+        df = populacija(velicina)
+        for slucaj in izabrani:
+            for parametri in kombinacije(slucaj.parametri):
+                vreme, memorija = izmeri(slucaj, df, parametri, ponavljanja, minVreme)
+                redovi.append({'kljuc': kljuc(slucaj.naziv, velicina, parametri), 'slucaj': slucaj.naziv,
+                               'N': len(df), 'parametri': ', '.join(f'{k}={v}' for k, v in parametri.items()) or '-',
+                               'vreme': vreme, 'memorija': memorija})
+                print(f"{redovi[-1]['kljuc']:<55} {vreme:10.4f} s {memorija:10.1f} MB", file=sys.stderr)
+    return pd.DataFrame(redovi).set_index('kljuc')
+
+
+def poredi(rezultati, osnova, prag = 1.25):
+    '''Dodaje vreme i memoriju iz osnove, odnos vremena (novo / osnova) i oznaku sporijih i bržih slučajeva.'''
+    osnova = pd.DataFrame.from_dict(osnova, orient='index')[['vreme', 'memorija']]
+    tabela = rezultati.join(osnova.add_suffix(' (osnova)'))
+    tabela['odnos'] = tabela['vreme'] / tabela['vreme (osnova)']
+    tabela['status'] = np.select([tabela['odnos'] > prag, tabela['odnos'] < 1 / prag, tabela['odnos'].notna()],
+                                 ['sporije', 'brze', 'isto'], 'nema osnove')
+    return tabela
+
+
+if __name__ == '__main__':
+    argumenti = argparse.ArgumentParser(description='Merenje vremena i memorije metoda ocenjivanja.')
+    argumenti.add_argument('--velicine', nargs='+', default=VELICINE,
+                           type=lambda v: v if v == 'TU' else int(float(v)))
+    argumenti.add_argument('--slucajevi', nargs='+', choices=[s.naziv for s in SLUCAJEVI])
+    argumenti.add_argument('--ponavljanja', type=int, default=5)
+    argumenti.add_argument('--minVreme', type=float, default=0.2)
+    argumenti.add_argument('--prag', type=float, default=1.25, help='odnos vremena iznad kog je slučaj sporiji')
+    argumenti.add_argument('--osnova', default=OSNOVA)
+    argumenti.add_argument('--sacuvaj', action='store_true', help='čuva rezultate kao novu osnovu')
+    a = argumenti.parse_args()
+
+    rezultati = pokreni(a.velicine, a.slucajevi, a.ponavljanja, a.minVreme)
+    if a.sacuvaj:
+        with open(a.osnova, 'w', encoding='utf-8') as f:
+            json.dump(rezultati[['vreme', 'memorija']].to_dict(orient='index'), f, indent=1)
+        print(rezultati.drop(columns='slucaj').to_string())
+        sys.exit(0)
+    osnova = {}
+    if os.path.isfile(a.osnova):
+        with open(a.osnova, encoding='utf-8') as f:
+            osnova = json.load(f)
+    tabela = poredi(rezultati, osnova, a.prag) if osnova else rezultati.assign(status='nema osnove')
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.float_format', '{:.4f}'.format):
+        print(tabela.drop(columns='slucaj').to_string())
+    sys.exit(int((tabela['status'] == 'sporije').any()))
@@ -0,0 +1,40 @@
+'''Merenje vremena uvoza modula iz foldera klase.
+
+Svaki modul se uvozi u novom Python procesu (ponovljeno nekoliko puta, prijavljuje se medijana),
+i beleži se da li su pri uvozu učitane grafičke biblioteke i scipy.stats.
+
+Pokretanje iz korena repozitorijuma:
+    python benchmark/uvoz.py'''
+import os
+import subprocess
+import sys
+import pandas as pd
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULI = ['klase.funkcije', 'klase.ONK', 'klase.Bootstrapping', 'klase.Sampling']
+TESKI = ['matplotlib', 'seaborn', 'scipy.stats']
+
+PROGRAM = '''
+import sys, time
+t = time.perf_counter()
+import {modul}
+print(time.perf_counter() - t, *[ime in sys.modules for ime in {teski!r}])
+'''
+
+
+def merenje(modul, ponavljanja = 5):
+    '''Medijana vremena uvoza modula (u sekundama) i spisak teških biblioteka učitanih pri uvozu.'''
+    vremena = []
+    for _ in range(ponavljanja):
+        izlaz = subprocess.run([sys.executable, '-c', PROGRAM.format(modul=modul, teski=TESKI)], cwd=KOREN,
+                               capture_output=True, text=True, check=True).stdout.split()
+        vremena.append(float(izlaz[0]))
+    ucitane = [ime for ime, da in zip(TESKI, izlaz[1:]) if da == 'True']
+    return pd.Series(vremena).median(), ucitane
+
+
+if __name__ == '__main__':
+    redovi = {modul: merenje(modul) for modul in MODULI}
+    print(pd.DataFrame({'Vreme uvoza (s)': [v for v, _ in redovi.values()],
+                        'Učitane biblioteke': [', '.join(u) or '-' for _, u in redovi.values()]},
+                       index=list(redovi.keys())).to_string())
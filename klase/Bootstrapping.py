@@ -1,4 +1,6 @@
 from klase.funkcije import *
+from klase.instrumentacija import meri, broji
+from klase import jezgro
 
 class Bootstrapping():
     ''' Klasa za primenu metode uzorkovanja sa vraćanjem na DataFrame-u radi procene srednje vrednosti, standardne devijacije,
@@ -30,17 +32,18 @@ class Bootstrapping():
         self.n = n if n is not None else int(len(df) * 0.1)
     
         self.N = len(df)
+        self._kes = {}
 
+    @meri
     def fit(self, k, seed=42):
         ''' Kreira k uzoraka sa vraćanjem i računa njihove srednje vrednosti i standardne devijacije'''
-        self.sredineUzoraka = []
-        self.standardneDevijacije = []
-        for i in range(k):
-            uzorak = self.df['plata'].sample(n=self.n, random_state=seed + i)
-            self.sredineUzoraka.append(uzorak.mean())
-            self.standardneDevijacije.append(uzorak.std())
-        self.sredineUzoraka = pd.Series(self.sredineUzoraka, name = 'prosek')
-        self.standardneDevijacije = pd.Series(self.standardneDevijacije, name = 'standardna devijacija')
+        broji('bootstrap replike', k)
+        broji('kopirani redovi', k * self.n)
+        sredine, devijacije = jezgro.bootstrapMomenti(self.df['plata'].to_numpy(), k, self.n, seed)
+        self.seed = seed
+        self.sredineUzoraka = pd.Series(sredine, name = 'prosek')
+        self.standardneDevijacije = pd.Series(devijacije, name = 'standardna devijacija')
+        self._kes = {}
 
     @property
     def sredina(self):
@@ -52,19 +55,85 @@ class Bootstrapping():
         ''' Prosečna vrednost standardnih devijacija bootstrap uzoraka'''
         return self.standardneDevijacije.mean()
 
+    @meri
     def interval(self, alfa = None, x = None):
         '''Računa intervale poverenja za srednje vrednosti uzoraka
         za zadate nivoe značajnosti'''
-        x = self.sredineUzoraka if x is None else x
         alfa = self.alfa if alfa is None else alfa
         alfa = np.atleast_1d(alfa)
-        intervali = []
-        for a in alfa:
-            
-            donja = x.quantile(a / 2)
-            gornja = x.quantile(1 - a / 2)
-            intervali.append([donja, gornja])
-        return pd.DataFrame(intervali, columns=["donja", "gornja"], index = [f"{int((1 - a) * 100)}%" for a in alfa])
+        if x is None:
+            kljuc = ('interval', tuple(alfa.tolist()))
+            if kljuc not in self._kes:
+                self._kes[kljuc] = jezgro.kvantilniIntervali(self.sredineUzoraka, alfa)
+            donja, gornja = self._kes[kljuc]
+        else:
+            donja, gornja = jezgro.kvantilniIntervali(x, alfa)
+        return pd.DataFrame({'donja': donja, 'gornja': gornja}, index = [f"{int((1 - a) * 100)}%" for a in alfa])
+
+    def _statistika(self, statistika, var):
+        '''Bootstrap replike, vrednost na celom df-u i jackknife vrednosti statistike (pamte se do sledećeg fit-a).'''
+        kljuc = ('statistika', statistika, var if statistika == 'kolicnik' else None)
+        if kljuc in self._kes:
+            return self._kes[kljuc]
+        y = self.df['plata'].to_numpy(dtype=float)
+        if statistika == 'sredina':
+            replike, theta, jk = self.sredineUzoraka.to_numpy(), y.mean(), jezgro.jackknifeSredina(y)
+        elif statistika == 'varijansa':
+            replike, theta, jk = np.square(self.standardneDevijacije.to_numpy()), y.var(ddof=1), jezgro.jackknifeVarijansa(y)
+        elif statistika == 'kolicnik':
+            x = self.df[var].to_numpy(dtype=float)
+            replike = jezgro.bootstrapKolicnici(y, x, len(self.sredineUzoraka), self.n, self.seed)
+            theta, jk = y.sum() / x.sum(), jezgro.jackknifeKolicnik(y, x)
+        else:
+            raise ValueError("Statistika mora biti 'sredina', 'varijansa' ili 'kolicnik'")
+        self._kes[kljuc] = (replike, theta, jk)
+        return self._kes[kljuc]
+
+    @meri
+    def intervalBCa(self, alfa = None, statistika = 'sredina', var = 'obrazovanje'):
+        '''Intervali poverenja sa korekcijom pristrasnosti i ubrzanjem (BCa), u obliku kao interval().
+
+        Korekcija z0 je udeo replika manjih od statistike na celom df-u, a ubrzanje se računa iz
+        jackknife vrednosti (jezgro.jackknifeSredina, jackknifeVarijansa, jackknifeKolicnik) u
+        zatvorenom obliku, bez petlje po N izostavljanja. Kako su replike iz uzoraka obima n, a
+        jackknife iz svih N jedinica, ubrzanje se množi sa sqrt(N / n).
+
+        Parametri:
+        ----------
+        alfa : float ili lista float-ova, opciono
+            Nivoi značajnosti (podrazumevano self.alfa).
+        statistika : str, opciono
+            'sredina', 'varijansa' ili 'kolicnik' (Σplata / Σvar, replike sa istim seed-ovima kao fit).
+        var : str, opciono
+            Imenilac količnika.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Kolone donja i gornja, indeks nivoi poverenja (npr. "90%").'''
+        alfa = self.alfa if alfa is None else alfa
+        alfa = np.atleast_1d(alfa)
+        replike, theta, jk = self._statistika(statistika, var)
+        k = len(replike)
+        ubrzanje = jezgro.ubrzanje(jk) * np.sqrt(self.N / self.n)
+        udeo = (np.sum(replike < theta) + 0.5 * np.sum(replike == theta)) / k
+        z0 = stats.norm.ppf(np.clip(udeo, 0.5 / k, 1 - 0.5 / k))
+        z = z0 + stats.norm.ppf(np.concatenate([alfa / 2, 1 - alfa / 2]))
+        granice = np.quantile(replike, stats.norm.cdf(z0 + z / (1 - ubrzanje * z)))
+        return pd.DataFrame({'donja': granice[:len(alfa)], 'gornja': granice[len(alfa):]},
+                            index = [f"{int((1 - a) * 100)}%" for a in alfa])
+
+    @meri
+    def intervalStudentizovan(self, alfa = None):
+        '''Studentizovani bootstrap intervali za sredinu, u obliku kao interval(). Replike
+        t* = (ȳ* - ȳ) / se* koriste standardne devijacije uzoraka izračunate u fit-u
+        (standardneDevijacije), sa korekcijom za konačnu populaciju sqrt(1 - n/N).'''
+        alfa = self.alfa if alfa is None else alfa
+        alfa = np.atleast_1d(alfa)
+        y = self.df['plata'].to_numpy(dtype=float)
+        donja, gornja = jezgro.studentizovaniIntervali(self.sredineUzoraka.to_numpy(), self.standardneDevijacije.to_numpy(),
+                                                       y.mean(), y.std(ddof=1), self.n, self.N, alfa)
+        return pd.DataFrame({'donja': donja, 'gornja': gornja}, index = [f"{int((1 - a) * 100)}%" for a in alfa])
 
     def d(self, alfa = None):
         ''' Polovina širine intervala poverenja za zadati nivo značajnosti alfa.'''
@@ -72,48 +141,68 @@ class Bootstrapping():
         intervals = self.interval(alfa)
         return ((intervals["gornja"] - intervals["donja"]) / 2).rename('d')
 
-    def plotDist(self, alfa = None, x = None, target = None):
+    def raspodela(self, x = None, korpi = 50, tacaka = 512):
+        '''Histogram (ivice i frekvencije) i binovana KDE (jezgro.binovanaKde) vrednosti x; za bootstrap
+        sredine računaju se jednom po fit-u, pa crtanje ne zavisi od broja replika.'''
+        if x is None:
+            kljuc = ('raspodela', korpi, tacaka)
+            if kljuc not in self._kes:
+                self._kes[kljuc] = self.raspodela(self.sredineUzoraka.to_numpy(), korpi, tacaka)
+            return self._kes[kljuc]
+        x = np.asarray(x, dtype=float)
+        frekvencije, ivice = np.histogram(x, bins=korpi)
+        mreza, gustina = jezgro.binovanaKde(x, tacaka)
+        return ivice, frekvencije, mreza, gustina
+
+    @meri
+    def plotDist(self, alfa = None, x = None, target = None, putanja = None):
         ''' Vizuelizuje distribuciju srednjih vrednosti iz realizovanih uzoraka
-        sa intervalima poverenja i opcionim ciljnim prosekom (koristi se u klasi PSU i SSU)'''
-        x = self.sredineUzoraka if x is None else x
+        sa intervalima poverenja i opcionim ciljnim prosekom (koristi se u klasi PSU i SSU).
+
+        Crta se iz unapred izračunatog histograma i KDE (raspodela) i keširanih kvantila, pa vreme
+        crtanja ne zavisi od broja replika. Ako je zadata putanja, grafik se čuva u fajl i zatvara
+        (radi i bez ekrana, npr. u serijskim obradama), a inače se prikazuje.'''
+        naziv = self.sredineUzoraka.name if x is None else x.name
+        srednja = self.sredineUzoraka.mean() if x is None else x.mean()
         alfa = self.alfa if alfa is None else alfa
+        ivice, frekvencije, mreza, gustina = self.raspodela(x)
+        granice = self.interval(alfa, x = x)
         boje = plt.cm.tab10.colors
-        plt.figure(figsize=(12, 6))
-        sns.histplot(x, bins=50, kde=True, color='skyblue', edgecolor='black', stat="count")
-        plt.title(f'Distribucija bootstrap {x.name} plata', fontsize=16)
-        plt.xlabel(f'{x.name} plata', fontsize=14)
-        plt.ylabel('Frekvencija', fontsize=14)
-        plt.grid(True)
-
-        plt.axvline(x=x.mean(), color='blue', linestyle='-', label=f'Srednja vrednost: {x.mean():.2f}')
-        for a, boja in zip(alfa, boje):
-            donja, gornja =  self.interval(a, x = x).iloc[0]
-            plt.axvline(x=donja, color= boja, linestyle='--', label=f'{int((1 - a)*100)}% interval')
-            plt.axvline(x=gornja, color= boja, linestyle='--')
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.bar(ivice[:-1], frekvencije, width=np.diff(ivice), align='edge', color='skyblue', edgecolor='black', alpha=0.75)
+        ax.plot(mreza, gustina * frekvencije.sum() * np.diff(ivice).mean(), color='skyblue', linewidth=2)
+        ax.set_title(f'Distribucija bootstrap {naziv} plata', fontsize=16)
+        ax.set_xlabel(f'{naziv} plata', fontsize=14)
+        ax.set_ylabel('Frekvencija', fontsize=14)
+        ax.grid(True)
+
+        ax.axvline(x=srednja, color='blue', linestyle='-', label=f'Srednja vrednost: {srednja:.2f}')
+        for a, (donja, gornja), boja in zip(np.atleast_1d(alfa), granice.to_numpy(), boje):
+            ax.axvline(x=donja, color= boja, linestyle='--', label=f'{int((1 - a)*100)}% interval')
+            ax.axvline(x=gornja, color= boja, linestyle='--')
             
         if target is not None:
-            plt.axvline(target.mean(), color='red', linestyle='-', linewidth=2, label=f'Target: {target.mean():.2f}')
+            ax.axvline(np.mean(target), color='red', linestyle='-', linewidth=2, label=f'Target: {np.mean(target):.2f}')
 
-        plt.legend()
-        plt.show()
+        ax.legend()
+        if putanja is not None:
+            fig.savefig(putanja, bbox_inches='tight')
+            plt.close(fig)
+        else:
+            plt.show()
 
+    @meri
     def obimUzorka(self, alfa = None):
         ''' Računa optimalni obim uzorka za svaki nivo značajnosti'''
         alfa = self.alfa if alfa is None else alfa
         alfa = np.atleast_1d(alfa)
-        nList, dList, indeksi = [], [], []
-    
-        for a in alfa:
-            d = self.d([a]).values[0]
-            Z = stats.norm.ppf(1 - a / 2)
-            Sy2 = np.square(self.standardneDevijacije).mean()
-            n0 = (np.square(Z) * Sy2) / np.square(d)
-            n = int(1 / (1 / n0 + 1 / self.N))
-            nList.append(n)
-            indeksi.append(f"{int((1 - a) * 100)}%")
-            dList.append(d)
-    
-        return pd.DataFrame({'n': nList, 'd': dList}, index=indeksi)
+        donja, gornja = jezgro.kvantilniIntervali(self.sredineUzoraka, alfa)
+        d = (gornja - donja) / 2
+        Z = stats.norm.ppf(1 - alfa / 2)
+        Sy2 = np.square(self.standardneDevijacije.to_numpy()).mean()
+        n0 = (np.square(Z) * Sy2) / np.square(d)
+        n = (1 / (1 / n0 + 1 / self.N)).astype(int)
+        return pd.DataFrame({'n': n, 'd': d}, index=[f"{int((1 - a) * 100)}%" for a in alfa])
 
     @property
     def summary(self):
@@ -123,7 +212,7 @@ class Bootstrapping():
         d = self.d()
         d.index = [f"d({(1 - a) * 100:.0f})%" for a in self.alfa]
     
-        data = pd.concat([data,jb(self.sredineUzoraka)])
+        data = pd.concat([data,jb(self.sredineUzoraka, prikaz=True)])
     
         return pd.DataFrame(data)
         
@@ -0,0 +1,164 @@
+import itertools
+import numpy as np
+import pandas as pd
+from klase.momenti import kodiraj, grupniMomenti, sredinaVarijansa
+
+
+class PretragaStratifikacije:
+    '''Pretraga stratifikacija i alokacija koja minimizuje varijansu stratifikovane ocene sredine.
+
+    Momenti populacije (N, suma, suma kvadrata) računaju se samo jednom, po ćelijama najfinije
+    podele na sve zadate promenljive. Svaka kandidat-stratifikacija je ukrupnjavanje tih ćelija,
+    pa se njeni momenti dobijaju sabiranjem ćelija (np.bincount) bez ponovnog prolaska kroz populaciju.
+
+    Parametri
+    ----------
+    df : pd.DataFrame
+        Populacija.
+    promenljive : list[str], opciono
+        Kategorijske promenljive od kojih se formiraju stratumi i njihova ukrštanja.
+    y : str, opciono
+        Promenljiva čija se sredina ocenjuje. Podrazumevano: 'plata'.
+
+    Atributi
+    ----------
+    N : int
+        Veličina populacije.
+    velicine : tuple[int]
+        Broj kategorija svake promenljive.
+    celije : np.ndarray
+        Kod svake promenljive za svaku ćeliju najfinije podele (G x broj promenljivih).'''
+    def __init__(self, df, promenljive = ['region', 'urban', 'zene', 'obr3'], y = 'plata'):
+        self.promenljive = list(promenljive)
+        kodovi, self.velicine, self.kategorije = kodiraj(df, self.promenljive)
+        self.G = int(np.prod(self.velicine))
+        self.Nc, self.S1, self.S2 = grupniMomenti(kodovi, df[y].to_numpy(), self.G)
+        self.celije = np.stack(np.unravel_index(np.arange(self.G), self.velicine), axis=1)
+        self.N = len(df)
+        self.Ym = self.S1.sum() / self.N
+        self.S2y = (self.S2.sum() - self.S1.sum()**2 / self.N) / (self.N - 1)
+
+    def kandidati(self, maxDubina = None):
+        '''Sve kombinacije promenljivih do zadate dubine ukrštanja, uključujući uzorak bez stratifikacije.'''
+        maxDubina = len(self.promenljive) if maxDubina is None else maxDubina
+        return [k for d in range(maxDubina + 1) for k in itertools.combinations(self.promenljive, d)]
+
+    def momenti(self, stratumi):
+        '''Broj jedinica, sredina i varijansa y u svakom nepraznom stratumu populacije.
+
+        Parametri:
+        ----------
+        stratumi : list[str]
+            Promenljive čije ukrštanje definiše stratume.
+
+        Rezultat:
+        ----------
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Nh, Ybar_h i S2_h.'''
+        idx = [self.promenljive.index(s) for s in stratumi]
+        velicine = [self.velicine[i] for i in idx]
+        H = int(np.prod(velicine))
+        kod = np.ravel_multi_index(tuple(self.celije[:, idx].T), velicine) if idx else np.zeros(self.G, dtype=np.int64)
+        Nh = np.bincount(kod, weights=self.Nc, minlength=H)
+        S1h = np.bincount(kod, weights=self.S1, minlength=H)
+        S2h = np.bincount(kod, weights=self.S2, minlength=H)
+        neprazni = Nh > 0
+        Ybarh, S2 = sredinaVarijansa(Nh[neprazni], S1h[neprazni], S2h[neprazni])
+        return Nh[neprazni], Ybarh, S2
+
+    @staticmethod
+    def alokacija(Nh, S2h, n, metod = 'proporcionalna'):
+        '''Raspodela obima uzorka n po stratumima.
+
+        Parametri:
+        ----------
+        Nh, S2h : np.ndarray
+            Veličine i varijanse stratuma.
+        n : int
+            Ukupan obim uzorka.
+        metod : str
+            'proporcionalna', 'nejman' ili 'jednaka'.
+
+        Rezultat:
+        ----------
+        np.ndarray
+            Celobrojni obimi uzoraka po stratumima, najmanje 2 (ili Nh) i najviše Nh, sa zbirom tačno n.
+
+        Ograničenja se primenjuju u samoj raspodeli: n_h = min(max(c t_h, L_h), N_h), L_h = min(2, N_h),
+        a c se bira tako da zbir bude n (sabiranje je deo po deo linearno u c, pa se c dobija tačno iz
+        prelomnih tačaka). Ako ni L_h nisu dostižne u obimu n, podiže se ValueError.'''
+        if metod == 'proporcionalna':
+            tezine = Nh.astype(float)
+        elif metod == 'nejman':
+            tezine = Nh * np.sqrt(S2h)
+        elif metod == 'jednaka':
+            tezine = np.ones_like(Nh, dtype=float)
+        else:
+            raise ValueError(f'Nepoznat metod alokacije: {metod}')
+        Nh = np.asarray(Nh, dtype=float)
+        donje = np.minimum(2, Nh)
+        if donje.sum() > n:
+            raise ValueError(f'Obim uzorka {n} je manji od najmanjeg mogućeg zbira obima stratuma ({int(donje.sum())})')
+        if n >= Nh.sum():
+            return Nh.astype(int)
+        # stratumi bez težine (npr. S²_h = 0 kod Nejmanove) dobijaju ostatak tek kad se ostali popune
+        tezine = np.where(tezine > 0, tezine, 1e-12 * max(tezine.max(), 1.0))
+        prelomi = np.unique(np.concatenate([donje / tezine, Nh / tezine]))
+        sume = np.clip(prelomi[:, None] * tezine, donje, Nh).sum(axis=1)
+        j = np.searchsorted(sume, n)
+        c = prelomi[0] if j == 0 else prelomi[j - 1] + (n - sume[j - 1]) * (prelomi[j] - prelomi[j - 1]) / (sume[j] - sume[j - 1])
+        nh = np.clip(c * tezine, donje, Nh)
+        celi = np.floor(nh + 1e-9)
+        visak = int(round(n - celi.sum()))
+        if visak > 0:
+            ostaci = np.where(celi < Nh, nh - celi, -np.inf)
+            celi[np.argsort(-ostaci, kind='stable')[:visak]] += 1
+        return celi.astype(int)
+
+    def varijansa(self, stratumi, n, alokacija = 'proporcionalna'):
+        '''Varijansa stratifikovane ocene sredine, sum W_h² S²_h / n_h (1 - n_h / N_h), za zadatu stratifikaciju i alokaciju.
+
+        Rezultat:
+        ----------
+        tuple[float, np.ndarray]
+            Varijansa i obimi uzoraka po stratumima.'''
+        Nh, _, S2h = self.momenti(stratumi)
+        nh = self.alokacija(Nh, S2h, n, alokacija)
+        Wh = Nh / self.N
+        V = np.sum(np.square(Wh) * S2h / nh * (1 - nh / Nh))
+        return V, nh
+
+    def pretraga(self, n, alokacije = ('proporcionalna', 'nejman', 'jednaka'), maxDubina = None):
+        '''Ocenjuje sve kandidat-stratifikacije i alokacije i rangira ih po varijansi ocene sredine.
+
+        Parametri:
+        ----------
+        n : int
+            Obim uzorka (budžet).
+        alokacije : tuple[str], opciono
+            Metodi alokacije koji se porede.
+        maxDubina : int, opciono
+            Najveći broj promenljivih u jednom ukrštanju.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Rangirana tabela: stratumi, alokacija, broj stratuma H, ostvareni obim n (jednak budžetu),
+            najmanji obim stratuma u uzorku (min nh), varijansa V, standardna greška SE i efekat dizajna
+            deff u odnosu na prost slučajan uzorak. Stratifikacije sa više od n/2 stratuma se preskaču,
+            jer ne mogu imati bar 2 jedinice po stratumu.'''
+        Vpsu = (1 - n / self.N) * self.S2y / n
+        redovi = []
+        for stratumi in self.kandidati(maxDubina):
+            Nh, _, S2h = self.momenti(stratumi)
+            if np.minimum(2, Nh).sum() > n:
+                continue
+            Wh = Nh / self.N
+            for metod in (alokacije if stratumi else alokacije[:1]):
+                nh = self.alokacija(Nh, S2h, n, metod)
+                V = np.sum(np.square(Wh) * S2h / nh * (1 - nh / Nh))
+                redovi.append([stratumi, metod if stratumi else '-', len(Nh), int(nh.sum()), int(nh.min()), V, np.sqrt(V), V / Vpsu])
+        rezultat = pd.DataFrame(redovi, columns=['stratumi', 'alokacija', 'H', 'n', 'min nh', 'V', 'SE', 'deff'])
+        rezultat = rezultat.sort_values('V', kind='stable').reset_index(drop=True)
+        rezultat.index += 1
+        return rezultat
@@ -0,0 +1,125 @@
+import itertools
+import numpy as np
+import pandas as pd
+from klase.funkcije import stats
+from klase.momenti import kodiraj
+from klase.Populacija import Populacija
+
+
+def kombinacijeDomena(promenljive, maxDubina = None):
+    '''Sve kombinacije domenskih promenljivih do zadate dubine ukrštanja (bez praznog skupa).'''
+    maxDubina = len(promenljive) if maxDubina is None else maxDubina
+    return [k for d in range(1, maxDubina + 1) for k in itertools.combinations(promenljive, d)]
+
+
+def oceneDomena(uzorak, y, w, promenljive, stratumi = None, kombinacije = None, alfa = [0.1, 0.05, 0.01], populacija = None):
+    '''Ocene sredine i totala y za sve domene i sva tražena ukrštanja domenskih promenljivih.
+
+    Uzorak se prolazi samo jednom: jedinice se kodiraju po najfinijoj podeli na sve domenske
+    promenljive i stratume, i za svaku ćeliju se (np.bincount) računaju sume w, wy, w², w²y i w²y².
+    Svaki domen bilo kog ukrštanja je unija ćelija, pa se ocene i linearizovane varijanse Hajekove
+    sredine (z_i = w_i (y_i - ybar_d) u domenu, 0 van njega) dobijaju sabiranjem ćelija.
+
+    Parametri:
+    ----------
+    uzorak : pd.DataFrame
+        Jedinice uzorka.
+    y : str
+        Zavisna promenljiva.
+    w : array-like
+        Težine dizajna (za prost slučajan uzorak N / n, za stratifikovan N_h / n_h).
+    promenljive : list[str]
+        Domenske promenljive.
+    stratumi : str, opciono
+        Kolona sa stratumima dizajna; varijansa se tada računa unutar stratuma.
+    kombinacije : list[tuple[str]], opciono
+        Ukrštanja za koja se računaju ocene; podrazumevano sve kombinacije promenljivih.
+    alfa : list[float], opciono
+        Nivoi značajnosti za intervale poverenja.
+    populacija : pd.DataFrame ili Populacija, opciono
+        Populacija, ako je poznata, za prave vrednosti sredina domena (kategorije domenskih
+        promenljivih u uzorku moraju biti iste kao u populaciji).
+
+    Rezultat:
+    ----------
+    pd.DataFrame
+        Po jedan red za svaki domen i nivo značajnosti: domen, vrednosti domenskih promenljivih
+        ('Ukupno' za promenljive van ukrštanja), n, Nkapa, sredina, std, total, stdTotal, alfa, donja, gornja
+        i, ako je zadata populacija, parametar.'''
+    kombinacije = kombinacijeDomena(promenljive) if kombinacije is None else kombinacije
+    w = np.asarray(w, dtype=float)
+    yv = uzorak[y].to_numpy(dtype=float)
+    kodovi, velicine, kategorije = kodiraj(uzorak, promenljive)
+    if stratumi is None:
+        sKod, H = np.zeros(len(uzorak), dtype=np.int64), 1
+    else:
+        sKod, oznake = pd.factorize(uzorak[stratumi], sort=True)
+        H = len(oznake)
+    G = int(np.prod(velicine))
+
+    celija = kodovi * H + sKod
+    sume = np.stack([np.bincount(celija, weights=v, minlength=G * H) for v in
+                     [np.ones_like(w), w, w * yv, w * w, w * w * yv, w * w * yv * yv]]).reshape(6, G, H)
+    nh = np.bincount(sKod, minlength=H).astype(float)
+    fh = nh / np.bincount(sKod, weights=w, minlength=H)
+    koef = np.where(nh > 1, (1 - fh) * nh / np.maximum(nh - 1, 1), 0.0)
+
+    if isinstance(populacija, Populacija):
+        grupne = populacija.grupneSume(promenljive, [y])
+        pN, pY = grupne['N'].to_numpy(), grupne[y].to_numpy()
+    elif populacija is not None:
+        pKod = kodiraj(populacija, promenljive)[0]
+        pN = np.bincount(pKod, minlength=G).astype(float)
+        pY = np.bincount(pKod, weights=populacija[y].to_numpy(dtype=float), minlength=G)
+
+    celije = np.stack(np.unravel_index(np.arange(G), velicine), axis=1)
+    alfa = np.atleast_1d(np.asarray(alfa, dtype=float))
+    delovi = []
+    for kombinacija in kombinacije:
+        idx = [promenljive.index(p) for p in kombinacija]
+        vel = [velicine[i] for i in idx]
+        D = int(np.prod(vel))
+        domen = np.ravel_multi_index(tuple(celije[:, idx].T), vel)
+        S = np.stack([np.stack([np.bincount(domen, weights=sume[k, :, h], minlength=D) for h in range(H)], axis=1)
+                      for k in range(6)])
+        n, Sw, Swy, Sw2, Sw2y, Sw2y2 = S
+        nd = n.sum(axis=1)
+        Nkapa = Sw.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sredina = Swy.sum(axis=1) / Nkapa
+            m = sredina[:, None]
+            zh = Swy - m * Sw
+            z2h = Sw2y2 - 2 * m * Sw2y + m * m * Sw2
+            Vz = ((z2h - np.where(nh > 0, zh**2 / np.maximum(nh, 1), 0)) * koef).sum(axis=1)
+            Vt = ((Sw2y2 - np.where(nh > 0, Swy**2 / np.maximum(nh, 1), 0)) * koef).sum(axis=1)
+            std = np.sqrt(np.maximum(Vz, 0)) / Nkapa
+        stdTotal = np.sqrt(np.maximum(Vt, 0))
+
+        neprazni = nd > 0
+        oznake = np.stack(np.unravel_index(np.arange(D), vel), axis=1)[neprazni]
+        tabela = pd.DataFrame({'domen': ' × '.join(kombinacija)}, index=range(neprazni.sum()))
+        for p in promenljive:
+            tabela[p] = 'Ukupno'
+        for j, i in enumerate(idx):
+            tabela[promenljive[i]] = np.asarray(kategorije[i])[oznake[:, j]]
+        tabela['n'] = nd[neprazni].astype(int)
+        tabela['Nkapa'] = Nkapa[neprazni]
+        tabela['sredina'] = sredina[neprazni]
+        tabela['std'] = std[neprazni]
+        tabela['total'] = Swy.sum(axis=1)[neprazni]
+        tabela['stdTotal'] = stdTotal[neprazni]
+        if populacija is not None:
+            PN = np.bincount(domen, weights=pN, minlength=D)
+            PY = np.bincount(domen, weights=pY, minlength=D)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                tabela['parametar'] = (PY / PN)[neprazni]
+        delovi.append(tabela)
+
+    rezultat = pd.concat(delovi, ignore_index=True)
+    t = stats.t.ppf(1 - alfa[None, :] / 2, np.maximum(rezultat['n'].to_numpy()[:, None] - 1, 1))
+    rezultat = rezultat.loc[rezultat.index.repeat(len(alfa))].reset_index(drop=True)
+    t = t.ravel()
+    rezultat['alfa'] = np.tile(alfa, len(rezultat) // len(alfa))
+    rezultat['donja'] = rezultat['sredina'] - t * rezultat['std']
+    rezultat['gornja'] = rezultat['sredina'] + t * rezultat['std']
+    return rezultat
@@ -0,0 +1,205 @@
+from klase.funkcije import *
+from klase.ONK import ONK, Model
+from klase.ocene import Ocena
+from klase.instrumentacija import meri, broji
+from klase import jezgro
+
+
+class InkrementalniUzorak:
+    '''Uzorak koji raste po serijama (npr. dnevni priliv anketa tokom terenskog rada).
+
+    Ocene se računaju iz dovoljnih statistika: suma po stratumima (n, Σx, Σy, Σx², Σy², Σxy, za x i y
+    pomerene za sredine populacije) i Gramove matrice Z'Z i suma kolona za Z = [X | y], gde je X
+    matrica dizajna ONK modela. Uz to se za svaku jedinicu, po indeksu, pamte njen red matrice Z,
+    pomereno x i stratum (memorija srazmerna obimu uzorka), pa se pri uklanjanju oduzima tačno ono
+    što je dodato. Dodavanje i uklanjanje serije menja sume u vremenu srazmernom veličini serije, a
+    ocene se računaju iz suma, nezavisno od obima uzorka.
+
+    Populacione veličine (N, totali, N_h, sredine regresora) preuzimaju se jednom iz objekta PSU ili
+    SSU, pa se ocene poklapaju sa ocenama tog objekta nad istim jedinicama uzorka. Obično se pravi
+    metodom PSU.inkrementalno / SSU.inkrementalno.
+
+    Parametri
+    ----------
+    uzorak : PSU ili SSU
+        Objekat čije populacione veličine, stratumi i matrica dizajna se koriste.
+    var : str, opciono
+        Pomoćna promenljiva za količničke i (u SSU) regresione ocene.'''
+    def __init__(self, uzorak, var = 'obrazovanje'):
+        self.var = var
+        self.alfa = list(uzorak.alfa)
+        self.N = uzorak.N
+        self.Ym = uzorak.Ym
+        self.Ytotal = uzorak._total('plata')
+        self.Xtotal = uzorak._total(var)
+        self.stratumi = getattr(uzorak, 'stratumi', None)
+        self.n = 0
+        self._jedinice = {}
+        self._pomak = (self.Xtotal / self.N, self.Ym)
+        if self.stratumi is None:
+            self._oznake = pd.Index(['ukupno'])
+            self.kolone = list(ONK.dizajn(uzorak.x).columns)
+            self.Xm = uzorak._sredineX().reindex(self.kolone).to_numpy(dtype=float)
+            self._s = uzorak._ostaciKolicnika(var, self.Ytotal / self.Xtotal)
+        else:
+            self._oznake = pd.Index(sorted(uzorak.Nh.index), name='Strata')
+            self.kolone = ['const', var]
+            self.Xm = np.array([1.0, self.Xtotal / self.N])
+            self.Nh = uzorak.Nh.reindex(self._oznake).to_numpy(dtype=float)
+            self.Yh = uzorak._sumePoStratumima('plata').reindex(self._oznake).to_numpy(dtype=float)
+            self.Xh = uzorak._sumePoStratumima(var).reindex(self._oznake).to_numpy(dtype=float)
+
+        self._vestacke, self._nivoi = {}, {}
+        for kat in getattr(uzorak, 'kategorije', None) or []:
+            vrednosti = uzorak.df.kategorije[kat] if uzorak.vanMemorije else uzorak.df[kat].dropna().unique()
+            self._nivoi[kat] = set(map(str, vrednosti))
+            for kol in self.kolone:
+                if kol.startswith(f'{kat}_'):
+                    self._vestacke[kol] = (kat, kol[len(kat) + 1:])
+        self._sume = np.zeros((len(self._oznake), 6))
+        self._gram = np.zeros((len(self.kolone) + 1, len(self.kolone) + 1))
+        self._kolone = np.zeros(len(self.kolone) + 1)
+
+    def _dizajn(self, redovi):
+        '''Matrica Z = [X | y] za nove jedinice, sa veštačkim promenljivim po nivoima iz populacije.'''
+        for kat, nivoi in self._nivoi.items():
+            nepoznati = set(redovi[kat].astype(str)) - nivoi
+            if nepoznati:
+                raise ValueError(f'Nepoznate vrednosti kolone {kat}: {sorted(nepoznati)}')
+        Z = np.empty((len(redovi), len(self.kolone) + 1))
+        for j, kol in enumerate(self.kolone):
+            if kol == 'const':
+                Z[:, j] = 1.0
+            elif kol in self._vestacke:
+                kat, nivo = self._vestacke[kol]
+                Z[:, j] = redovi[kat].astype(str).to_numpy() == nivo
+            else:
+                Z[:, j] = redovi[kol].to_numpy(dtype=float)
+        Z[:, -1] = redovi['plata'].to_numpy(dtype=float)
+        return Z
+
+    def _kodovi(self, redovi):
+        '''Redni brojevi stratuma novih jedinica (oznake kao u SSU).'''
+        if self.stratumi is None:
+            return np.zeros(len(redovi), dtype=np.int64)
+        kod = self._oznake.get_indexer(redovi[self.stratumi].astype(str).agg('_'.join, axis=1))
+        if (kod < 0).any():
+            raise ValueError('Jedinice iz stratuma kojih nema u populaciji')
+        return kod
+
+    def _azuriraj(self, kod, Z, u, znak):
+        '''Dodaje (znak 1) ili oduzima (znak -1) doprinose jedinica sa stratumima kod, redovima Z i pomerenim x.'''
+        v = Z[:, -1] - self._pomak[1]
+        H = len(self._oznake)
+        self._sume += znak * np.column_stack([np.bincount(kod, weights=w, minlength=H)
+                                              for w in (np.ones(len(u)), u, v, u * u, v * v, u * v)])
+        self._gram += znak * (Z.T @ Z)
+        self._kolone += znak * Z.sum(axis=0)
+        self.n += znak * len(kod)
+
+    @meri
+    def dodaj(self, redovi):
+        '''Dodaje seriju novih jedinica uzorka (redovi sa kolonama populacije; indeks identifikuje jedinicu).'''
+        if not redovi.index.is_unique or not self._jedinice.keys().isdisjoint(redovi.index):
+            raise ValueError('Jedinice se ne mogu dodati dva puta')
+        broji('inkrementalni redovi', len(redovi))
+        kod = self._kodovi(redovi)
+        Z = self._dizajn(redovi)
+        u = redovi[self.var].to_numpy(dtype=float) - self._pomak[0]
+        self._azuriraj(kod, Z, u, 1)
+        self._jedinice.update(zip(redovi.index, zip(kod, Z, u)))
+        return self
+
+    @meri
+    def ukloni(self, indeksi):
+        '''Uklanja ranije dodate jedinice (npr. neispravne ankete) zadate indeksima; oduzimaju se vrednosti
+        zapamćene pri dodavanju.'''
+        indeksi = list(indeksi)
+        if len(set(indeksi)) != len(indeksi) or not self._jedinice.keys() >= set(indeksi):
+            raise ValueError('Mogu se ukloniti samo ranije dodate jedinice')
+        broji('inkrementalni redovi', len(indeksi))
+        zapisi = [self._jedinice.pop(i) for i in indeksi]
+        kod = np.array([k for k, _, _ in zapisi], dtype=np.int64)
+        Z = np.array([z for _, z, _ in zapisi]).reshape(len(zapisi), len(self.kolone) + 1)
+        u = np.array([x for _, _, x in zapisi], dtype=float)
+        self._azuriraj(kod, Z, u, -1)
+        return self
+
+    @property
+    def f(self):
+        return self.n / self.N
+
+    def ocena(self, ocena, stdev, parametar = None, naziv = 'sredina'):
+        '''Ocena (klasa Ocena) sa intervalima poverenja, kao PSU.ocena.'''
+        parametar = self.Ym if parametar is None else parametar
+        return Ocena.izracunaj(naziv, ocena, stdev, self.alfa, self.n - 1, parametar)
+
+    def _momenti(self):
+        '''n_h, sredine x i y, varijanse i kovarijansa po stratumima (samo stratumi sa jedinicama u uzorku).'''
+        momenti = jezgro.momentiIzSuma(self._sume, *self._pomak)
+        aktivni = momenti[0] > 0
+        return aktivni, [m[aktivni] for m in momenti]
+
+    def _stratifikovan(self, metod):
+        if self.stratumi is None:
+            raise TypeError(f'{metod} zahteva stratifikovan uzorak (SSU)')
+
+    def modelONK(self, kolone = None):
+        '''ONK model (Model) iz Gramove matrice, za sve ili zadate kolone matrice dizajna.'''
+        kolone = self.kolone if kolone is None else list(kolone)
+        izbor = [self.kolone.index(kol) for kol in kolone]
+        y = len(self.kolone)
+        rez = jezgro.onkIzSuma(self._gram[np.ix_(izbor, izbor)], self._gram[izbor, y], self._gram[y, y], self.n)
+        return Model.izNizova(kolone, rez, self.n, self.n - len(izbor), 'plata')
+
+    @meri
+    def stratifikovanaOcena(self):
+        '''Stratifikovana ocena sredine i totala Y (kao SSU.stratifikovanaOcena).'''
+        self._stratifikovan('stratifikovanaOcena')
+        aktivni, (_, _, ybarh, _, S2h, _) = self._momenti()
+        ybarSt, SybarSt = jezgro.stratifikovana(self.Nh[aktivni], ybarh, S2h, self.N, self.f)
+        return {'sredina': self.ocena(ybarSt, SybarSt, naziv='sredina'),
+                'total': self.ocena(self.N * ybarSt, self.N * SybarSt, parametar=self.Ytotal, naziv='total')}
+
+    @meri
+    def kolicnickaOcena(self):
+        '''Količničke ocene sredine i totala Y: za prost uzorak kao PSU.kolicnickaOcena, za stratifikovan
+        posebna i kombinovana ocena kao SSU.kolicnickaOcena.'''
+        aktivni, (nh, xbarh, ybarh, Sx2h, S2h, Sxyh) = self._momenti()
+        if self.stratumi is None:
+            Ru = ybarh[0] / xbarh[0]
+            SYm = np.sqrt(self._s * (1 - self.f) / (self.n * (self.N - 1)))
+            R = self.Ytotal / self.Xtotal
+            return {'sredina': Ocena.izracunaj('sredina', Ru * self.Xtotal / self.N, SYm, self.alfa, self.n - 1, self.Ym),
+                    'total': Ocena.izracunaj('total', Ru * self.Xtotal, self.N * SYm, self.alfa, self.n - 1, self.Ytotal),
+                    'kolicnik': Ocena.izracunaj('kolicnik', Ru, SYm * self.N / self.Xtotal, self.alfa, self.n - 1, R)}
+        Nh = self.Nh[aktivni]
+        rho = Sxyh / np.sqrt(Sx2h * S2h)
+        YtotalRs, SYtotalRs = jezgro.posebnaKolicnicka(Nh, nh, self.f, self.Yh[aktivni], self.Xh[aktivni],
+                                                       nh * ybarh, nh * xbarh, S2h, Sx2h, rho)
+        YtotalRc, SYtotalRc = jezgro.kombinovanaKolicnicka(Nh, nh, nh / Nh, self.N, ybarh, xbarh, S2h, Sx2h, Sxyh, self.Xtotal)
+        return {'sredina': self.ocena(YtotalRs / self.N, SYtotalRs / self.N, naziv='sredina'),
+                'total': self.ocena(YtotalRs, SYtotalRs, parametar=self.Ytotal, naziv='total'),
+                'sredinaKombinovana': self.ocena(YtotalRc / self.N, SYtotalRc / self.N, naziv='sredinaKombinovana'),
+                'totalKombinovana': self.ocena(YtotalRc, SYtotalRc, parametar=self.Ytotal, naziv='totalKombinovana')}
+
+    @meri
+    def regresionaOcena(self, alfa = 0.1):
+        '''Regresione ocene sredine i totala Y: za prost uzorak ONK model sa eliminacijom neznačajnih
+        promenljivih (kao PSU.regresionaOcena, nivo alfa), za stratifikovan posebna regresiona ocena po
+        stratumima (kao SSU.regresionaOcena; alfa se ne koristi).'''
+        if self.stratumi is None:
+            model = ONK.eliminacija(self.modelONK, self.kolone, alfa)
+            izbor = np.array([self.kolone.index(kol) for kol in model.kolone])
+            ybarlr, Sylrs = jezgro.regresionaOcenaIzSuma(self._gram, self._kolone, self.n, izbor, self.Xm[izbor],
+                                                         model.b, self.Ym, self.N)
+        else:
+            aktivni, (nh, xbarh, ybarh, Sx2h, S2h, Sxyh) = self._momenti()
+            Nh = self.Nh[aktivni]
+            _, ybarlr, Sylrs = jezgro.regresionaPoStratumima(Nh, nh, self.N, ybarh, Sxyh / Sx2h, self.Xh[aktivni] / Nh,
+                                                             xbarh, S2h, Sxyh / np.sqrt(Sx2h * S2h))
+        return {'sredina': self.ocena(ybarlr, Sylrs, naziv='sredina'),
+                'total': self.ocena(self.N * ybarlr, self.N * Sylrs, parametar=self.Ytotal, naziv='total')}
+
+    def __repr__(self):
+        return f"InkrementalniUzorak | n={self.n} | N={self.N} | stratumi={self.stratumi}"
@@ -0,0 +1,232 @@
+import os
+import numpy as np
+import pandas as pd
+from klase.ocene import Ocena
+
+PODACI = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'podaci')
+
+STAROSNE_GRUPE = ['15–19', '20–24', '25–29', '30–34', '35–39', '40–44', '45–49', '50–54', '55–59', '60–64']
+
+OBRAZOVANJE = {
+    'Bez školske spreme': 'Osnovno skola ili manje',
+    'Nepotpuno osnovno obrazovanje': 'Osnovno skola ili manje',
+    'Osnovno obrazovanje': 'Osnovno skola ili manje',
+    'Srednje obrazovanje - svega': 'Srednja skola',
+    'Više obrazovanje': 'Visoko obrazovanje',
+    'Visoko obrazovanje': 'Visoko obrazovanje'
+}
+
+
+def ucitajRegionPol(putanja = None):
+    '''Broj stanovnika 2007. po regionu, polu i petogodišnjim starosnim grupama (podaci/regionPol2007.csv).
+
+    Rezultat:
+    ----------
+    pd.Series
+        Totali sa MultiIndex-om (region, zene, starosnaGrupa).'''
+    putanja = os.path.join(PODACI, 'regionPol2007.csv') if putanja is None else putanja
+    regPol = pd.read_csv(putanja, index_col=0, encoding='utf-8-sig')
+    regPol.index = regPol.index.to_series().ffill()
+    regPol.index.name = 'region'
+    regPol = regPol.rename(columns={'Starosne grupe': 'starosnaGrupa'}).set_index('starosnaGrupa', append=True)
+    totali = regPol.stack()
+    totali.index = totali.index.set_names('zene', level=2).reorder_levels(['region', 'zene', 'starosnaGrupa'])
+    return totali.astype(float).sort_index()
+
+
+def ucitajObrazovanje(putanja = None):
+    '''Broj stanovnika po školskoj spremi (popis 2011, podaci/stanovnistvoPoObrazovanju2011.csv), grupisan u kategorije obr3.'''
+    putanja = os.path.join(PODACI, 'stanovnistvoPoObrazovanju2011.csv') if putanja is None else putanja
+    skola = pd.read_csv(putanja, index_col=0, encoding='utf-8-sig').iloc[:, 0]
+    totali = skola.groupby(skola.index.map(OBRAZOVANJE)).sum().astype(float)
+    totali.index.name = 'obr3'
+    return totali
+
+
+def dodajStarosneGrupe(df):
+    '''Kopija DataFrame-a sa kolonom 'starosnaGrupa' (petogodišnje grupe od 15 do 64 godine) izvedenom iz 'starost'.'''
+    df = df.copy()
+    df['starosnaGrupa'] = pd.cut(df['starost'], bins=range(15, 70, 5), right=False, labels=STAROSNE_GRUPE)
+    return df
+
+
+def podrazumevaneMargine():
+    '''Margine za kalibraciju iz foldera podaci: region x pol, starosne grupe i obrazovanje (obr3).'''
+    regPol = ucitajRegionPol()
+    return [(['region', 'zene'], regPol.groupby(level=['region', 'zene']).sum()),
+            (['starosnaGrupa'], regPol.groupby(level='starosnaGrupa').sum()),
+            (['obr3'], ucitajObrazovanje())]
+
+
+class Kalibracija:
+    '''Kalibracija težina uzorka na poznate margine populacije.
+
+    Svaka margina je par (kolone, totali): totali su indeksirani kategorijama kolone (ili
+    MultiIndex-om za ukrštanje više kolona). Kategorije uzorka se jednom kodiraju celim
+    brojevima, pa se sve sume po marginama računaju sa np.bincount, bez matrice indikatora.
+
+    Parametri
+    ----------
+    uzorak : pd.DataFrame
+        Jedinice uzorka sa kolonama koje se javljaju u marginama.
+    margine : list[tuple[list[str], pd.Series]]
+        Margine populacije.
+    d : array-like, opciono
+        Početne (dizajn) težine; podrazumevano su sve jednake. Pre kalibracije se srazmerno
+        svode na ukupan broj jedinica iz margina, pa granice odnosa w / d imaju smisla.
+    normalizuj : bool, opciono
+        Da li svesti totale svih margina na total prve (margine iz različitih izvora,
+        npr. procena 2007. i popis 2011, nemaju isti ukupan broj stanovnika).'''
+    def __init__(self, uzorak, margine, d = None, normalizuj = True):
+        self.n = len(uzorak)
+        d = np.ones(self.n) if d is None else np.asarray(d, dtype=float)
+        self.kodovi, self.ciljevi, self.nazivi = [], [], []
+        for kolone, totali in margine:
+            kolone = [kolone] if isinstance(kolone, str) else list(kolone)
+            kljuc = uzorak[kolone[0]] if len(kolone) == 1 else pd.MultiIndex.from_frame(uzorak[kolone].astype(object))
+            kod = totali.index.get_indexer(kljuc)
+            if (kod < 0).any():
+                raise ValueError(f'Uzorak sadrži kategorije {kolone} kojih nema u margini')
+            prazne = np.bincount(kod, minlength=len(totali)) == 0
+            if (prazne & (totali.to_numpy() > 0)).any():
+                raise ValueError(f'Neke kategorije margine {kolone} nemaju nijednu jedinicu u uzorku: {list(totali.index[prazne])}')
+            self.kodovi.append(kod)
+            self.ciljevi.append(totali.to_numpy(dtype=float))
+            self.nazivi.append(totali.index)
+        if normalizuj:
+            N = self.ciljevi[0].sum()
+            self.ciljevi = [c * N / c.sum() for c in self.ciljevi]
+        self.N = self.ciljevi[0].sum()
+        self.d = d * self.N / d.sum()
+        self.velicine = [len(c) for c in self.ciljevi]
+        self.iteracije = None
+
+    def totali(self, w):
+        '''Ponderisani totali uzorka po svim marginama.'''
+        return [np.bincount(kod, weights=w, minlength=K) for kod, K in zip(self.kodovi, self.velicine)]
+
+    def odstupanje(self, w):
+        '''Najveće relativno odstupanje ponderisanih totala od ciljnih.'''
+        return max(np.max(np.abs(t - c) / np.maximum(c, 1)) for t, c in zip(self.totali(w), self.ciljevi))
+
+    def raking(self, maxIter = 1000, tol = 1e-10):
+        '''Iterativno proporcionalno prilagođavanje (IPF): težine se redom množe odnosom ciljnog i
+        ostvarenog totala svake margine, dok sve margine ne budu zadovoljene.
+
+        Rezultat:
+        ----------
+        np.ndarray
+            Kalibrisane težine.'''
+        w = self.d.copy()
+        for i in range(maxIter):
+            odstupanje = 0.0
+            for kod, cilj, K in zip(self.kodovi, self.ciljevi, self.velicine):
+                ostvareno = np.bincount(kod, weights=w, minlength=K)
+                odstupanje = max(odstupanje, np.max(np.abs(ostvareno - cilj) / np.maximum(cilj, 1)))
+                w *= np.divide(cilj, ostvareno, out=np.ones(K), where=ostvareno > 0)[kod]
+            if odstupanje < tol:
+                self.iteracije = i + 1
+                return w
+        raise ValueError(f'Raking nije konvergirao posle {maxIter} iteracija')
+
+    def _gram(self, v):
+        '''Matrica X' diag(v) X za indikatore svih margina, sastavljena od ukrštenih suma (np.bincount).'''
+        pocetak = np.concatenate([[0], np.cumsum(self.velicine)])
+        J = np.zeros((pocetak[-1], pocetak[-1]))
+        for a, (ka, Ka) in enumerate(zip(self.kodovi, self.velicine)):
+            for b, (kb, Kb) in enumerate(zip(self.kodovi, self.velicine)):
+                if b < a:
+                    continue
+                blok = np.bincount(ka * Kb + kb, weights=v, minlength=Ka * Kb).reshape(Ka, Kb)
+                J[pocetak[a]:pocetak[a + 1], pocetak[b]:pocetak[b + 1]] = blok
+                J[pocetak[b]:pocetak[b + 1], pocetak[a]:pocetak[a + 1]] = blok.T
+        return J
+
+    def _linearno(self, lam):
+        '''X lambda za indikatore margina (zbir koeficijenata kategorija kojima jedinica pripada).'''
+        pocetak = np.concatenate([[0], np.cumsum(self.velicine)])
+        return sum(lam[pocetak[m]:pocetak[m + 1]][kod] for m, kod in enumerate(self.kodovi))
+
+    def greg(self, metod = 'linearna', granice = (0.01, 100.0), maxIter = 100, tol = 1e-10):
+        '''GREG kalibracija (Deville i Särndal): težine w = d F(X lambda), sa lambda koje minimizuje
+        konveksnu dualnu funkciju sum(d G(X lambda)) - lambda' t (G' = F). Njutnov korak se skraćuje
+        polovljenjem dok dualna funkcija ne opadne dovoljno (Armijo), pa se korak koji je ne smanjuje
+        nikad ne prihvata.
+
+        Parametri:
+        ----------
+        metod : str
+            'linearna' (F(u) = 1 + u, jedan korak) ili 'logit' (odnos w / d ograničen na granice).
+        granice : tuple[float, float], opciono
+            Donja i gornja granica odnosa w / d za logit metod. Za uske granice rešenje ne mora
+            postojati: na TU uzorcima od 300 do 1500 jedinica i podrazumevanim marginama potrebni
+            odnosi sežu od oko 0.1-0.2 do 10-50, pa (0.3, 3) i često (0.05, 20) nemaju rešenje.
+
+        Rezultat:
+        ----------
+        np.ndarray
+            Kalibrisane težine.'''
+        L, U = granice
+        if metod == 'logit' and not L < 1 < U:
+            raise ValueError('Granice moraju zadovoljavati L < 1 < U')
+        if metod not in ('linearna', 'logit'):
+            raise ValueError(f'Nepoznat metod kalibracije: {metod}')
+        A = (U - L) / ((1 - L) * (U - 1))
+        c = np.log((1 - L) / (U - 1)) if metod == 'logit' else 0.0
+
+        def F(u):
+            '''F(u), F'(u) i G(u) = integral F od 0 do u; za logit F(u) = L + (U - L) s(A u + c), s logistička.'''
+            if metod == 'linearna':
+                return 1 + u, np.ones_like(u), u + np.square(u) / 2
+            z = A * u + c
+            s = np.exp(-np.logaddexp(0, -z))
+            G = L * u + (U - L) / A * (np.logaddexp(0, z) - np.logaddexp(0, c))
+            return L + (U - L) * s, A * (U - L) * s * (1 - s), G
+
+        cilj = np.concatenate(self.ciljevi)
+
+        def dual(lam):
+            f, df, G = F(self._linearno(lam))
+            w = self.d * f
+            return self.d @ G - lam @ cilj, w, df, cilj - np.concatenate(self.totali(w))
+
+        lam = np.zeros(len(cilj))
+        vrednost, w, df, r = dual(lam)
+        for i in range(maxIter):
+            if np.max(np.abs(r) / np.maximum(cilj, 1)) < tol:
+                self.iteracije = i + 1
+                return w
+            korak = np.linalg.pinv(self._gram(self.d * df)) @ r
+            nagib = r @ korak
+            t = 1.0
+            while True:
+                novo = dual(lam + t * korak)
+                if novo[0] <= vrednost - 1e-4 * t * nagib:
+                    break
+                t /= 2
+                if t < 1e-12:
+                    raise ValueError('Kalibracija nije konvergirala: korak ne smanjuje dualnu funkciju (granice su možda preuske)')
+            lam = lam + t * korak
+            vrednost, w, df, r = novo
+        raise ValueError(f'Kalibracija nije konvergirala posle {maxIter} iteracija (granice su možda preuske)')
+
+    def ocena(self, y, w, f = 0.0, alfa = [0.1, 0.05, 0.01], parametar = np.nan):
+        '''Ocene totala i sredine y sa kalibrisanim težinama.
+
+        Standardna greška se računa iz reziduala ponderisane regresije y na indikatore margina
+        (linearizacija GREG ocene), kao za prost slučajan uzorak sa korekcijom (1 - f).
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'total' i 'sredina'.'''
+        y = np.asarray(y, dtype=float)
+        xy = np.concatenate([np.bincount(kod, weights=w * y, minlength=K) for kod, K in zip(self.kodovi, self.velicine)])
+        b = np.linalg.pinv(self._gram(w)) @ xy
+        e = y - self._linearno(b)
+        we = w * e
+        V = (1 - f) * self.n / (self.n - 1) * np.sum(np.square(we - we.mean()))
+        Nkapa = w.sum()
+        total = w @ y
+        return {'total': Ocena.izracunaj('total', total, np.sqrt(V), alfa, self.n - 1),
+                'sredina': Ocena.izracunaj('sredina', total / Nkapa, np.sqrt(V) / Nkapa, alfa, self.n - 1, parametar)}
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+
+def _let(pi, A, rng, eps = 1e-10):
+    '''Brza faza leta metoda kocke (Chauvet i Tillé) nad jedinicama čije verovatnoće nisu cele.
+
+    Svaki korak radi sa malom podmatricom od p + 1 jedinica (p je broj balansnih promenljivih):
+    nalazi se vektor u iz jezgra matrice A' tih jedinica i verovatnoće se slučajno pomeraju duž u
+    (tako da je očekivanje nepromenjeno) dok bar jedna ne postane 0 ili 1. Pošto pomeraji na
+    disjunktnim grupama čuvaju balans nezavisno jedan od drugog, u svakom krugu se sve necele
+    jedinice dele u grupe od p + 1 i svi koraci se računaju odjednom: vektor jezgra je poslednja kolona
+    Q iz potpune QR dekompozicije podmatrice, što važi i kada podmatrica nije punog ranga. Menja pi na mestu.'''
+    p = A.shape[1]
+    while True:
+        neceli = rng.permutation(np.flatnonzero((pi > eps) & (pi < 1 - eps)))
+        if p == 0:
+            pi[neceli] = rng.random(len(neceli)) < pi[neceli]
+            return pi
+        K = len(neceli) // (p + 1)
+        if K == 0:
+            return pi
+        grupe = neceli[:K * (p + 1)].reshape(K, p + 1)
+        u = np.linalg.qr(A[grupe], mode='complete')[0][:, :, -1]
+        pr = pi[grupe]
+        poz, neg = u > eps, u < -eps
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lam1 = np.minimum(np.where(poz, (1 - pr) / u, np.inf).min(axis=1), np.where(neg, pr / -u, np.inf).min(axis=1))
+            lam2 = np.minimum(np.where(poz, pr / u, np.inf).min(axis=1), np.where(neg, (1 - pr) / -u, np.inf).min(axis=1))
+        gore = rng.random(K) < lam2 / (lam1 + lam2)
+        pr = pr + np.where(gore, lam1, -lam2)[:, None] * u
+        pr[pr < eps] = 0.0
+        pr[pr > 1 - eps] = 1.0
+        pi[grupe] = pr
+
+
+def kocka(pi, X, seed = 42):
+    '''Balansirani uzorak metodom kocke: brza faza leta, pa sletanje izostavljanjem balansnih promenljivih.
+
+    Horvic-Tompsonovi totali kolona X u izabranom uzorku (tačno ili približno, do zaokruživanja
+    u fazi sletanja) jednaki su totalima populacije. Verovatnoće pi se uvek dodaju kao prva
+    balansna promenljiva, pa je obim uzorka fiksan.
+
+    Parametri:
+    ----------
+    pi : array-like
+        Verovatnoće uključivanja.
+    X : array-like
+        Matrica balansnih promenljivih (N x p).
+    seed : int, opciono
+        Seed za reprodukciju.
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Logička maska izabranih jedinica.'''
+    rng = np.random.default_rng(seed)
+    pi = np.asarray(pi, dtype=float).copy()
+    X = np.asarray(X, dtype=float)
+    X = X[:, None] if X.ndim == 1 else X
+    A = np.column_stack([pi, X]) / pi[:, None]
+    for q in range(A.shape[1], -1, -1):
+        pi = _let(pi, A[:, :q], rng)
+    return pi > 0.5
+
+
+def balansneProm(df, pomocne = ['obrazovanje', 'starost'], kategorije = ['region', 'urban']):
+    '''Matrica balansnih promenljivih: numeričke pomoćne promenljive i indikatori svih kategorija.'''
+    delovi = [df[pomocne].astype(float)] + [pd.get_dummies(df[kat], prefix=kat, dtype=float) for kat in kategorije]
+    return pd.concat(delovi, axis=1)
+
+
+def balansiraniUzorak(df, n, pomocne = ['obrazovanje', 'starost'], kategorije = ['region', 'urban'], seed = 42):
+    '''Balansirani uzorak jednakih verovatnoća n / N, koji se može proslediti klasi PSU (parametar uzorak).
+
+    Parametri:
+    ----------
+    df : pd.DataFrame
+        Populacija.
+    n : int
+        Obim uzorka.
+    pomocne : list[str], opciono
+        Numeričke promenljive čiji se totali balansiraju.
+    kategorije : list[str], opciono
+        Kategorijske promenljive čije se frekvencije balansiraju.
+    seed : int, opciono
+        Seed za reprodukciju.
+
+    Rezultat:
+    ----------
+    pd.Index
+        Indeksi izabranih jedinica.'''
+    pi = np.full(len(df), n / len(df))
+    maska = kocka(pi, balansneProm(df, pomocne, kategorije).to_numpy(), seed=seed)
+    return df.index[maska]
+
+
+def balans(df, uzorak, pomocne = ['obrazovanje', 'starost'], kategorije = ['region', 'urban']):
+    '''Poređenje totala balansnih promenljivih u populaciji i njihovih ocena iz uzorka jednakih verovatnoća.'''
+    X = balansneProm(df, pomocne, kategorije)
+    populacija = X.sum()
+    ocena = X.loc[uzorak].sum() * len(df) / len(uzorak)
+    return pd.DataFrame({'Populacija': populacija, 'Ocena iz uzorka': ocena,
+                         'Relativna razlika (%)': (ocena / populacija - 1) * 100})
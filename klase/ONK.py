@@ -1,4 +1,104 @@
 from klase.funkcije import *
+from klase.instrumentacija import meri, broji, raspon
+from klase import jezgro
+from klase.memo import Memo, otisak
+from functools import lru_cache
+from typing import NamedTuple
+
+MODELI = Memo(256 * 2**20)
+
+
+@lru_cache(maxsize=1024)
+def kriticnaT(alfa, stepeni):
+    '''Dvostrana kritična vrednost Studentove raspodele za nivo značajnosti alfa.'''
+    return abs(stats.t.ppf(alfa / 2, stepeni))
+
+
+class Model(NamedTuple):
+    '''Nepromenljiv rezultat ONK ocene: nazivi kolona matrice dizajna, koeficijenti, standardne greške
+    i t statistike (nizovi samo za čitanje), ocena varijanse greške, broj opservacija, stepeni slobode
+    za kritične vrednosti i naziv zavisne promenljive.'''
+    kolone: tuple
+    b: np.ndarray
+    bstd: np.ndarray
+    tstat: np.ndarray
+    sigma2: float
+    m: int
+    stepeni: int
+    zavisna: str = None
+
+    @classmethod
+    def izNizova(cls, kolone, rez, m, stepeni, zavisna = None):
+        '''Model iz jezgro.OnkRezultat; nizovi se zaključavaju za upis.'''
+        nizovi = []
+        for niz in (rez.b, rez.bstd, rez.tstat):
+            niz = np.array(niz, dtype=float)
+            niz.setflags(write=False)
+            nizovi.append(niz)
+        return cls(tuple(kolone), *nizovi, rez.sigma2, int(m), int(stepeni), zavisna)
+
+    def kriticna(self, alfa):
+        '''Kritična t vrednost za nivo značajnosti alfa.'''
+        return kriticnaT(alfa, self.stepeni)
+
+    @property
+    def koeficijenti(self):
+        '''Koeficijenti kao pd.Series (nova kopija).'''
+        return pd.Series(self.b, index=list(self.kolone))
+
+    @property
+    def tabela(self):
+        '''Koeficijenti, standardne greške, t statistike i oznake značajnosti (kao rezultat fit).'''
+        sig = jezgro.zvezdice(self.tstat, [self.kriticna(a) for a in [.1, .05, .01]])
+        return pd.DataFrame({'koeficijent': self.b, 'std': self.bstd, 't': self.tstat, 'sig': sig},
+                            index=list(self.kolone))
+
+    def predict(self, x):
+        '''Predikcije za matricu dizajna x (kolone se biraju po nazivu), kao pd.Series.'''
+        return pd.Series(x[list(self.kolone)].to_numpy(dtype=float) @ self.b, index=x.index)
+
+    @property
+    def matOblik(self):
+        '''Regresiona jednačina u tekstualnom obliku (kao ONK.matOblik).'''
+        clanovi = [form(koef) if kol.lower() == 'const' else f'{form(koef)} *{kol}' for kol, koef in zip(self.kolone, self.b)]
+        return f"{self.zavisna} = " + " + ".join(clanovi)
+
+
+
+class RidgePutanja(NamedTuple):
+    '''Ridge ocene za niz kazni λ iz jednog SVD-a: koeficijenti (red za svaku kaznu, kolone matrice dizajna,
+    u originalnoj skali), efektivni stepeni slobode, suma kvadrata ostataka i GCV.'''
+    lambde: np.ndarray
+    koeficijenti: pd.DataFrame
+    stepeni: np.ndarray
+    rss: np.ndarray
+    gcv: np.ndarray
+
+    @property
+    def najbolja(self):
+        '''Kazna sa najmanjim GCV.'''
+        return self.lambde[np.nanargmin(self.gcv)]
+
+    @property
+    def koeficijentiNajbolje(self):
+        '''Koeficijenti za kaznu sa najmanjim GCV, kao pd.Series.'''
+        return self.koeficijenti.iloc[np.nanargmin(self.gcv)]
+
+    @property
+    def tabela(self):
+        '''Stepeni slobode, RSS i GCV po kaznama.'''
+        return pd.DataFrame({'stepeni': self.stepeni, 'rss': self.rss, 'gcv': self.gcv},
+                            index=pd.Index(self.lambde, name='lambda'))
+
+
+
+class IzborPodskupa(NamedTuple):
+    '''Rezultat pretrage svih podskupova: tabela najboljih modela (po kriterijumu), ocenjen najbolji model
+    i broj obiđenih podskupova.'''
+    tabela: pd.DataFrame
+    model: Model
+    cvorova: int
+
 
 class ONK:
     ''' Klasa za regresionu analizu metodom običnih najmanjih kvadrata (ONK).'''
@@ -18,10 +118,221 @@ class ONK:
                 if a < 0 or a > 1:
                     raise ValueError('Alfa mora biti izmedju 1 i 0')
             self.alfa = sorted(set(default + list(alfa)))
-        for attr in ['x', 'y', 'm', 'n', 'b', 'bstd', 'tstat']:
+        for attr in ['x', 'y', 'm', 'n', 'b', 'bstd', 'tstat', 'rezultat']:
             setattr(self, attr, None)
         
 
+    @staticmethod
+    def dizajn(x, konstanta = True, kategorije = None):
+        '''Matrica dizajna za x, bez izmene objekta: veštačke promenljive (ako x sadrži kategorijske
+        kolone), realan tip i slobodan član. Rezultat se pamti u ONK.MODELI, a pozivaocu se vraća plitka
+        kopija (copy-on-write), pa njene izmene ne menjaju zapamćenu matricu.'''
+        kljuc = ('dizajn', otisak(x), konstanta, None if kategorije is None else tuple(kategorije))
+        X = MODELI.uzmi(kljuc)
+        if X is not None:
+            return X.copy(deep=False)
+        broji('kopirani redovi', len(x))
+        X = x.to_frame() if isinstance(x, pd.Series) else x.copy()
+        if any(kat in X.columns for kat in ['region', 'zene', 'urban', 'obr3']):
+            X = ONK().vestacke(kategorije, X).astype(float)
+        if konstanta and 'const' not in X.columns:
+            X.insert(0, 'const', 1)
+        return MODELI.zapamti(kljuc, X).copy(deep=False)
+
+    @staticmethod
+    @meri
+    def oceni(x, y, konstanta = True, kategorije = None):
+        '''Ocena modela bez izmene objekta; rezultat je nepromenljiv (Model) i pamti se u ONK.MODELI,
+        pa se ista ocena bezbedno deli između objekata i niti.
+
+        Parametri su isti kao za fit.
+
+        Rezultat:
+        ----------
+        Model'''
+        kljuc = ('oceni', otisak(x, y), konstanta, None if kategorije is None else tuple(kategorije))
+        model = MODELI.uzmi(kljuc)
+        if model is not None:
+            broji('ONK.fit iz memorije')
+            return model
+        broji('ONK.fit')
+        X = ONK.dizajn(x, konstanta, kategorije)
+        with raspon('ONK.inverzija'):
+            rez = jezgro.onk(X.to_numpy(dtype=float), y.to_numpy(dtype=float))
+        stepeni = len(X) - (x.shape[1] if x.ndim > 1 else 1)
+        return MODELI.zapamti(kljuc, Model.izNizova(X.columns, rez, len(X), stepeni, y.name))
+
+    @staticmethod
+    @meri
+    def oceniSig(x, y, alfa = 0.1, prikaz = False):
+        '''Iterativna eliminacija statistički neznačajnih promenljivih (kao fitsig), bez izmene objekta.
+
+        Rezultat:
+        ----------
+        Model'''
+        X = ONK.dizajn(x)
+        return ONK.eliminacija(lambda kolone: ONK.oceni(X.loc[:, kolone], y), list(X.columns), alfa, prikaz)
+
+    @staticmethod
+    def eliminacija(oceni, kolone, alfa = 0.1, prikaz = False):
+        '''Pravilo eliminacije iz fitsig nad proizvoljnim načinom ocenjivanja.
+
+        Redom se izbacuje prva neznačajna promenljiva koja nije region ni slobodan član i model se
+        ponovo ocenjuje; na kraju se izbacuju veštačke promenljive regiona ako postoje i sve su neznačajne.
+
+        Parametri:
+        ----------
+        oceni : callable
+            oceni(kolone) -> Model za zadati podskup kolona matrice dizajna.
+        kolone : list[str]
+            Početne kolone matrice dizajna.
+
+        Rezultat:
+        ----------
+        Model'''
+        while True:
+            broji('ONK.fitsig refit')
+            model = oceni(kolone)
+            kriticna = model.kriticna(alfa)
+            indeks = pd.Index(model.kolone)
+            region = indeks.str.contains('region')
+            maska = ~region & ~indeks.str.contains('const')
+            neznacajne = np.flatnonzero(maska & (np.abs(model.tstat) < kriticna))
+            if len(neznacajne):
+                i = neznacajne[0]
+                if prikaz:
+                    print(f'Promenjiva {indeks[i]} je statisticki neznacajna, t vrednost:\n{model.tstat[i]}')
+                kolone = [kol for kol in kolone if kol != indeks[i]]
+                continue
+            if region.any() and (np.abs(model.tstat[region]) < kriticna).all():
+                if prikaz:
+                    print(f'Regioni su statisticki neznacajni t statistike :\n {pd.Series(model.tstat[region], index=indeks[region])}')
+                return oceni(list(indeks[~region]))
+            return model
+
+    @staticmethod
+    @meri
+    def ridge(x, y, lambde = None, konstanta = True, kategorije = None, standardizuj = True):
+        '''Ridge (regularizovana) regresija za ceo niz kazni iz jednog SVD-a matrice dizajna.
+
+        Matrica dizajna je ista kao za fit (veštačke promenljive, slobodan član). Slobodan član se ne
+        kažnjava, a kolone se pre kažnjavanja standardizuju. SVD se pamti u ONK.MODELI, pa nova mreža
+        kazni za iste podatke ne zahteva novo rastavljanje. Kazna se bira minimumom GCV (RidgePutanja.najbolja).
+
+        Parametri:
+        ----------
+        x : pd.DataFrame
+            Matrica nezavisnih promenljivih.
+        y : pd.Series
+            Zavisna promenljiva.
+        lambde : array-like, opciono
+            Kazne; podrazumevano 200 logaritamski raspoređenih vrednosti od 10^-4 d₁² do 10^3 d₁²
+            (d₁ je najveća singularna vrednost).
+        konstanta : bool, opciono
+            Da li uključiti (nekažnjen) slobodan član.
+        kategorije : list[str], opciono
+            Kategorijske promenljive za veštačke varijable.
+        standardizuj : bool, opciono
+            Da li se kažnjavaju standardizovani koeficijenti.
+
+        Rezultat:
+        ----------
+        RidgePutanja'''
+        X = ONK.dizajn(x, konstanta, kategorije)
+        regresori = [kol for kol in X.columns if kol != 'const']
+        centriraj = 'const' in X.columns
+        kljuc = ('ridge', otisak(X, y), standardizuj)
+        rastav = MODELI.uzmi(kljuc)
+        if rastav is None:
+            with raspon('ONK.svd'):
+                rastav = MODELI.zapamti(kljuc, jezgro.ridgeRastav(X[regresori].to_numpy(dtype=float),
+                                                                  y.to_numpy(dtype=float), centriraj, standardizuj))
+        if lambde is None:
+            lambde = np.logspace(-4, 3, 200) * (rastav.d[0]**2 if len(rastav.d) else 1.0)
+        lambde = np.atleast_1d(np.asarray(lambde, dtype=float))
+        if (lambde < 0).any():
+            raise ValueError('Kazne moraju biti nenegativne')
+        b0, B, stepeni, rss, gcv = jezgro.ridgePutanja(rastav, lambde)
+        koeficijenti = pd.DataFrame(B, index=pd.Index(lambde, name='lambda'), columns=regresori)
+        if centriraj:
+            koeficijenti.insert(0, 'const', b0)
+        return RidgePutanja(lambde, koeficijenti, stepeni, rss, gcv)
+
+    @staticmethod
+    @meri
+    def najboljiPodskup(x, y, kriterijum = 'BIC', kategorije = None, obavezni = None, najboljih = 1):
+        '''Tačan izbor podskupa regresora pretragom svih podskupova (grananje i ograničavanje nad Gramovom
+        matricom, vidi jezgro.najboljiPodskupovi), nezavisno od redosleda kolona.
+
+        Članovi modela su nekategorijske kolone i cele grupe veštačkih promenljivih (npr. sve region_*
+        kolone su jedan član); slobodan član je uvek u modelu. Za svaki broj parametara nalazi se
+        podskup sa najmanjom sumom kvadrata ostataka, pa su najbolji i po AIC, BIC i prilagođenom R².
+
+        Parametri:
+        ----------
+        x : pd.DataFrame
+            Matrica nezavisnih promenljivih.
+        y : pd.Series
+            Zavisna promenljiva.
+        kriterijum : str, opciono
+            'AIC', 'BIC' ili 'R2 prilagodjen'; određuje redosled tabele i izabrani model.
+        kategorije : list[str], opciono
+            Kategorijske promenljive (veštačke promenljive jedne kategorije čine jedan član).
+        obavezni : list[str], opciono
+            Članovi koji su uvek u modelu.
+        najboljih : int, opciono
+            Broj najboljih podskupova za svaki broj parametara.
+
+        Rezultat:
+        ----------
+        IzborPodskupa'''
+        if kriterijum not in ('AIC', 'BIC', 'R2 prilagodjen'):
+            raise ValueError("kriterijum mora biti 'AIC', 'BIC' ili 'R2 prilagodjen'")
+        X = ONK.dizajn(x, True, kategorije)
+        kolone = list(X.columns)
+        grupe = {}
+        for j, kol in enumerate(kolone):
+            if kol != 'const':
+                clan = next((kat for kat in kategorije or [] if kol.startswith(f'{kat}_')), kol)
+                grupe.setdefault(clan, []).append(j)
+        obavezni = set(obavezni or [])
+        if obavezni - set(grupe):
+            raise ValueError(f'Nepoznati članovi modela: {sorted(obavezni - set(grupe))}')
+        fiksne = [kolone.index('const')] + [j for clan in obavezni for j in grupe[clan]]
+        nazivi = [clan for clan in grupe if clan not in obavezni]
+
+        Z = np.column_stack([X.to_numpy(dtype=float), y.to_numpy(dtype=float)])
+        G = Z.T @ Z
+        with raspon('ONK.podskupovi'):
+            modeli, cvorova = jezgro.najboljiPodskupovi(G, [grupe[clan] for clan in nazivi], fiksne, najboljih)
+        m = len(y)
+        TSS = G[-1, -1] - G[fiksne[0], -1]**2 / m
+        rss = np.array([rss for rss, _, _ in modeli])
+        p = np.array([p for _, p, _ in modeli])
+        tabela = pd.DataFrame({
+            'clanovi': [tuple(sorted(obavezni)) + tuple(nazivi[c] for c in clanovi) for _, _, clanovi in modeli],
+            'parametara': p,
+            'rss': rss,
+            'R2': 1 - rss / TSS,
+            'R2 prilagodjen': 1 - (rss / TSS) * (m - 1) / (m - p),
+            'AIC': m * np.log(rss / m) + 2 * p,
+            'BIC': m * np.log(rss / m) + p * np.log(m)})
+        tabela = tabela.sort_values(kriterijum, ascending=kriterijum != 'R2 prilagodjen', ignore_index=True)
+        izabrani = sorted(fiksne[:1] + [j for clan in tabela['clanovi'].iloc[0] for j in grupe[clan]])
+        return IzborPodskupa(tabela, ONK.oceni(X.iloc[:, izabrani], y), cvorova)
+
+    def _postavi(self, model, X, y):
+        self.x = X
+        self.y = y
+        self.m = model.m
+        self.n = len(model.kolone)
+        self.t = {a: model.kriticna(a) for a in self.alfa}
+        self.b = model.koeficijenti
+        self.bstd = pd.Series(model.bstd, index=model.kolone)
+        self.tstat = pd.Series(model.tstat, index=model.kolone)
+        self.rezultat = model
+
+    @meri
     def fit(self,x ,y, konstanta = True, kategorije = None):
         '''
         Trenira regresioni model metodom običnih najmanjih kvadrata.
@@ -42,38 +353,12 @@ class ONK:
         pd.DataFrame
             Tabela sa koeficijentima, standardnim greškama i t-statistikama.
         '''
-        self.x = x.copy()
-        self.y = y.copy()
-        self.m = self.x.shape[0]
-        self.n = self.x.shape[1]
-        self.t = {a : abs(stats.t.ppf( a / 2, self.m - self.n)) for a in self.alfa}
-
-
-        if any(kat in self.x.columns for kat in ['region', 'zene', 'urban', 'obr3']):
-            self.vestacke(kategorije)
-            self.x = self.x.astype(float)
-        
-        if konstanta and 'const' not in self.x.columns:
-            self.x.insert(0,'const',1)
-        
-        self.n = self.x.shape[1]
-
-    
-        self.b = pd.Series(np.linalg.inv(self.x.T @ self.x) @ (self.x.T @ self.y), index = self.x.columns)
-        ykappa = self.x @ self.b
-        res = self.y - ykappa
-        sigma2 = res.T @ res / (self.m - self.n)
-        self.bstd = pd.Series(np.sqrt(np.diag(np.linalg.inv(self.x.T @ self.x) * sigma2)),index = self.x.columns)
-        self.tstat = pd.Series(self.b / self.bstd, index = self.x.columns)
-   
-    
-        sig = self.tstat.apply(lambda t:  "*" * sum(abs(t) >= self.t[a] for a in [.1, .05, .01]) if abs(t) > self.t[0.1] else '')
- 
-        model = pd.concat([self.b,self.bstd,self.tstat, sig],axis = 1)
-        model.columns = ['koeficijent', 'std', 't', 'sig']
-        return model
+        model = self.oceni(x, y, konstanta, kategorije)
+        self._postavi(model, self.dizajn(x, konstanta, kategorije), y)
+        return model.tabela
 
-    def fitsig(self, alfa = 0.1):
+    @meri
+    def fitsig(self, alfa = 0.1, prikaz = True):
         '''
         Iterativno uklanja statistički nebitne promenljive po zadatom alfa.
 
@@ -81,42 +366,24 @@ class ONK:
         ----------
         alfa : float
             Nivo značajnosti za eliminaciju promenljivih.
+        prikaz : bool, opciono
+            Da li ispisivati uklonjene promenljive.
 
         Rezultat:
         ----------
         pd.DataFrame
             Rezultujući model sa značajnim promenljivima.
         '''
-        self.fit(self.x, self.y)
-        maska = (~self.b.index.str.contains('region')) & (~self.b.index.str.contains('const'))
-        
-        for i in range(len(self.b[maska])):
-            if abs(self.tstat[maska].iloc[i]) < self.t[alfa]:
-                print(f'Promenjiva {self.b[maska].index[i]} je statisticki neznacajna, t vrednost:\n{self.tstat[maska].iloc[i]}')
-                self.x = self.x.drop(self.b[maska].index[i], axis = 1)
-                self.n = self.x.shape[1]
-                maska = (~self.b.index.str.contains('region')) & (~self.b.index.str.contains('const'))
-                return self.fitsig(alfa)
-        if (abs(self.b[~maska].drop('const') / self.bstd[~maska].drop('const')) < self.t[alfa]).all():
-            self.x = self.x.drop(x.columns[x.columns.str.startswith('region')], axis = 1)
-            self.n = x.shape[1]
-            self.b = self.b[~self.b.index.str.startswith('region')]
-            print(f'Regioni su statisticki neznacajni t statistike :\n {self.tstat[~maska].drop('const')}')
-
-        return self.fit(self.x, self.y)
+        model = self.oceniSig(self.x, self.y, alfa, prikaz)
+        self._postavi(model, self.x.loc[:, list(model.kolone)], self.y)
+        return model.tabela
         
     @property
     def matOblik (self):
         ''' Prikazuje regresionu jednačinu u tekstualnom obliku.'''
-        koeficijenti = []
-        for var,koef in self.b.items():
-            if var.lower() == 'const':
-                koeficijenti.append(f'{form(koef)}')
-            else:
-                koeficijenti.append(f'{form(koef)} *{var}')
-        jednacina = f"{self.y.name} = " + " + ".join(koeficijenti)
-        return jednacina
+        return self.rezultat.matOblik
 
+    @meri
     def predict(self, x = None, mean = False, total = False):
         '''
         Predviđa vrednosti zavisne promenljive.
@@ -136,14 +403,15 @@ class ONK:
             Predikcije zavisne promenljive.
         '''
         x = self.x if x is None else x
-        predikcija = x @ self.b
+        predikcija = x[self.b.index].to_numpy(dtype=float) @ self.b.to_numpy()
         if mean:
             return predikcija.mean()
         elif total:
             return predikcija.sum()
         else:
-            return predikcija
+            return pd.Series(predikcija, index = x.index)
 
+    @meri
     def vestacke(self, kategorije , x = None):
         '''Kreira dummy varijable za navedene kategorijske promenljive.
 
@@ -159,16 +427,88 @@ class ONK:
         ----------
         pd.DataFrame
             DataFrame sa dummy varijablama.'''
-        x = self.x if x is None else x.copy()
+        kljuc = None if x is None else ('vestacke', otisak(x), tuple(kategorije))
+        zapis = None if kljuc is None else MODELI.uzmi(kljuc)
+        if zapis is not None:
+            broji('ONK.vestacke iz memorije')
+            self.x = zapis.copy(deep=False)
+            return self.x
+        x = (self.x if x is None else x).copy()
         if 'const' not in x.columns:
             x.insert(0,'const',1)            
+        delovi = []
         for kat in kategorije:
-            for red in sorted(x[kat].unique())[1:]:
-                x[f'{kat}_{red}'] =  (x[kat] == red).astype(float)
-            x.drop(kat, axis = 1, inplace = True)
-            self.x = x
+            vrednosti = sorted(x[kat].dropna().unique())
+            kodovi = pd.Index(vrednosti).get_indexer(x[kat])
+            delovi.append(pd.DataFrame((kodovi[:, None] == np.arange(1, len(vrednosti))).astype(float),
+                                       index=x.index, columns=[f'{kat}_{red}' for red in vrednosti[1:]]))
+        self.x = pd.concat([x.drop(columns=kategorije)] + delovi, axis=1)
+        if kljuc is not None:
+            MODELI.zapamti(kljuc, self.x.copy(deep=False))
         return self.x
 
+    @meri
+    def permutacioniTest(self, kategorije = None, maxPermutacija = 10000, paket = 500, pouzdanost = 0.99, seed = 42):
+        '''Permutacione (Freedman-Lane) p vrednosti za svaki koeficijent ocenjenog modela, odnosno za celu
+        grupu veštačkih promenljivih jedne kategorije, bez pretpostavke o normalnosti reziduala.
+
+        Za svaki član ostaci redukovanog modela (bez člana) se permutuju i dodaju njegovim predviđanjima,
+        a F statistika punog modela računa se za ceo paket permutovanih odziva (paket x m) preko jedne QR
+        faktorizacije. Permutacije se dodaju po paketima dok Clopper-Pearson interval za p vrednost ne
+        isključi sve nivoe iz self.alfa (odluka je sigurna) ili dok se ne dostigne maxPermutacija.
+
+        Parametri:
+        ----------
+        kategorije : list[str], opciono
+            Kategorijske promenljive čije se veštačke promenljive testiraju zajedno
+            (podrazumevano region, zene, urban i obr3).
+        maxPermutacija : int, opciono
+            Najveći broj permutacija po članu.
+        paket : int, opciono
+            Broj permutacija koje se obrađuju odjednom.
+        pouzdanost : float, opciono
+            Nivo pouzdanosti intervala za p vrednost u pravilu zaustavljanja.
+        seed : int, opciono
+            Seed za reprodukciju.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Po član: F statistika, stepeni slobode, asimptotska p(F), permutaciona p vrednost, broj
+            permutacija i oznake značajnosti po permutacionoj p vrednosti.'''
+        if self.x is None:
+            raise ValueError('Model nije ocenjen (pozvati fit)')
+        kategorije = ['region', 'zene', 'urban', 'obr3'] if kategorije is None else kategorije
+        X = self.x.to_numpy(dtype=float)
+        y = self.y.to_numpy(dtype=float)
+        m, k = X.shape
+        clanovi = {}
+        for j, kol in enumerate(self.x.columns):
+            if kol != 'const':
+                clanovi.setdefault(next((kat for kat in kategorije if kol.startswith(f'{kat}_')), kol), []).append(j)
+        Q = np.linalg.qr(X)[0]
+        rng = np.random.default_rng(seed)
+        redovi = {}
+        for clan, izbor in clanovi.items():
+            Q0 = np.linalg.qr(np.delete(X, izbor, axis=1))[0]
+            yhat0 = Q0 @ (Q0.T @ y)
+            F = jezgro.fStatistike(Q, Q0, y, len(izbor))[0]
+            vece = permutacija = 0
+            while permutacija < maxPermutacija:
+                broj = min(paket, maxPermutacija - permutacija)
+                broji('permutacije', broj)
+                Fp = jezgro.fStatistike(Q, Q0, jezgro.permutovaniOdzivi(yhat0, y - yhat0, broj, rng), len(izbor))
+                vece += int((Fp >= F * (1 - 1e-10)).sum())
+                permutacija += broj
+                donja = stats.beta.ppf((1 - pouzdanost) / 2, vece, permutacija - vece + 1) if vece else 0.0
+                gornja = stats.beta.ppf((1 + pouzdanost) / 2, vece + 1, permutacija - vece) if vece < permutacija else 1.0
+                if not any(donja <= a <= gornja for a in self.alfa):
+                    break
+            p = (vece + 1) / (permutacija + 1)
+            redovi[clan] = {'F': F, 'stepeni': len(izbor), 'p(F)': stats.f.sf(F, len(izbor), m - k),
+                            'p': p, 'permutacija': permutacija, 'sig': '*' * sum(p < a for a in [.1, .05, .01])}
+        return pd.DataFrame.from_dict(redovi, orient='index')
+
     @property
     def pregled(self):
         '''Prikazuje tabelu sa ključnim statističkim pokazateljima modela.'''
@@ -181,7 +521,7 @@ class ONK:
         R2 = 1 - SSR / SSY
         F = (R2 / self.n) / ((1 - R2) / (self.m - self.n - 1))
         p = 1 - stats.f.cdf(F, dfn=self.n, dfd=self.m - self.n - 1)
-        JB = jb(res)
+        JB = jb(res, prikaz=True)
         
         MSE = (res ** 2).mean()
         RMSE = np.sqrt(MSE)
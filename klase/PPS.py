@@ -0,0 +1,269 @@
+import numpy as np
+from klase.ocene import Ocena
+
+
+def verovatnoceUkljucivanja(velicina, n):
+    '''Verovatnoće uključivanja proporcionalne veličini, pi_i = n x_i / sum(x), sa ograničenjem pi_i <= 1.
+
+    Jedinice kod kojih bi pi_i prešlo 1 biraju se sa sigurnošću, a preostali obim se
+    raspoređuje proporcionalno među ostalima, dok sve verovatnoće ne budu najviše 1.
+
+    Parametri:
+    ----------
+    velicina : array-like
+        Pozitivna mera veličine svake jedinice populacije (npr. satiRada).
+    n : int
+        Očekivani obim uzorka.
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Verovatnoće uključivanja, sa zbirom n.'''
+    x = np.asarray(velicina, dtype=float)
+    if (x <= 0).any():
+        raise ValueError('Mera veličine mora biti pozitivna za sve jedinice')
+    pi = np.zeros_like(x)
+    sigurni = np.zeros(len(x), dtype=bool)
+    while True:
+        ostali = ~sigurni
+        pi[ostali] = (n - sigurni.sum()) * x[ostali] / x[ostali].sum()
+        pi[sigurni] = 1.0
+        novi = ostali & (pi >= 1)
+        if not novi.any():
+            return pi
+        sigurni |= novi
+
+
+def sistematskiPPS(pi, R = None, slucajanRedosled = False, seed = 42):
+    '''Sistematski uzorak sa verovatnoćama pi (O(N) po replici).
+
+    Jedinice se nižu po kumulativnim verovatnoćama; bira se slučajan početak u iz (0, 1) i jedinice
+    u koje padaju tačke u, u + 1, ..., u + n - 1.
+
+    Parametri:
+    ----------
+    pi : np.ndarray
+        Verovatnoće uključivanja sa celobrojnim zbirom n.
+    R : int, opciono
+        Broj nezavisnih replika; ako nije zadat, bira se jedan uzorak.
+    slucajanRedosled : bool, opciono
+        Da li se pre izbora jedinice slučajno permutuju (posebno za svaku repliku).
+    seed : int, opciono
+        Seed za reprodukciju.
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Indeksi izabranih jedinica, oblika (n,) ili (R, n).'''
+    rng = np.random.default_rng(seed)
+    pi = np.asarray(pi, dtype=float)
+    n = int(round(pi.sum()))
+    k = 1 if R is None else R
+    tacke = rng.random((k, 1)) + np.arange(n)
+    if slucajanRedosled:
+        redosled = np.argsort(rng.random((k, len(pi))), axis=1)
+        C = np.cumsum(pi[redosled], axis=1)
+        C *= n / C[:, -1:]
+        pomak = n * np.arange(k)[:, None]
+        pozicije = np.searchsorted((C + pomak).ravel(), (tacke + pomak).ravel(), side='right').reshape(k, n)
+        pozicije = np.minimum(pozicije - len(pi) * np.arange(k)[:, None], len(pi) - 1)
+        izbor = np.take_along_axis(redosled, pozicije, axis=1)
+    else:
+        C = np.cumsum(pi)
+        C *= n / C[-1]
+        izbor = np.minimum(np.searchsorted(C, tacke, side='right'), len(pi) - 1)
+    return izbor[0] if R is None else izbor
+
+
+def poasonov(pi, R = None, seed = 42):
+    '''Poasonov uzorak: svaka jedinica se bira nezavisno sa verovatnoćom pi_i (obim uzorka je slučajan).
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Logička maska izabranih jedinica, oblika (N,) ili (R, N).'''
+    rng = np.random.default_rng(seed)
+    pi = np.asarray(pi, dtype=float)
+    maska = rng.random((1 if R is None else R, len(pi))) < pi
+    return maska[0] if R is None else maska
+
+
+def _logSimetricni(w, n):
+    '''Logaritmi elementarnih simetričnih polinoma težina w_k, ..., w_N stepena 0..n, za svako k (tabela (N + 1) x (n + 1)).'''
+    N = len(w)
+    logw = np.log(w)
+    logR = np.full((N + 1, n + 1), -np.inf)
+    logR[N, 0] = 0.0
+    for k in range(N - 1, -1, -1):
+        logR[k, 0] = 0.0
+        logR[k, 1:] = np.logaddexp(logw[k] + logR[k + 1, :-1], logR[k + 1, 1:])
+    return logR
+
+
+def _cpsVerovatnoce(w, n):
+    '''Verovatnoće uključivanja uslovnog Poasonovog uzorka obima n sa šansama w (rekurzija Chen, Dempster i Liu).'''
+    pi = np.zeros_like(w)
+    for k in range(1, n + 1):
+        a = w * (1 - pi)
+        pi = k * a / a.sum()
+    return np.clip(pi, 1e-300, 1)
+
+
+def uslovniPoasonovSanse(pi, tol = 1e-10, maxIter = 500):
+    '''Šanse w_i za koje uslovni Poasonov uzorak obima n = sum(pi) ima tačno verovatnoće uključivanja pi.
+
+    Računaju se iterativno, log w <- log w + log pi - log pi(w), polazeći od w = pi / (1 - pi).'''
+    pi = np.asarray(pi, dtype=float)
+    n = int(round(pi.sum()))
+    w = pi / (1 - pi)
+    for _ in range(maxIter):
+        piW = _cpsVerovatnoce(w, n)
+        if np.max(np.abs(piW - pi)) < tol:
+            break
+        w *= pi / piW
+    return w
+
+
+def uslovniPoasonov(pi, R = None, seed = 42):
+    '''Uslovni Poasonov (rejective) uzorak fiksnog obima n = sum(pi) sa verovatnoćama uključivanja pi.
+
+    Uzorak se bira sekvencijalno: jedinica k se bira sa verovatnoćom
+    w_k R(j - 1, U_{k+1}) / R(j, U_k), gde je j broj jedinica koje još treba izabrati, a R elementarni
+    simetrični polinomi šansi; tabela R računa se jednom, a sve replike se biraju istovremeno.
+    Jedinice sa pi_i = 1 uključuju se sa sigurnošću.
+
+    Parametri:
+    ----------
+    pi : np.ndarray
+        Verovatnoće uključivanja sa celobrojnim zbirom n.
+    R : int, opciono
+        Broj nezavisnih replika.
+    seed : int, opciono
+        Seed za reprodukciju.
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Indeksi izabranih jedinica, oblika (n,) ili (R, n).'''
+    rng = np.random.default_rng(seed)
+    pi = np.asarray(pi, dtype=float)
+    sigurni = pi >= 1 - 1e-12
+    ostali = np.flatnonzero(~sigurni)
+    n = int(round(pi[ostali].sum()))
+    k = 1 if R is None else R
+
+    maska = np.zeros((k, len(pi)), dtype=bool)
+    maska[:, sigurni] = True
+    if n > 0:
+        w = uslovniPoasonovSanse(pi[ostali])
+        logw = np.log(w)
+        logR = _logSimetricni(w, n)
+        preostalo = np.full(k, n)
+        for i, jedinica in enumerate(ostali):
+            j = np.maximum(preostalo, 1)
+            q = np.where(preostalo > 0, np.exp(logw[i] + logR[i + 1, j - 1] - logR[i, j]), 0.0)
+            izabran = rng.random(k) < q
+            maska[:, jedinica] = izabran
+            preostalo -= izabran
+    izbor = np.nonzero(maska)[1].reshape(k, -1)
+    return izbor[0] if R is None else izbor
+
+
+def varijansaHT(y, pi, fiksanObim = True):
+    '''Ocena varijanse Horvic-Tompsonove ocene totala.
+
+    Za dizajne fiksnog obima (sistematski PPS, uslovni Poasonov) koristi se Hajekova aproksimacija
+    bez verovatnoća drugog reda, sa c_i = (1 - pi_i) n / (n - 1); za Poasonov uzorak koristi se
+    tačna ocena sum (1 - pi_i) (y_i / pi_i)².'''
+    y = np.asarray(y, dtype=float)
+    pi = np.asarray(pi, dtype=float)
+    e = y / pi
+    if not fiksanObim:
+        return np.sum((1 - pi) * np.square(e))
+    n = len(y)
+    c = (1 - pi) * n / (n - 1)
+    return np.sum(c * np.square(e - (c @ e) / c.sum()))
+
+
+class PPS:
+    '''Uzorak sa nejednakim verovatnoćama izbora, proporcionalnim meri veličine:
+    - sistematski PPS,
+    - Poasonov uzorak,
+    - uslovni Poasonov uzorak.
+
+    Ocene su Horvic-Tompsonove (total, sredina) i Hajekove (sredina), sa intervalima poverenja
+    u obliku klase Ocena, kao kod PSU i SSU.
+
+    Parametri
+    ----------
+    df : pd.DataFrame
+        Populacija.
+    velicina : str ili array-like
+        Kolona (ili niz) sa merom veličine, npr. 'satiRada'.
+    n : int
+        (Očekivani) obim uzorka.
+    metod : str, opciono
+        'sistematski', 'poasonov' ili 'uslovniPoasonov'.
+    y : str, opciono
+        Zavisna promenljiva. Podrazumevano: 'plata'.
+    alfa : list[float], opciono
+        Nivoi značajnosti.
+    seed : int, opciono
+        Seed za reprodukciju slučajnog uzorka.
+
+    Atributi
+    ----------
+    pi : np.ndarray
+        Verovatnoće uključivanja svih jedinica populacije.
+    uzorak : pd.DataFrame
+        Izabrane jedinice.
+    piUzorak : np.ndarray
+        Verovatnoće uključivanja izabranih jedinica.'''
+    metodi = {'sistematski': sistematskiPPS, 'poasonov': poasonov, 'uslovniPoasonov': uslovniPoasonov}
+
+    def __init__(self, df, velicina, n, metod = 'sistematski', y = 'plata', alfa = [0.1, 0.05, 0.01], seed = 42):
+        if metod not in self.metodi:
+            raise ValueError(f'Nepoznat metod: {metod}')
+        self.df = df
+        self.metod = metod
+        self.N = len(df)
+        self.alfa = alfa
+        self.seed = seed
+        self.yIme = y
+        self.pi = verovatnoceUkljucivanja(df[velicina] if isinstance(velicina, str) else velicina, n)
+        self.Y = df[y]
+        self.Ym = self.Y.mean()
+        izbor = self.replike(seed=seed)
+        if izbor.dtype == bool:
+            izbor = np.flatnonzero(izbor)
+        self.uzorak = df.iloc[izbor]
+        self.piUzorak = self.pi[izbor]
+        self.y = self.uzorak[y]
+        self.n = len(self.uzorak)
+
+    def replike(self, R = None, seed = None):
+        '''Bira R nezavisnih uzoraka istim dizajnom (indeksi, odnosno maska za Poasonov uzorak).'''
+        return self.metodi[self.metod](self.pi, R=R, seed=self.seed if seed is None else seed)
+
+    def htOcena(self):
+        '''Horvic-Tompsonove ocene totala i sredine Y.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'total' i 'sredina'.'''
+        total = np.sum(self.y.to_numpy() / self.piUzorak)
+        std = np.sqrt(varijansaHT(self.y, self.piUzorak, fiksanObim=self.metod != 'poasonov'))
+        return {'total': Ocena.izracunaj('total', total, std, self.alfa, self.n - 1, self.Y.sum()),
+                'sredina': Ocena.izracunaj('sredina', total / self.N, std / self.N, self.alfa, self.n - 1, self.Ym)}
+
+    def hajekOcena(self):
+        '''Hajekova ocena sredine, sum(y / pi) / sum(1 / pi), sa linearizovanom standardnom greškom.'''
+        Nkapa = np.sum(1 / self.piUzorak)
+        sredina = np.sum(self.y.to_numpy() / self.piUzorak) / Nkapa
+        u = (self.y.to_numpy() - sredina) / Nkapa
+        std = np.sqrt(varijansaHT(u, self.piUzorak, fiksanObim=self.metod != 'poasonov'))
+        return Ocena.izracunaj('sredina', sredina, std, self.alfa, self.n - 1, self.Ym)
+
+    def __repr__(self):
+        return f"PPS | metod={self.metod} | n={self.n} | N={self.N}"
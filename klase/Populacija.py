@@ -0,0 +1,243 @@
+import json
+import os
+import shutil
+import threading
+import numpy as np
+import pandas as pd
+from klase.ucitavanje import TU, KES, folderKesa, sacuvajKolone, rasporedNizova
+
+
+class Populacija:
+    '''Populacija sačuvana van radne memorije: svaka kolona je .npy fajl kolonskog keša (klase.ucitavanje),
+    a kategorijske kolone su celobrojni kodovi. Kolone se ne mapiraju, već se delovi čitaju iz fajlova.
+
+    Može se proslediti klasama PSU i SSU umesto DataFrame-a. U memoriju se tada učitavaju samo
+    izabrani redovi (uzorak), a totali, sredine i sume po stratumima računaju se prolazom kroz
+    kolone u blokovima fiksne veličine; sume i frekvencije celih kolona računaju se jednom i čuvaju
+    u meta.json keša. Zauzeće memorije zato zavisi od obima uzorka i veličine bloka, a ne od N.
+
+    Parametri
+    ----------
+    folder : str
+        Folder kolonskog keša (npr. rezultat ucitavanje.folderKesa ili Populacija.izDataFrame).
+    blok : int, opciono
+        Broj redova koji se obrađuje odjednom.
+
+    Atributi
+    ----------
+    N : int
+        Broj jedinica populacije.
+    kolone : list[str]
+        Kolone populacije.
+    kategorije : dict[str, pd.Index]
+        Kategorije svake kategorijske kolone.'''
+    def __init__(self, folder, blok = 1 << 18):
+        self.folder = folder
+        self.blok = blok
+        self._brava = threading.Lock()
+        self.raspored, self.meta = rasporedNizova(folder)
+        self.N = self.meta['redova']
+        self.kolone = self.meta['kolone']
+        self.kategorije = {kol: pd.Index(kat['vrednosti']) for kol, kat in self.meta['kategorije'].items()}
+
+    @classmethod
+    def izDataFrame(cls, df, folder, blok = 1 << 18):
+        '''Čuva DataFrame kao kolonski keš u zadatom folderu (postojeći keš se zamenjuje) i otvara ga.'''
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+        return cls(sacuvajKolone(df, folder), blok)
+
+    @classmethod
+    def izDta(cls, putanja = TU, kes = KES, blok = 1 << 18):
+        '''Populacija iz .dta fajla, preko kolonskog keša (vidi ucitavanje.ucitaj).'''
+        return cls(folderKesa(putanja, kes), blok)
+
+    def __len__(self):
+        return self.N
+
+    @property
+    def numericke(self):
+        '''Kolone koje nisu kategorijske.'''
+        return [kol for kol in self.kolone if kol not in self.kategorije]
+
+    def blokovi(self, kolone):
+        '''Prolaz kroz zadate kolone u blokovima; za svaki blok vraća rečnik {kolona: niz}.
+
+        Blokovi se čitaju iz fajlova (a ne preko mapiranih nizova), pa pročitane stranice ne ostaju
+        u memoriji procesa posle obrade bloka.'''
+        fajlovi = {kol: open(self.raspored[kol][0], 'rb') for kol in kolone}
+        try:
+            for pocetak in range(0, self.N, self.blok):
+                yield {kol: np.fromfile(f, dtype=self.raspored[kol][1], count=min(self.blok, self.N - pocetak),
+                                        offset=self.raspored[kol][2] if pocetak == 0 else 0)
+                       for kol, f in fajlovi.items()}
+        finally:
+            for f in fajlovi.values():
+                f.close()
+
+    @property
+    def statistike(self):
+        '''Broj poznatih vrednosti, suma, suma kvadrata, minimum i maksimum numeričkih kolona i frekvencije
+        kategorija; računaju se u jednom prolazu pri prvom pristupu i čuvaju uz keš.'''
+        if 'statistike' in self.meta:
+            return self.meta['statistike']
+        with self._brava:
+            if 'statistike' not in self.meta:
+                self._izracunajStatistike()
+        return self.meta['statistike']
+
+    def _izracunajStatistike(self):
+        '''Jedan prolaz kroz kolone za statistike (poziva se pod bravom).'''
+        st = {kol: {'n': 0.0, 'suma': 0.0, 'sumaKvadrata': 0.0, 'min': np.inf, 'max': -np.inf} for kol in self.numericke}
+        frekvencije = {kol: np.zeros(len(kat)) for kol, kat in self.kategorije.items()}
+        for deo in self.blokovi(self.kolone):
+            for kol in self.numericke:
+                x = deo[kol].astype(float)
+                x = x[~np.isnan(x)]
+                if len(x):
+                    s = st[kol]
+                    s['n'] += len(x)
+                    s['suma'] += x.sum()
+                    s['sumaKvadrata'] += x @ x
+                    s['min'], s['max'] = min(s['min'], x.min()), max(s['max'], x.max())
+            for kol in self.kategorije:
+                kod = deo[kol]
+                frekvencije[kol] += np.bincount(kod[kod >= 0], minlength=len(frekvencije[kol]))
+        self.meta['statistike'] = {'numericke': st, 'frekvencije': {kol: f.tolist() for kol, f in frekvencije.items()}}
+        with open(os.path.join(self.folder, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=1)
+
+    def suma(self, kolona):
+        '''Total numeričke kolone (bez nedostajućih vrednosti).'''
+        return self.statistike['numericke'][kolona]['suma']
+
+    def sredina(self, kolona):
+        '''Sredina numeričke kolone.'''
+        st = self.statistike['numericke'][kolona]
+        return st['suma'] / st['n']
+
+    def frekvencije(self, kolona):
+        '''Broj jedinica u svakoj kategoriji kategorijske kolone.'''
+        return pd.Series(self.statistike['frekvencije'][kolona], index=self.kategorije[kolona], name=kolona)
+
+    def sumaProizvoda(self, a, b):
+        '''Suma proizvoda dve numeričke kolone, sum(a_i b_i), računata po blokovima.'''
+        return sum(deo[a].astype(float) @ deo[b].astype(float) for deo in self.blokovi([a, b]))
+
+    def _kodovi(self, deo, grupe):
+        kod = np.zeros(len(deo[grupe[0]]), dtype=np.int64)
+        for kol in grupe:
+            kod = kod * len(self.kategorije[kol]) + deo[kol]
+        return kod
+
+    def grupneSume(self, grupe, kolone = []):
+        '''Broj jedinica i totali numeričkih kolona za sve ćelije ukrštanja kategorijskih kolona.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Kolona 'N' i po jedna kolona totala, za sve kombinacije kategorija (i prazne), redom
+            mešovite osnove (kao klase.momenti.kodiraj).'''
+        grupe = [grupe] if isinstance(grupe, str) else list(grupe)
+        nepoznate = [kol for kol in grupe if kol not in self.kategorije]
+        if nepoznate:
+            raise ValueError(f'Grupisanje je moguće samo po kategorijskim kolonama: {nepoznate}')
+        G = int(np.prod([len(self.kategorije[kol]) for kol in grupe]))
+        rezultat = {'N': np.zeros(G), **{kol: np.zeros(G) for kol in kolone}}
+        for deo in self.blokovi(grupe + list(kolone)):
+            kod = self._kodovi(deo, grupe)
+            rezultat['N'] += np.bincount(kod, minlength=G)
+            for kol in kolone:
+                rezultat[kol] += np.bincount(kod, weights=deo[kol].astype(float), minlength=G)
+        indeks = pd.MultiIndex.from_product([self.kategorije[kol] for kol in grupe], names=grupe)
+        return pd.DataFrame(rezultat, index=indeks if len(grupe) > 1 else indeks.get_level_values(0))
+
+    def uzmi(self, indeksi, kolone = None):
+        '''Učitava samo zadate redove.
+
+        Redni brojevi se sortiraju, pa se iz fajla svake kolone čitaju uzastopni odsečci koji ih
+        sadrže (susedni redovi na razmaku do 64 KiB čitaju se zajedno, a odsečak nije duži od bloka);
+        zauzeće memorije zato zavisi od obima uzorka i veličine bloka, a ne od N.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Redovi sa indeksom jednakim rednim brojevima u populaciji i kategorijskim kolonama.'''
+        indeksi = np.asarray(indeksi, dtype=np.int64)
+        if len(indeksi) and (indeksi.min() < 0 or indeksi.max() >= self.N):
+            raise IndexError(f'Redni brojevi moraju biti između 0 i {self.N - 1}')
+        redovi, povratak = np.unique(indeksi, return_inverse=True)
+        podaci = {}
+        for kol in (self.kolone if kolone is None else kolone):
+            niz = self._procitaj(kol, redovi)[povratak]
+            if kol in self.kategorije:
+                kat = self.meta['kategorije'][kol]
+                podaci[kol] = pd.Categorical.from_codes(niz, categories=self.kategorije[kol], ordered=kat['uredjene'])
+            else:
+                podaci[kol] = niz
+        return pd.DataFrame(podaci, index=pd.Index(indeksi))
+
+    def _procitaj(self, kolona, redovi):
+        '''Vrednosti kolone u sortiranim, jedinstvenim redovima, čitane odsečak po odsečak.'''
+        putanja, tip, pomeraj = self.raspored[kolona]
+        prekidi = np.append(np.flatnonzero(np.diff(redovi) * tip.itemsize > 1 << 16) + 1, len(redovi))
+        delovi = []
+        with open(putanja, 'rb') as f:
+            i = 0
+            while i < len(redovi):
+                pocetak = redovi[i]
+                j = min(np.searchsorted(redovi, pocetak + self.blok), prekidi[np.searchsorted(prekidi, i, side='right')])
+                f.seek(pomeraj + int(pocetak) * tip.itemsize)
+                delovi.append(np.fromfile(f, dtype=tip, count=int(redovi[j - 1] - pocetak) + 1)[redovi[i:j] - pocetak])
+                i = j
+        return np.concatenate(delovi) if delovi else np.empty(0, dtype=tip)
+
+    def prostUzorak(self, n, seed = 42):
+        '''Redni brojevi prostog slučajnog uzorka bez ponavljanja, rastućim redom.'''
+        return np.sort(np.random.default_rng(seed).choice(self.N, size=n, replace=False))
+
+    def stratifikovaniUzorak(self, grupe, nh, seed = 42):
+        '''Redni brojevi stratifikovanog prostog slučajnog uzorka.
+
+        U svakom stratumu (ćeliji ukrštanja kolona grupe) bira se nh[h] rednih mesta među članovima
+        stratuma, a zatim se u jednom prolazu po blokovima ta mesta prevode u redne brojeve u populaciji.
+
+        Parametri:
+        ----------
+        grupe : list[str]
+            Kategorijske kolone koje definišu stratume.
+        nh : array-like
+            Obim uzorka za svaku ćeliju, redom kao u grupneSume.
+        seed : int, opciono
+            Seed za reprodukciju.'''
+        grupe = [grupe] if isinstance(grupe, str) else list(grupe)
+        rng = np.random.default_rng(seed)
+        Nh = self.grupneSume(grupe)['N'].to_numpy().astype(np.int64)
+        nh = np.asarray(nh, dtype=np.int64)
+        if (nh > Nh).any():
+            raise ValueError('Obim uzorka u stratumu ne može biti veći od veličine stratuma')
+        mesta = [np.sort(rng.choice(N, size=m, replace=False)) if m > 0 else np.empty(0, dtype=np.int64) for N, m in zip(Nh, nh)]
+        videno = np.zeros(len(Nh), dtype=np.int64)
+        izbor = []
+        for pocetak, deo in zip(range(0, self.N, self.blok), self.blokovi(grupe)):
+            kod = self._kodovi(deo, grupe)
+            redosled = np.argsort(kod, kind='stable')
+            granice = np.concatenate([[0], np.cumsum(np.bincount(kod, minlength=len(Nh)))])
+            for h in np.flatnonzero(nh):
+                od, do = np.searchsorted(mesta[h], [videno[h], videno[h] + granice[h + 1] - granice[h]])
+                izbor.append(pocetak + redosled[granice[h] + mesta[h][od:do] - videno[h]])
+            videno += np.diff(granice)
+        return np.sort(np.concatenate(izbor)) if izbor else np.empty(0, dtype=np.int64)
+
+    def describe(self):
+        '''Opisne statistike numeričkih kolona (broj, sredina, standardna devijacija, minimum, maksimum) iz sačuvanih suma.'''
+        st = self.statistike['numericke']
+        opis = {}
+        for kol in self.numericke:
+            s = st[kol]
+            sredina = s['suma'] / s['n']
+            opis[kol] = [s['n'], sredina, np.sqrt(max(s['sumaKvadrata'] - s['n'] * sredina**2, 0) / (s['n'] - 1)), s['min'], s['max']]
+        return pd.DataFrame(opis, index=['count', 'mean', 'std', 'min', 'max'])
+
+    def __repr__(self):
+        return f"Populacija | N={self.N} | kolone={self.kolone}"
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+from klase.funkcije import LenjiModul
+from klase.ocene import Ocena
+
+linalg = LenjiModul('scipy.linalg')
+
+
+class Replikacije:
+    '''Replikacione težine (jackknife JKn, BRR i bootstrap sa reskaliranjem) za prost i stratifikovan uzorak.
+
+    Sve replike čuvaju se kao jedna matrica težina W (broj replika x n). Svaka ocena se zapisuje
+    kao funkcija ponderisanih totala kolona matrice Z, pa se totali za sve replike dobijaju
+    jednim množenjem W @ Z, a ocena se zatim računa vektorski za sve replike odjednom.
+
+    Parametri
+    ----------
+    tezine : np.ndarray
+        Osnovne težine dizajna (N_h / n_h) za svaku jedinicu uzorka.
+    stratumi : np.ndarray
+        Celobrojni kod stratuma za svaku jedinicu uzorka.
+    Nh : np.ndarray
+        Veličine stratuma u populaciji, po kodu stratuma.
+    alfa : list[float], opciono
+        Nivoi značajnosti za intervale poverenja.
+
+    Atributi
+    ----------
+    W : np.ndarray
+        Matrica replikacionih težina (posle poziva jackknife, brr ili bootstrap).
+    c : np.ndarray
+        Koeficijent svake replike u oceni varijanse.
+    df : int
+        Broj stepeni slobode za intervale poverenja.'''
+    def __init__(self, tezine, stratumi, Nh, alfa = [0.1, 0.05, 0.01]):
+        self.w = np.asarray(tezine, dtype=float)
+        self.stratumi = np.asarray(stratumi)
+        self.n = len(self.w)
+        self.H = len(Nh)
+        self.Nh = np.asarray(Nh, dtype=float)
+        self.nh = np.bincount(self.stratumi, minlength=self.H).astype(float)
+        self.fh = self.nh / self.Nh
+        self.alfa = alfa
+        self.metod, self.W, self.c, self.df = None, None, None, None
+
+    @classmethod
+    def izDizajna(cls, dizajn, metod = 'jackknife', **parametri):
+        '''Formira replikacione težine za objekat klase PSU ili SSU.
+
+        Parametri:
+        ----------
+        dizajn : PSU ili SSU
+        metod : str
+            'jackknife', 'brr' ili 'bootstrap'.
+        parametri : dict
+            Dodatni parametri izabranog metoda.'''
+        if 'Strata' in dizajn.uzorak.columns:
+            stratumi, oznake = pd.factorize(dizajn.uzorak['Strata'], sort=True)
+            Nh = dizajn.Nh.reindex(oznake).to_numpy()
+        else:
+            stratumi, Nh = np.zeros(len(dizajn.uzorak), dtype=np.int64), np.array([dizajn.N])
+        nh = np.bincount(stratumi, minlength=len(Nh))
+        replikacije = cls((Nh / nh)[stratumi], stratumi, Nh, alfa=dizajn.alfa)
+        return getattr(replikacije, metod)(**parametri)
+
+    def jackknife(self, grupe = None, seed = 42):
+        '''Delete-one-PSU jackknife (JKn): svaka replika izbacuje jednu primarnu jedinicu iz svog stratuma,
+        a težine ostalih jedinica tog stratuma uvećava faktorom a_h / (a_h - 1).
+
+        Parametri:
+        ----------
+        grupe : int, opciono
+            Broj slučajnih grupa (primarnih jedinica) po stratumu; podrazumevano je svaka jedinica posebna grupa.
+        seed : int, opciono
+            Seed za raspoređivanje jedinica u grupe.'''
+        if grupe is None:
+            psu = np.arange(self.n)
+        else:
+            rng = np.random.default_rng(seed)
+            psu = np.empty(self.n, dtype=np.int64)
+            for h in range(self.H):
+                clanovi = rng.permutation(np.flatnonzero(self.stratumi == h))
+                psu[clanovi] = h * grupe + np.arange(len(clanovi)) % min(grupe, len(clanovi))
+            psu = np.unique(psu, return_inverse=True)[1]
+        R = psu.max() + 1
+        stratumPsu = np.zeros(R, dtype=np.int64)
+        stratumPsu[psu] = self.stratumi
+        ah = np.bincount(stratumPsu, minlength=self.H).astype(float)
+        if (ah[ah > 0] < 2).any():
+            raise ValueError('Jackknife zahteva najmanje dve primarne jedinice u svakom stratumu')
+
+        isti = stratumPsu[:, None] == self.stratumi[None, :]
+        faktor = np.where(isti, (ah / (ah - 1))[stratumPsu][:, None], 1.0)
+        faktor[psu[None, :] == np.arange(R)[:, None]] = 0.0
+        self.W = faktor * self.w
+        self.c = ((1 - self.fh) * (ah - 1) / ah)[stratumPsu]
+        self.df = R - self.H
+        self.metod = 'jackknife'
+        return self
+
+    def brr(self, fay = 0.0, seed = 42):
+        '''Balansirana ponovljena replikacija (BRR) sa Fay-ovom korekcijom.
+
+        Jedinice svakog stratuma se slučajno uparuju u pseudo-stratume sa po dve polovine; u svakoj
+        replici jedna polovina dobija težinu (2 - fay) puta, a druga fay puta osnovnu. Izbor polovina
+        zadaje Hadamardova matrica, pa su replike međusobno balansirane.
+
+        Parametri:
+        ----------
+        fay : float, opciono
+            Fay-ov koeficijent (0 daje klasičan BRR).
+        seed : int, opciono
+            Seed za formiranje pseudo-stratuma.'''
+        rng = np.random.default_rng(seed)
+        pseudo = np.empty(self.n, dtype=np.int64)
+        polovina = np.empty(self.n, dtype=np.int64)
+        pocetak = 0
+        for h in range(self.H):
+            clanovi = rng.permutation(np.flatnonzero(self.stratumi == h))
+            m = len(clanovi) // 2
+            if m == 0:
+                raise ValueError('BRR zahteva najmanje dve jedinice u svakom stratumu')
+            k = np.arange(len(clanovi))
+            pseudo[clanovi] = pocetak + np.minimum(k // 2, m - 1)
+            polovina[clanovi] = np.where(k < 2 * m, k % 2, 1)
+            pocetak += m
+        R = 2 ** int(np.ceil(np.log2(pocetak + 1)))
+        izbor = linalg.hadamard(R)[:, 1:pocetak + 1][:, pseudo] * np.where(polovina == 0, 1, -1) > 0
+        self.W = np.where(izbor, 2 - fay, fay) * self.w
+        f = self.nh.sum() / self.Nh.sum()
+        self.c = np.full(R, (1 - f) / (R * (1 - fay)**2))
+        self.df = pocetak
+        self.metod = 'brr'
+        return self
+
+    def bootstrap(self, B = 500, seed = 42):
+        '''Bootstrap sa reskaliranjem (Rao-Wu): u svakom stratumu bira se n_h - 1 jedinica sa vraćanjem,
+        a težine se reskaliraju tako da varijansa replika uključuje i korekciju za konačnu populaciju.
+
+        Parametri:
+        ----------
+        B : int, opciono
+            Broj bootstrap replika.
+        seed : int, opciono
+            Seed za reprodukciju.'''
+        rng = np.random.default_rng(seed)
+        self.W = np.empty((B, self.n))
+        for h in range(self.H):
+            clanovi = np.flatnonzero(self.stratumi == h)
+            nh = len(clanovi)
+            if nh < 2:
+                raise ValueError('Bootstrap zahteva najmanje dve jedinice u svakom stratumu')
+            mh = nh - 1
+            brojevi = rng.multinomial(mh, np.full(nh, 1 / nh), size=B)
+            lam = np.sqrt(mh * (1 - self.fh[h]) / (nh - 1))
+            self.W[:, clanovi] = self.w[clanovi] * (1 - lam + lam * nh / mh * brojevi)
+        self.c = np.full(B, 1 / B)
+        self.df = self.n - self.H
+        self.metod = 'bootstrap'
+        return self
+
+    def totali(self, Z):
+        '''Ponderisani totali kolona Z za ceo uzorak i za sve replike (jedno matrično množenje).
+
+        Rezultat:
+        ----------
+        tuple[np.ndarray, np.ndarray]
+            Totali uzorka (p,) i totali replika (R, p).'''
+        if self.W is None:
+            raise ValueError('Replikacione težine nisu formirane, pozvati jackknife, brr ili bootstrap')
+        Z = np.asarray(Z, dtype=float)
+        Z = Z[:, None] if Z.ndim == 1 else Z
+        return self.w @ Z, self.W @ Z
+
+    def oceni(self, funkcija, Z, naziv = 'ocena', parametar = np.nan):
+        '''Ocena i njena replikaciona standardna greška za proizvoljnu funkciju ponderisanih totala.
+
+        Parametri:
+        ----------
+        funkcija : callable
+            Preslikava totale (poslednja osa dužine p) u ocenu; mora raditi vektorski nad replikama.
+        Z : np.ndarray
+            Matrica n x p čiji se totali računaju.
+        naziv : str, opciono
+            Oznaka ocene.
+        parametar : float, opciono
+            Prava vrednost parametra, ako je poznata.
+
+        Rezultat:
+        ----------
+        Ocena'''
+        t, T = self.totali(Z)
+        ocena = funkcija(t)
+        V = self.c @ np.square(funkcija(T) - ocena)
+        return Ocena.izracunaj(naziv, ocena, np.sqrt(V), self.alfa, self.df, parametar)
+
+    def sredina(self, y, parametar = np.nan):
+        '''Hajekova ocena sredine: ponderisani total y podeljen zbirom težina.'''
+        Z = np.column_stack([np.asarray(y, dtype=float), np.ones(self.n)])
+        return self.oceni(lambda t: t[..., 0] / t[..., 1], Z, 'sredina', parametar)
+
+    def kolicnicka(self, y, x, Xm, parametar = np.nan):
+        '''Količnička ocena sredine y sa pomoćnom promenljivom x i poznatom sredinom populacije Xm.'''
+        Z = np.column_stack([np.asarray(y, dtype=float), np.asarray(x, dtype=float)])
+        return self.oceni(lambda t: t[..., 0] / t[..., 1] * Xm, Z, 'kolicnicka', parametar)
+
+    def regresiona(self, y, x, Xm, parametar = np.nan):
+        '''Generalizovana regresiona (GREG) ocena sredine y sa poznatim sredinama pomoćnih promenljivih Xm.
+
+        Svi proizvodi x_j x_k, x_j y, x_j, y i 1 smeštaju se u jednu matricu, pa jedno množenje
+        daje X'WX i X'Wy za sve replike; koeficijenti se zatim računaju grupno (np.linalg.pinv).'''
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        Xm = np.asarray(Xm, dtype=float)
+        p = x.shape[1]
+        Z = np.column_stack([(x[:, :, None] * x[:, None, :]).reshape(self.n, p * p), x * y[:, None], x, y, np.ones(self.n)])
+
+        def greg(t):
+            A = t[..., :p * p].reshape(t.shape[:-1] + (p, p))
+            b = (np.linalg.pinv(A) @ t[..., p * p:p * p + p, None])[..., 0]
+            tx = t[..., p * p + p:p * p + 2 * p]
+            return b @ Xm + (t[..., -2] - (tx * b).sum(axis=-1)) / t[..., -1]
+        return self.oceni(greg, Z, 'regresiona', parametar)
+
+    def __repr__(self):
+        R = 0 if self.W is None else self.W.shape[0]
+        return f"Replikacije | metod={self.metod} | replika={R} | n={self.n} | stratuma={self.H}"
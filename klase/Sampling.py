@@ -1,6 +1,15 @@
 from klase.funkcije import *
 from klase.ONK import ONK
 from klase.Bootstrapping import Bootstrapping
+from klase.ocene import Ocena
+from klase.Replikacije import Replikacije
+from klase.Domeni import oceneDomena
+from klase.Inkrementalni import InkrementalniUzorak
+from klase.Populacija import Populacija
+from klase.Kalibracija import Kalibracija, dodajStarosneGrupe, podrazumevaneMargine
+from klase.prikaz import prikazi, tabelaIntervala, tabelaVrednosti
+from klase.instrumentacija import meri, raspon
+from klase import jezgro
 
 
 class PSU:
@@ -10,12 +19,13 @@ class PSU:
     
     Parametri
     ----------
-    df : pd.DataFrame
-        Kompletnan skup podataka (populacija).
-    X : pd.DataFrame
-        Matrica objašnjavajućih promenljivih za celu populaciju.
-    Y : pd.Series
-        Zavisna promenljiva za celu populaciju.
+    df : pd.DataFrame ili Populacija
+        Kompletnan skup podataka (populacija). Za populacije koje ne staju u memoriju prosleđuje se
+        objekat klase Populacija; tada se učitava samo uzorak, a X je lista kolona.
+    X : pd.DataFrame ili list[str]
+        Matrica objašnjavajućih promenljivih za celu populaciju (za Populaciju: nazivi kolona).
+    Y : pd.Series ili str
+        Zavisna promenljiva za celu populaciju (za Populaciju se koristi kolona 'plata').
     n : int
         Veličina slučajnog uzorka.
     kategorije : list[str], opciono
@@ -24,6 +34,9 @@ class PSU:
         Nivo značajnosti za statističko testiranje parametara.
     seed : int, opciono
         Seed za reprodukciju slučajnog uzorka.
+    uzorak : pd.Index, opciono
+        Indeksi unapred izabranog uzorka jednakih verovatnoća (npr. balansirani uzorak iz klase.Kocka);
+        ako su zadati, koriste se umesto prostog slučajnog izbora.
     
     Atributi
     ----------
@@ -37,19 +50,25 @@ class PSU:
         Zavisne promenljive za populaciju i uzorak.
     Ym, ym : float
         Srednje vrednosti zavisne promenljive u populaciji i uzorku.'''
-    def __init__(self, df, X, Y, n, kategorije = None, alfa= [0.1, 0.05, 0.01], seed=42):
-        self.df = df.copy()
-        self.n = n
+    @meri
+    def __init__(self, df, X, Y, n, kategorije = None, alfa= [0.1, 0.05, 0.01], seed=42, uzorak = None):
+        if isinstance(df, Populacija):
+            self._izPopulacije(df, X, n, kategorije, alfa, seed, uzorak)
+            return
+        self.df = df.copy(deep=False)
+        self.n = n if uzorak is None else len(uzorak)
         self.N = len(df)
-        self.f = n / self.N
+        self.f = self.n / self.N
         self.seed = seed
-        self.alfa = alfa
-        self.uzorak = df.sample(n=n, replace=False, random_state=seed)
+        self.alfa = list(alfa)
+        self.kategorije = kategorije
+        with raspon('uzorkovanje'):
+            self.uzorak = df.sample(n=n, replace=False, random_state=seed) if uzorak is None else df.loc[uzorak]
 
         self.model = ONK(alfa)
         if kategorije is not None:
             self.X = self.model.vestacke(kategorije= kategorije, x = X)
-            self.x = self.model.vestacke(kategorije= kategorije, x = X.loc[list(self.uzorak.index)])
+            self.x = self.model.vestacke(kategorije= kategorije, x = X.loc[self.uzorak.index])
         else:
             self.X = X
             self.x = X.loc[self.uzorak.index]
@@ -63,26 +82,121 @@ class PSU:
 
         self.bs = None
 
+    def _izPopulacije(self, populacija, X, n, kategorije, alfa, seed, uzorak):
+        '''Inicijalizacija nad populacijom van memorije: učitava se samo uzorak, a sredine populacije
+        (i udeli kategorija za veštačke promenljive) uzimaju se iz sačuvanih statistika populacije.'''
+        self.df = populacija
+        self.n = n if uzorak is None else len(uzorak)
+        self.N = populacija.N
+        self.f = self.n / self.N
+        self.seed = seed
+        self.alfa = list(alfa)
+        self.kategorije = kategorije
+        self.uzorak = populacija.uzmi(populacija.prostUzorak(n, seed) if uzorak is None else uzorak)
+
+        kolone = [X] if isinstance(X, str) else list(X)
+        self.model = ONK(alfa)
+        x = self.uzorak[kolone]
+        self.x = x if kategorije is None else self.model.vestacke(kategorije=kategorije, x=x)
+        Xm = {}
+        for kol in self.x.columns:
+            if kol == 'const':
+                Xm[kol] = 1.0
+            elif kol not in populacija.kolone:
+                kat = next(k for k in kategorije if kol.startswith(f'{k}_'))
+                Xm[kol] = populacija.frekvencije(kat)[kol[len(kat) + 1:]] / self.N
+            else:
+                Xm[kol] = populacija.sredina(kol)
+        self.X, self.Y = None, None
+        self.y = self.uzorak['plata']
+        self.Ym = populacija.sredina('plata')
+        self.Xm = pd.Series(Xm)
+        self.ym = self.y.mean()
+        self.xm = self.x.mean()
+        self.bs = None
+
+    @property
+    def vanMemorije(self):
+        '''Da li je populacija zadata kao Populacija (van radne memorije).'''
+        return isinstance(self.df, Populacija)
+
+    def _uMemoriji(self, metod):
+        if self.vanMemorije:
+            raise TypeError(f'{metod} zahteva populaciju u memoriji (pd.DataFrame)')
+
+    def _total(self, kolona):
+        '''Total kolone u populaciji.'''
+        return self.df.suma(kolona) if self.vanMemorije else self.df[kolona].sum()
+
+    def _sredineX(self):
+        '''Sredine kolona matrice X u populaciji, uključujući konstantu.'''
+        Xm = self.Xm.copy() if self.vanMemorije else pd.DataFrame(self.X).mean()
+        if 'const' not in Xm.index:
+            Xm = pd.concat([pd.Series({'const': 1.0}), Xm])
+        return Xm
+
+    def _ostaciKolicnika(self, var, R):
+        '''Suma kvadrata ostataka količnika u populaciji, sum (Y_i - R X_i)^2.'''
+        if self.vanMemorije:
+            return (self.df.sumaProizvoda('plata', 'plata') - 2 * R * self.df.sumaProizvoda('plata', var)
+                    + R**2 * self.df.sumaProizvoda(var, var))
+        return jezgro.sumaKvadrataOstataka(self.Y.to_numpy(), self.X[var].to_numpy(), R)
+
+    def inkrementalno(self, var = 'obrazovanje'):
+        '''Uzorak koji se dopunjuje serijama novih jedinica (i iz kog se uklanjaju neispravne jedinice), sa
+        ocenama koje se ažuriraju u vremenu srazmernom veličini serije; počinje od jedinica ovog uzorka.
+
+        Parametri:
+        ----------
+        var : str
+            Pomoćna promenljiva za količničke ocene.
+
+        Rezultat:
+        ----------
+        InkrementalniUzorak'''
+        inkrementalni = InkrementalniUzorak(self, var)
+        inkrementalni.dodaj(self.uzorak)
+        return inkrementalni
+
+    @property
+    def totali(self):
+        '''Totali mesečnih zarada i godina obrazovanja za populaciju i uzorak (korigovan), kao brojevi.'''
+        return pd.DataFrame({
+            'Total mesečne zarade': [self._total('plata'), self.y.sum() / self.f],
+            'Total godina obrazovanja': [self._total('obrazovanje'), self.x['obrazovanje'].sum() / self.f]
+        }, index=['Populacija', 'Uzorak (korigovan)'])
+
     @property
     def describe(self):
         ''' Prikazuje opisne statistike za populaciju i uzorak, uključujući totale mesečnih zarada i godina obrazovanja.'''
         print('--- OPIS PODATAKA ---\n')
-    
-        print('Uzorak:')
-        display(self.uzorak.describe())
-    
-        print('\nPopulacija:')
-        display(self.df.describe())
-    
-        rezultati = pd.DataFrame({
-            'Total mesečne zarade': [form(self.Y.sum()), form(self.y.sum() / self.f)],
-            'Total godina obrazovanja': [form(self.X['obrazovanje'].sum()), form(self.x['obrazovanje'].sum() / self.f)]
-        }, index=['Populacija', 'Uzorak (korigovan)'])
-    
-        print('\n--- TOTALI OBELEŽJA ---\n')
-        display(rezultati)
+        prikazi('Uzorak:', self.uzorak.describe())
+        prikazi('\nPopulacija:', self.df.describe())
+        prikazi('\n--- TOTALI OBELEŽJA ---\n', self.totali)
 
-    
+    @meri
+    def kolicnickaOcena(self, var='obrazovanje'):
+        '''Količnička ocena sredine i totala Y, bez ispisa i formatiranja.
+
+        Parametri:
+        ----------
+        var : str
+            Promenljiva za količničko ocenjivanje.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'sredina', 'total' i 'kolicnik' sa standardnim greškama i intervalima poverenja.'''
+        Ytotal, Xtotal = self._total('plata'), self._total(var)
+        R = Ytotal / Xtotal
+        s = self._ostaciKolicnika(var, R)
+        Ru, R, SYm = jezgro.kolicnicka(self.y.to_numpy(), self.x[var].to_numpy(), Ytotal, Xtotal, s, self.N)
+
+        return {'sredina': Ocena.izracunaj('sredina', Ru * Xtotal / self.N, SYm, self.alfa, self.n - 1, self.Ym),
+                'total': Ocena.izracunaj('total', Ru * Xtotal, self.N * SYm, self.alfa, self.n - 1, Ytotal),
+                'kolicnik': Ocena.izracunaj('kolicnik', Ru, SYm * self.N / Xtotal, self.alfa, self.n - 1, R)}
+
+    @meri
     def kolicnickoOcenjivanje(self, var='obrazovanje'):
         '''Količničko ocenjivanje sredine i totala Y, 
         sa pristrasnošću i intervalima poverenja.
@@ -91,42 +205,54 @@ class PSU:
         ----------
         var : str
             Promenljiva za količničko ocenjivanje.'''
-        x = self.x[var]
-        X = self.X[var]
-
-        R = self.Y.sum() / X.sum()
-        Ru = self.y.sum() / x.sum()
-
-        YbarKapa = Ru * X.mean()
-        YtotalKapa = Ru * X.sum()
-        pristrastnostR = YbarKapa - self.Y.mean()
-        rel_pristrastnost = (pristrastnostR / self.Y.mean()) * 100
-        pristrasnostTotal = YtotalKapa - self.Y.sum()
+        ocene = self.kolicnickaOcena(var)
+        sredina, total, kolicnik = ocene['sredina'], ocene['total'], ocene['kolicnik']
 
-        rezultati = pd.DataFrame({'Vrednost': [form(R), form(Ru), form(YbarKapa), form(self.Y.mean()), form(pristrastnostR),
-                                               f'{rel_pristrastnost:.2f}%', form(YtotalKapa), form(self.Y.sum()), form(pristrasnostTotal)]},
+        rezultati = pd.DataFrame({'Vrednost': [kolicnik.parametar, kolicnik.ocena, sredina.ocena, sredina.parametar,
+                                               sredina.pristrasnost, sredina.pristrasnost / sredina.parametar * 100,
+                                               total.ocena, total.parametar, total.pristrasnost]},
                                  index=['Količnik populacije (R)', 'Količnik uzorka (Ru)', 'Sredina Y količnički', 'Stvarna sredina Y',
                                         'Pristrasnost sredine', 'Relativna pristrasnost (%)', 'Total Y količnički', 'Stvarni total Y', 'Pristrasnost totala'])
-
-        print('\n--- KOLIČNIČKO OCENJIVANJE ---\n')
-        display(rezultati)
-
-        s = np.square(self.Y - X * R).sum()
-        SYt = np.sqrt(s * (self.N**2 * (1 - self.f)) / (self.n * (self.N - 1)))
-        SYm = np.sqrt(s * (1 - self.f) / (self.n * (self.N - 1)))
-        SR = np.sqrt(s * (1 - self.f) / (self.n * X.mean()**2 * (self.N - 1)))
+        prikazi('\n--- KOLIČNIČKO OCENJIVANJE ---\n', rezultati)
 
         devijacije = pd.DataFrame({
-            'Standardna devijacija': [form(SYt), form(SYm), form(SR)]
+            'Standardna devijacija': [total.std, sredina.std, kolicnik.std]
         }, index=['Totala Y', 'Sredine Y', 'Količnika'])
+        prikazi('\n--- STANDARDNE DEVIJACIJE ---', devijacije)
+
+        self.intervaliPoverenja(sredina.ocena, sredina.std)
+
+        self.SKGR = sredina.skg
+        return ocene
+
+    def _regresioneOcene(self, model, X, x):
+        '''Regresione ocene sredine i totala za već ocenjen model i odgovarajuće matrice populacije i uzorka.'''
+        ybarlr, Sylrs = jezgro.regresionaOcena(self.y.to_numpy(), x.to_numpy(dtype=float), X.mean().to_numpy(),
+                                               np.asarray(model.b), self.Ym, self.N)
 
-        print('\n--- STANDARDNE DEVIJACIJE ---')
-        display(devijacije)
+        return {'sredina': Ocena.izracunaj('sredina', ybarlr, Sylrs, self.alfa, self.n - 1, self.Ym),
+                'total': Ocena.izracunaj('total', self.N * ybarlr, self.N * Sylrs, self.alfa, self.n - 1, self._total('plata'))}
 
-        self.intervaliPoverenja(YbarKapa, SYm)
+    @meri
+    def regresionaOcena(self, alfa=0.1):
+        '''Regresiona ocena sredine i totala, bez ispisa i bez izmene matrica X i x objekta.
 
-        self.SKGR = pristrastnostR**2 + SYm**2
+        Parametri:
+        ----------
+        alfa : float
+            Nivo značajnosti za eliminaciju promenljivih.
 
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'sredina' i 'total' sa standardnim greškama i intervalima poverenja.'''
+        x = ONK.dizajn(self.x)
+        X = self._sredineX().to_frame().T if self.vanMemorije else ONK.dizajn(self.X)
+        model = ONK.oceniSig(x, self.y, alfa)
+        kolone = list(model.kolone)
+        return self._regresioneOcene(model, X.loc[:, kolone], x.loc[:, kolone])
+
+    @meri
     def regresionoOcenjivanje(self, alfa=0.1):
         ''' Regresiono ocenjivanje sredine i totala korišćenjem ONK modela.
     
@@ -134,80 +260,58 @@ class PSU:
         ----------
         alfa : float
             Nivo značajnosti za eliminaciju promenljivih. '''
+        self._uMemoriji('regresionoOcenjivanje')
         print('\n--- REGRESIONO OCENJIVANJE ---')
     
-        self.model.fit(self.X, self.Y)
-        self.X = self.model.x
-        rezultat = self.model.fit(self.x, self.y)
-    
-        print('\nMetodom običnih najmanjih kvadrata ocenjen je model:')
-        display(rezultat)
-    
+        x = ONK.dizajn(self.x)
+        prikazi('\nMetodom običnih najmanjih kvadrata ocenjen je model:', ONK.oceni(self.x, self.y).tabela)
         print('\nZnačajni parametri nakon iterativne eliminacije:')
-        znacajni_rezultat = self.model.fitsig(alfa)
-        display(znacajni_rezultat)
-        self.x = self.model.x
-        self.X = self.X.loc[:, list(self.x.columns)]
+        model = ONK.oceniSig(x, self.y, alfa, prikaz=True)
+        prikazi(None, model.tabela)
+        kolone = list(model.kolone)
+        X, x = ONK.dizajn(self.X).loc[:, kolone], x.loc[:, kolone]
     
         print('\nJednačina modela:')
-        print(self.model.matOblik)
-    
-        xm = self.x.mean()
-        Xm = self.X.mean()
-    
-        ybarlr = self.ym + (Xm - xm) @ self.model.b
-        pristrasnostLr = ybarlr - self.Ym
-    
-        rho = self.x.loc[:, self.x.std() > 0].apply(lambda col: col.corr(self.y))
-        sy = sum(np.square(self.y - self.Ym)) / (self.n - 1)
-        Sylrs = np.sqrt((1 - rho**2) * sy * ((1 - self.f) / self.n))
-    
-        ybarlr2 = self.model.predict(self.x, mean=True)
-    
-        rezultati_sredina = pd.DataFrame({
-            'Vrednost': [
-                form(ybarlr),
-                form(Sylrs.mean()),
-                form(pristrasnostLr),
-                form(ybarlr2)
-            ]
-        }, index=[
-            'Regresiona ocena sredine (poznat Xm)',
-            'Standardna devijacija regresione ocene',
-            'Pristrasnost regresione ocene',
-            'Regresiona ocena sredine (uzorak)'
-        ])
-    
-        print('\n--- OCENE SREDINE ---')
-        display(rezultati_sredina)
-    
-        self.intervaliPoverenja(ybarlr, Sylrs.mean())
-    
-        Ytotallr1 = self.model.predict(self.X, total=True)
-        Ytotallr2 = self.model.predict(self.x, total=True) * self.N / self.n
-    
-        rezultati_total = pd.DataFrame({
-            'Vrednost': [form(Ytotallr1), form(Ytotallr2), form(self.Y.sum())]
-        }, index=[
-            'Regresiona ocena totala (populacija)',
-            'Regresiona ocena totala (proširen uzorak)',
-            'Stvarni total'
-        ])
-    
-        print('\n--- OCENE TOTALA ---')
-        display(rezultati_total)
-    
-        self.SKGLr = pristrasnostLr**2 + Sylrs.mean()**2
+        print(model.matOblik)
+
+        ocene = self._regresioneOcene(model, X, x)
+        sredina, total = ocene['sredina'], ocene['total']
+
+        prikazi('\n--- OCENE SREDINE ---', tabelaVrednosti({
+            'Regresiona ocena sredine (poznat Xm)': sredina.ocena,
+            'Standardna devijacija regresione ocene': sredina.std,
+            'Pristrasnost regresione ocene': sredina.pristrasnost,
+            'Regresiona ocena sredine (uzorak)': model.predict(x).mean()}))
     
-        rezultati_skg = pd.DataFrame({
-            'Vrednost': [form(self.SKGR), form(self.SKGLr)]
-        }, index=[
-            'SKG količničkog ocenjivanja',
-            'SKG regresionog ocenjivanja'
-        ])
+        self.intervaliPoverenja(sredina.ocena, sredina.std)
+
+        prikazi('\n--- OCENE TOTALA ---', tabelaVrednosti({
+            'Regresiona ocena totala (populacija)': model.predict(X).sum(),
+            'Regresiona ocena totala (proširen uzorak)': model.predict(x).sum() * self.N / self.n,
+            'Stvarni total': total.parametar}))
     
-        print('\n--- SREDNJE KVADRATNE GREŠKE ---')
-        display(rezultati_skg)
+        self.SKGLr = sredina.skg
+
+        prikazi('\n--- SREDNJE KVADRATNE GREŠKE ---', tabelaVrednosti({
+            'SKG količničkog ocenjivanja': self.SKGR,
+            'SKG regresionog ocenjivanja': self.SKGLr}))
+        return ocene
+
+    def ocena(self, ocena, stdev, parametar = None, naziv = 'sredina'):
+        '''Formira numerički rezultat (klasa Ocena) sa intervalima poverenja za sve nivoe značajnosti.
+
+        Parametri:
+        ----------
+        ocena : float
+            Procena sredine ili totala.
+        stdev : float
+            Standardna greška procene.
+        parametar : float, opciono
+            Prava vrednost; podrazumevano sredina populacije.
+        naziv : str, opciono
+            Oznaka ocene.'''
+        parametar = self.Ym if parametar is None else parametar
+        return Ocena.izracunaj(naziv, ocena, stdev, self.alfa, self.n - 1, parametar)
 
     def intervaliPoverenja(self, ocena, stdev, parametar = None):
         ''' Formira DataFrame sa intervalima poverenja za datu ocenu.
@@ -220,61 +324,150 @@ class PSU:
             Standardna greška procene.
         parametar : float, opciono
             Prava vrednost za proveru da li se nalazi u intervalu.'''
-        parametar = self.Ym if parametar is None else parametar
-        intervali = []
-        for a in self.alfa:
-            t = stats.t.ppf(1 - a / 2, self.n - 1)
-            donja = ocena - t * stdev
-            gornja = ocena + t * stdev
-            raspon = gornja - donja
-            if parametar is not None:
-                sadrzi = 'DA' if donja <= parametar <= gornja else 'NE'
-                intervali.append([ocena, stdev, f'{(1 - a)*100:.1f}%', form(donja), form(gornja), form(raspon), sadrzi])
-            else:
-                intervali.append([ocena,stdev, f'{(1 - a)*100:.1f}%', form(donja), form(gornja), form(raspon)])
-
-        kolone = ['Ocena', 'Standardna devijacija','Interval', 'Donja granica', 'Gornja granica', 'Raspon']
-        if parametar is not None:
-            kolone.append('Sadrži pravu vrednost')
-    
-        df_intervali = pd.DataFrame(intervali, columns=kolone).set_index('Interval')
-        print(f'\n--- INTERVALI POVERENJA ---')
-        display(df_intervali)
+        df_intervali = tabelaIntervala(self.ocena(ocena, stdev, parametar))
+        prikazi(f'\n--- INTERVALI POVERENJA ---', df_intervali)
         return df_intervali
 
-    def plot(self, k=1000):
+    def replikacije(self, metod = 'jackknife', **parametri):
+        '''Replikacione težine za trenutni uzorak (vidi klasu Replikacije).
+
+        Parametri:
+        ----------
+        metod : str
+            'jackknife', 'brr' ili 'bootstrap'.
+        parametri : dict
+            Dodatni parametri izabranog metoda (npr. B za bootstrap, fay za BRR).'''
+        return Replikacije.izDizajna(self, metod, **parametri)
+
+    @meri
+    def replikacionaOcena(self, metod = 'jackknife', var = 'obrazovanje', **parametri):
+        '''Ocene sredine sa replikacionim standardnim greškama, bez ispisa.
+
+        Parametri:
+        ----------
+        metod : str
+            'jackknife', 'brr' ili 'bootstrap'.
+        var : str
+            Pomoćna promenljiva za količničku ocenu.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'sredina' (Hajekova), 'kolicnicka' i 'regresiona' (GREG sa svim kolonama matrice x).'''
+        rep = self.replikacije(metod, **parametri)
+        x, Xm = pd.DataFrame(self.x), self._sredineX()
+        if 'const' not in x.columns:
+            x.insert(0, 'const', 1)
+        return {'sredina': rep.sredina(self.y, parametar=self.Ym),
+                'kolicnicka': rep.kolicnicka(self.y, x[var], Xm[var], parametar=self.Ym),
+                'regresiona': rep.regresiona(self.y, x, Xm[x.columns].to_numpy(), parametar=self.Ym)}
+
+    @property
+    def tezine(self):
+        '''Dizajn težine jedinica uzorka (N / n).'''
+        return np.full(self.n, self.N / self.n)
+
+    def kalibracija(self, margine = None, metod = 'raking', **parametri):
+        '''Kalibriše težine uzorka na margine populacije (vidi klasu Kalibracija).
+
+        Parametri:
+        ----------
+        margine : list[tuple[list[str], pd.Series]], opciono
+            Margine populacije; podrazumevano region x pol, starosne grupe i obrazovanje iz foldera podaci.
+        metod : str
+            'raking', 'linearna' ili 'logit'.
+        parametri : dict
+            Dodatni parametri metoda (npr. granice za logit).
+
+        Rezultat:
+        ----------
+        tuple[Kalibracija, pd.Series]
+            Objekat kalibracije i kalibrisane težine indeksirane kao uzorak.'''
+        kal = Kalibracija(dodajStarosneGrupe(self.uzorak), podrazumevaneMargine() if margine is None else margine, d=self.tezine)
+        w = kal.raking(**parametri) if metod == 'raking' else kal.greg(metod, **parametri)
+        return kal, pd.Series(w, index=self.uzorak.index, name='tezina')
+
+    @meri
+    def kalibrisanaOcena(self, margine = None, metod = 'raking', **parametri):
+        '''Ocene totala i sredine Y sa kalibrisanim težinama, bez ispisa.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'total' i 'sredina' za populaciju opisanu marginama.'''
+        kal, w = self.kalibracija(margine, metod, **parametri)
+        return kal.ocena(self.y, w.to_numpy(), f=self.n / kal.N, alfa=self.alfa, parametar=self.Ym)
+
+    @meri
+    def domenskaOcena(self, promenljive = ['region', 'urban', 'zene'], kombinacije = None):
+        '''Ocene sredine i totala Y za sve domene zadatih promenljivih i njihovih ukrštanja, u jednom prolazu kroz uzorak.
+
+        Parametri:
+        ----------
+        promenljive : list[str], opciono
+            Domenske promenljive.
+        kombinacije : list[tuple[str]], opciono
+            Ukrštanja; podrazumevano sve kombinacije promenljivih.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Tabela ocena po domenima (vidi klase.Domeni.oceneDomena), sa pravim sredinama domena u populaciji.'''
+        stratumi = 'Strata' if 'Strata' in self.uzorak.columns else None
+        return oceneDomena(self.uzorak, 'plata', self.tezine, promenljive, stratumi=stratumi,
+                           kombinacije=kombinacije, alfa=self.alfa, populacija=self.df)
+
+    @meri
+    def plot(self, k=1000, putanja=None, alfa=None):
         ''' Vizualizuje distribuciju Bootstrapping proseka plata iz uzorka,
         koristeći plotDist iz klase Bootstrapping.
         
         Parametri:
         ----------
         k : int
-            Broj Bootstrapping uzoraka. Podrazumevano: 1000'''
+            Broj Bootstrapping uzoraka. Podrazumevano: 1000
+        putanja : str, opciono
+            Fajl u koji se grafik čuva umesto prikazivanja.
+        alfa : list[float], opciono
+            Nivoi značajnosti čiji se intervali crtaju (podrazumevano self.alfa), npr. sa nivoom iz minimalni_interval.'''
+        self._uMemoriji('plot')
         if self.bs is None:
             self.bs = Bootstrapping(self.df, alfa=self.alfa, n=self.n)
             self.bs.fit(k)
-        self.bs.plotDist(alfa= self.alfa, target = self.y.mean())
+        self.bs.plotDist(alfa= self.alfa if alfa is None else alfa, target = self.y.mean(), putanja = putanja)
+    def _minimalnaAlfa(self, k, seed = 42):
+        sredine = (self.bs.sredineUzoraka.to_numpy() if self.bs is not None
+                   else jezgro.bootstrapMomenti(self.df['plata'].to_numpy(), k, self.n, seed)[0])
+        return jezgro.minimalnaAlfa(sredine, self.y.mean(), np.linspace(0.001, 1, 500)[::-1])
+
+    @meri
+    def minimalniNivo(self, k = None, seed = 42):
+        '''Najveći nivo poverenja za koji bootstrap interval sadrži prosek uzorka (kao minimalni_interval),
+        bez izmene objekta: koristi postojeći self.bs ili k bootstrap sredina koje se ne čuvaju.
+
+        Rezultat:
+        ----------
+        float ili None
+            1 - alfa, ili None ako nijedan interval ne sadrži prosek uzorka.'''
+        self._uMemoriji('minimalniNivo')
+        a = self._minimalnaAlfa(3000 if k is None else k, seed)
+        return None if a is None else 1 - a
+
+    @meri
     def minimalni_interval(self, k = None):
         ''' Određuje najveći nivo značajnosti (najmanji interval poverenja) u kojem
         se prosečna vrednost ciljne promenljive iz uzorka nalazi unutar 
-        bootstrap distribucije srednjih vrednosti.''' 
-        target_mean = self.y.mean()
-        alfe = np.linspace(0.001, 1, 500)[::-1]
+        bootstrap distribucije srednjih vrednosti.
+
+        Vraća nivo poverenja 1 - alfa (ili None) i ne menja self.alfa; nivo se prosleđuje dalje
+        eksplicitno, npr. plot(alfa=sorted({*self.alfa, 1 - nivo})).''' 
         k = 3000 if k is None else k
+        self._uMemoriji('minimalni_interval')
         if self.bs is None:
             self.bs = Bootstrapping(self.df, alfa=self.alfa, n=self.n)
             self.bs.fit(k)
-        for a in alfe:
-            
-            interval = self.bs.interval(alfa=a).iloc[0]
-            donja, gornja = interval['donja'], interval['gornja']
-            if donja <= target_mean <= gornja:
-                if a not in self.alfa:
-                    self.alfa.append(a)
-                    self.alfa = sorted(self.alfa)
-                return 1 - a
-            
-        return None
+        a = self._minimalnaAlfa(k)
+        return None if a is None else 1 - a
 
     def __repr__(self):
         return f"{form(self.ym)}"
@@ -286,6 +479,7 @@ class SSU(PSU):
     
     Omogućava količničko i regresiono ocenjivanje unutar stratumskih podela,
     uz posebne i kombinovane procene, kao i proračun varijanse po stratumima.'''
+    @meri
     def __init__(self, df, X, Y, n, stratumi, alfa=[0.1, 0.05, 0.01], seed=1304):
         ''' df : pd.DataFrame
             Populacija (kompletan skup podataka).
@@ -300,16 +494,24 @@ class SSU(PSU):
         alfa : list[float], opciono
             Nivoi značajnosti. Podrazumevani: [0.1, 0.05, 0.01].
         seed : int, opciono
-            Seed za reproduktivnost izbora uzorka.'''
+            Seed za reproduktivnost izbora uzorka.
+
+        Ako je df objekat klase Populacija, stratumi se formiraju od kategorijskih kolona populacije,
+        a veličine i totali stratuma računaju se prolazom po blokovima, bez učitavanja populacije.'''
+        if isinstance(df, Populacija):
+            self._stratumiPopulacije(df, n, stratumi, alfa, seed)
+            return
         super().__init__(df, X, Y, n, alfa=alfa, seed=seed)
 
-        self.df['Strata'] = self.df[stratumi].astype(str).agg('_'.join, axis=1)
+        self.strata = self.df[stratumi].astype(str).agg('_'.join, axis=1).rename('Strata')
         self.stratumi = stratumi
-        self.strataCounts = self.df['Strata'].value_counts(normalize=True)
+        self.strataCounts = self.strata.value_counts(normalize=True)
         self.nh = (self.strataCounts * n).round().astype(int)
     
-        self.uzorak = pd.concat([self.df[self.df['Strata'] == strata].sample(n=size, random_state=seed) 
-                                 for strata, size in self.nh.items()])
+        with raspon('uzorkovanje'):
+            self.uzorak = pd.concat([self.df[self.strata == strata].sample(n=size, random_state=seed) 
+                                     for strata, size in self.nh.items()])
+        self.uzorak['Strata'] = self.strata.loc[self.uzorak.index]
         self.x = self.uzorak['obrazovanje']
         self.y = self.uzorak['plata']
         self.X = self.df['obrazovanje']
@@ -320,74 +522,194 @@ class SSU(PSU):
         self.N = self.df.shape[0]
         self.n = self.uzorak.shape[0]
         self.f = self.n / self.N
+        self._agregatiStratuma(self.strata.value_counts())
+        
+    def _stratumiPopulacije(self, populacija, n, stratumi, alfa, seed):
+        '''Stratifikovan uzorak iz populacije van memorije (proporcionalna alokacija, kao za DataFrame).'''
+        self.df = populacija
+        self.alfa = list(alfa)
+        self.seed = seed
+        self.stratumi = stratumi
+        self.model = ONK(alfa)
+        self.bs = None
+        self.X, self.Y = None, None
+
+        self._grupne = populacija.grupneSume(stratumi, ['plata', 'obrazovanje'])
+        oznake = self._grupne.index.map(lambda k: '_'.join(map(str, k)) if isinstance(k, tuple) else str(k))
+        self._grupne.index = oznake
+        Nh = self._grupne['N']
+        self.strataCounts = (Nh / populacija.N)[Nh > 0]
+        nh = (self.strataCounts * n).round().astype(int)
+        izbor = populacija.stratifikovaniUzorak(stratumi, nh.reindex(oznake, fill_value=0).to_numpy(), seed=seed)
+
+        self.uzorak = populacija.uzmi(izbor)
+        kodovi = np.zeros(len(izbor), dtype=np.int64)
+        for kol in stratumi:
+            kodovi = kodovi * len(populacija.kategorije[kol]) + self.uzorak[kol].cat.codes.to_numpy()
+        self.uzorak['Strata'] = np.asarray(oznake)[kodovi]
+
+        self.x = self.uzorak['obrazovanje']
+        self.y = self.uzorak['plata']
+        self.Xtotal = populacija.suma('obrazovanje')
+        self.Ym = populacija.sredina('plata')
+        self.Ytotal = populacija.suma('plata')
+        self.Xm = populacija.sredina('obrazovanje')
+        self.ym = self.y.mean()
+        self.xm = self.x.mean()
+        self.N = populacija.N
+        self.n = self.uzorak.shape[0]
+        self.f = self.n / self.N
+        self._agregatiStratuma(Nh[Nh > 0].astype(int))
+
+    def _agregatiStratuma(self, Nh):
+        '''Kodovi stratuma jedinica uzorka (stratumi sortirani po oznaci) i veličine, sredine i varijanse po stratumima.'''
+        kod, oznake = pd.factorize(self.uzorak['Strata'], sort=True)
+        self._kod, self._oznake = kod, pd.Index(oznake, name='Strata')
+        _, ybarh, S2h = jezgro.stratumskiMomenti(kod, self.y.to_numpy(), len(oznake))
         self.nh = self.uzorak['Strata'].value_counts()
-        self.Nh = self.df['Strata'].value_counts()
-        self.ybarh = self.uzorak.groupby('Strata')['plata'].mean()
+        self.Nh = Nh
+        self.ybarh = pd.Series(ybarh, index=self._oznake, name='plata')
         self.Wh = self.Nh / self.N
         self.fh = self.nh / self.Nh
-        self.S2h = self.uzorak.groupby('Strata')['plata'].var()
-        
+        self.S2h = pd.Series(S2h, index=self._oznake, name='plata')
+
+    def _velicineStratuma(self):
+        '''N_h i n_h kao nizovi, redom stratuma iz _oznake.'''
+        return self.Nh.reindex(self._oznake).to_numpy(dtype=float), self.nh.reindex(self._oznake).to_numpy(dtype=float)
+
+    def _sumePoStratumima(self, kolona):
+        '''Totali kolone u populaciji po stratumima.'''
+        if not self.vanMemorije:
+            return self.df[kolona].groupby(self.strata).sum()
+        if kolona not in self._grupne.columns:
+            self._grupne[kolona] = self.df.grupneSume(self.stratumi, [kolona])[kolona].to_numpy()
+        return self._grupne.loc[self.Nh.index, kolona]
+
+    def _sredineX(self):
+        Xm = pd.Series({'obrazovanje': self.Xm}) if self.vanMemorije else pd.DataFrame(self.X).mean()
+        return pd.concat([pd.Series({'const': 1.0}), Xm])
+
+    @property
+    def tezine(self):
+        '''Dizajn težine jedinica uzorka (N_h / n_h u stratumu jedinice).'''
+        return (self.Nh / self.nh).reindex(self.uzorak['Strata']).to_numpy()
+
+    @meri
+    def stratifikovanaOcena(self):
+        '''Stratifikovana ocena sredine i totala Y, bez ispisa.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'sredina' i 'total' sa standardnim greškama i intervalima poverenja.'''
+        Nh, _ = self._velicineStratuma()
+        ybarSt, SybarSt = jezgro.stratifikovana(Nh, self.ybarh.to_numpy(), self.S2h.to_numpy(), self.N, self.f)
+        return {'sredina': self.ocena(ybarSt, SybarSt, naziv='sredina'),
+                'total': self.ocena(self.N * ybarSt, self.N * SybarSt, parametar=self.Ytotal, naziv='total')}
+
     def describe(self):
         '''Prikazuje deskriptivnu statistiku uzorka i populacije, po stratumima.
     Takođe računa i prikazuje ocene sredine i totala uz intervale poverenja.'''
-        print("--- Uzorak: ---")
-        display(pd.DataFrame(self.nh))
-        display(self.uzorak.describe())
-        print("--- Populacija: ---")
-        display(self.df.describe())
-        self.ybarSt = self.Nh @ self.ybarh / self.N
-
-        VybarSt = ((1 - self.f) / self.N) * self.Wh @ (self.S2h)
-        SybarSt = np.sqrt(VybarSt)
-        intervali = []
-        self.intervaliPoverenja(self.ybarSt, SybarSt)
-
-        YtotalSt = self.N * self.ybarSt
-        SYtotalSt = self.N * SybarSt
-
-        self.intervaliPoverenja(YtotalSt, SYtotalSt, parametar= self.Y.sum())
-        
+        prikazi("--- Uzorak: ---", pd.DataFrame(self.nh))
+        prikazi(None, self.uzorak.describe())
+        prikazi("--- Populacija: ---", self.df.describe())
+        ocene = self.stratifikovanaOcena()
+        self.ybarSt = ocene['sredina'].ocena
+
+        for ocena in ocene.values():
+            prikazi(f'\n--- INTERVALI POVERENJA ---', tabelaIntervala(ocena))
+        return ocene
+
+    @meri
+    def kolicnickaOcena(self, var='obrazovanje'):
+        '''Posebna i kombinovana količnička ocena sredine i totala Y, bez ispisa.
+
+        Parametri:
+        ----------
+        var : str
+            Promenljiva za količničko ocenjivanje.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Posebne ocene 'sredina' i 'total' i kombinovane 'sredinaKombinovana' i 'totalKombinovana'.'''
+        Nh, nh = self._velicineStratuma()
+        H = len(self._oznake)
+        x, y = self.uzorak[var].to_numpy(dtype=float), self.y.to_numpy(dtype=float)
+        rho, Sxyh, Sx2h = jezgro.stratumskeKorelacije(self._kod, x, y, H)
+        _, xbarh, _ = jezgro.stratumskiMomenti(self._kod, x, H)
+        yh = np.bincount(self._kod, weights=y, minlength=H)
+        xh = np.bincount(self._kod, weights=x, minlength=H)
+        Yh = self._sumePoStratumima('plata').reindex(self._oznake).to_numpy(dtype=float)
+        Xh = self._sumePoStratumima(var).reindex(self._oznake).to_numpy(dtype=float)
+        S2h, ybarh = self.S2h.to_numpy(), self.ybarh.to_numpy()
+
+        YtotalRs, SYtotalRs = jezgro.posebnaKolicnicka(Nh, nh, self.f, Yh, Xh, yh, xh, S2h, Sx2h, rho)
+        YtotalRc, SYtotalRc = jezgro.kombinovanaKolicnicka(Nh, nh, nh / Nh, self.N, ybarh, xbarh, S2h, Sx2h, Sxyh,
+                                                          self._total(var))
+
+        return {'sredina': self.ocena(YtotalRs / self.N, SYtotalRs / self.N, naziv='sredina'),
+                'total': self.ocena(YtotalRs, SYtotalRs, parametar=self.Ytotal, naziv='total'),
+                'sredinaKombinovana': self.ocena(YtotalRc / self.N, SYtotalRc / self.N, naziv='sredinaKombinovana'),
+                'totalKombinovana': self.ocena(YtotalRc, SYtotalRc, parametar=self.Ytotal, naziv='totalKombinovana')}
+
+    @meri
     def kolicnickoOcenjivanje(self):
         ''' Sprovodi posebnu i kombinovanu količničku ocenu sredine i totala
     koristeći podatke po stratumima. Računa korelacije i varijanse.
 
     Prikazuje rezultate sa pristrasnošću, intervalima poverenja
     i srednjim kvadratnim greškama (SKG).'''
-        Yh = self.df.groupby('Strata')['plata'].sum()
-        Xh = self.df.groupby('Strata')['obrazovanje'].sum()
-        Rh = Yh / Xh
-        self.rho = self.uzorak.groupby('Strata')['obrazovanje'].corr(self.y)
-        yh = self.uzorak.groupby('Strata')['plata'].sum()
-        xh = self.uzorak.groupby('Strata')['obrazovanje'].sum()
-        Sx2h = self.uzorak.groupby('Strata')['obrazovanje'].var()
-        YtotalRs = (yh / xh) @ (Xh)
-        SYtotalRs = np.sqrt((((np.square(self.Nh) * (1 - self.f))) / self.nh) @ 
-                            ((self.S2h + np.square(Rh) * Sx2h - (2 * Rh * self.rho.values * np.sqrt(self.S2h) * np.sqrt(Sx2h)))))
-
-        YbarRs = YtotalRs / self.N
-        SYbarRs = SYtotalRs / self.N
-        
-        print('\n--- POSEBNA KOLIČNIČKA OCENA ---\n')
-
-        print('korelacija godina obrazovanja sa zaradom po stratumima'.upper())
-        display(pd.DataFrame(self.rho))
-
-        self.intervaliPoverenja(YbarRs, SYbarRs, parametar= self.Ym)
-        self.intervaliPoverenja(YtotalRs, SYtotalRs, parametar= self.Ytotal)
+        ocene = self.kolicnickaOcena()
+        self.rho = self._korelacije()
 
+        print('\n--- POSEBNA KOLIČNIČKA OCENA ---\n')
+        prikazi('korelacija godina obrazovanja sa zaradom po stratumima'.upper(), pd.DataFrame(self.rho))
 
-        print('\n--- KOMBINOVANA KOLIČNIČKA OCENA ---\n')
-        xbarh = self.uzorak.groupby('Strata')['obrazovanje'].mean()
-        xbarSt = self.Nh.dot(xbarh) / self.N
-        YtotalRc = self.ybarSt / xbarSt * self.Xtotal
-        YbarRc = YtotalRc / self.N
+        self.intervaliPoverenja(ocene['sredina'].ocena, ocene['sredina'].std, parametar= self.Ym)
+        self.intervaliPoverenja(ocene['total'].ocena, ocene['total'].std, parametar= self.Ytotal)
 
-        display(pd.DataFrame({'Ocena': [YbarRc, YtotalRc], 'Stvarna vrednost': [self.Ym, self.Ytotal],
-                              'Pristrasnost': [YbarRc - self.Ym, YtotalRc - self.Ytotal]} ,
+        sredina, total = ocene['sredinaKombinovana'], ocene['totalKombinovana']
+        prikazi('\n--- KOMBINOVANA KOLIČNIČKA OCENA ---\n',
+                pd.DataFrame({'Ocena': [sredina.ocena, total.ocena], 'Stvarna vrednost': [sredina.parametar, total.parametar],
+                              'Pristrasnost': [sredina.pristrasnost, total.pristrasnost]},
                              index=['Sredina', 'Total']))
-        self.SKGRs = np.square(YbarRs - self.Ym) + np.square(SYbarRs)
-
+        self.SKGRs = ocene['sredina'].skg
+        return ocene
+
+    def _regresijaPoStratumima(self):
+        '''Prosta regresija zarade na obrazovanje posebno u svakom stratumu: koeficijenti, regresione ocene
+        sredina po stratumima, posebna regresiona ocena sredine populacije i njena standardna greška.'''
+        Nh, nh = self._velicineStratuma()
+        H = len(self._oznake)
+        x = self.uzorak['obrazovanje'].to_numpy(dtype=float)
+        b0, b1 = jezgro.regresijaPoGrupama(self._kod, x, self.y.to_numpy(dtype=float), H)
+        _, xbarh, _ = jezgro.stratumskiMomenti(self._kod, x, H)
+        Xbarh = self._sumePoStratumima('obrazovanje').reindex(self._oznake).to_numpy(dtype=float) / Nh
+        ybarlrh, ybarlrs, Sybarlrs = jezgro.regresionaPoStratumima(Nh, nh, self.N, self.ybarh.to_numpy(), b1, Xbarh, xbarh,
+                                                                   self.S2h.to_numpy(), self._korelacije().to_numpy())
+        b = pd.DataFrame({'const': b0, 'obrazovanje': b1}, index=list(self._oznake))
+        return b, pd.Series(ybarlrh, index=self._oznake), ybarlrs, Sybarlrs
+
+    def _korelacije(self, var = 'obrazovanje'):
+        '''Korelacija promenljive var sa zaradom u svakom stratumu.'''
+        rho, _, _ = jezgro.stratumskeKorelacije(self._kod, self.uzorak[var].to_numpy(dtype=float),
+                                                self.y.to_numpy(dtype=float), len(self._oznake))
+        return pd.Series(rho, index=self._oznake, name=var)
+
+    @meri
+    def regresionaOcena(self):
+        '''Regresiona ocena sredine i totala sa posebnim modelom u svakom stratumu, bez ispisa.
+
+        Rezultat:
+        ----------
+        dict[str, Ocena]
+            Ocene 'sredina' i 'total' sa standardnim greškama i intervalima poverenja.'''
+        _, _, ybarlrs, Sybarlrs = self._regresijaPoStratumima()
+        return {'sredina': self.ocena(ybarlrs, Sybarlrs, naziv='sredina'),
+                'total': self.ocena(self.N * ybarlrs, self.N * Sybarlrs, parametar=self.Ytotal, naziv='total')}
 
+    @meri
     def regresionoOcenjivanje(self):
         '''Regresiono ocenjivanje po stratumima: za svaki stratum posebno se trenira ONK model.
 
@@ -397,34 +719,16 @@ class SSU(PSU):
         Prikazuje ocene sredina po stratumima, njihovu pristrasnost i
         formira intervale poverenja za ukupnu regresionu procenu.
         Računa SKG regresione metode.'''
-        x = self.uzorak[['obrazovanje', 'Strata']]
-        y = self.uzorak[['plata', 'Strata']]
-        X = self.df[['obrazovanje', 'Strata']]
-        Y = self.df[['plata', 'Strata']]
-        b = pd.DataFrame()
-        for ime, grupa in self.uzorak.groupby('Strata'):
-            y = grupa['plata']
-            x = grupa[['obrazovanje']]
-            model = ONK()
-            model.fit(x, y)
-            b[ime] = model.b
-        b = b.T
-        print('\n--- REGRESIONI KOEFICIENTI PO STRATUMIMA ---\n')
-        display(b)
-
-        Xbarh = self.df.groupby('Strata')['obrazovanje'].mean()
-        xbarh = self.uzorak.groupby('Strata')['obrazovanje'].mean()
-        ybarlrh = self.ybarh + b.loc[:, 'obrazovanje'] * (Xbarh - xbarh)
-        ybarlrh.name = 'Ocena'
-        self.ybarh.name = 'Stvarna vrednost'
-        print('\n--- REGRESIONA OCENA PO STRATUMIMA ---\n')
-        display(pd.DataFrame({'Ocena': ybarlrh.values, 'Stvarna vrednost': self.ybarh.values, 'Pristrasnost': ybarlrh.values - self.ybarh.values},
+        b, ybarlrh, _, _ = self._regresijaPoStratumima()
+        prikazi('\n--- REGRESIONI KOEFICIENTI PO STRATUMIMA ---\n', b)
+
+        prikazi('\n--- REGRESIONA OCENA PO STRATUMIMA ---\n',
+                pd.DataFrame({'Ocena': ybarlrh.values, 'Stvarna vrednost': self.ybarh.values, 'Pristrasnost': ybarlrh.values - self.ybarh.values},
                              index = ybarlrh.index))
 
-        ybarlrs = self.Wh.dot(ybarlrh)
-        Sybarlrs = np.sqrt(((np.square(self.Wh) * (1 - self.fh)) / self.nh).dot(self.S2h * (1 - np.square(self.rho))))
-        self.intervaliPoverenja(ybarlrs, Sybarlrs, parametar= self.Ym)
+        ocene = self.regresionaOcena()
+        sredina = ocene['sredina']
+        self.intervaliPoverenja(sredina.ocena, sredina.std, parametar= self.Ym)
 
-        SKGLr = np.square(ybarlrs - self.Ym) + np.square(Sybarlrs)    
-        display(pd.DataFrame({'Vrednost': [form(self.SKGRs), form(SKGLr)]}, 
-                                     index=['SKG količničkog ocenjivanja','SKG regresionog ocenjivanja']))
+        prikazi(None, tabelaVrednosti({'SKG količničkog ocenjivanja': self.SKGRs, 'SKG regresionog ocenjivanja': sredina.skg}))
+        return ocene
@@ -1,26 +1,137 @@
+import importlib
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
-import locale
-locale.setlocale(locale.LC_ALL, 'sr_RS.UTF-8')
+from klase.momenti import Momenti
+
+
+class LenjiModul:
+    '''Modul koji se uvozi tek pri prvom pristupu nekom njegovom atributu.
+
+    Grafičke biblioteke (matplotlib, seaborn) i scipy.stats su spori za uvoz, a potrebni su samo
+    za crtanje i testove; numerički deo paketa se zato uvozi bez njih.'''
+    def __init__(self, ime):
+        self._ime = ime
+
+    def __getattr__(self, atribut):
+        return getattr(importlib.import_module(self._ime), atribut)
+
+    def __repr__(self):
+        return f"LenjiModul({self._ime})"
+
+
+plt = LenjiModul('matplotlib.pyplot')
+sns = LenjiModul('seaborn')
+stats = LenjiModul('scipy.stats')
+
+_SRPSKI = str.maketrans(',.', '.,')
+
 
 def form(value):
+    '''Broj sa dve decimale u srpskom zapisu (tačka za hiljade, zarez za decimale), bez promene locale-a.'''
     if isinstance(value, (int, float, np.number)):
-        return locale.format_string('%.2f', value, grouping=True)
+        return f'{value:,.2f}'.translate(_SRPSKI)
     return str(value)
-pd.options.display.float_format = lambda x: form(x)
-np.set_printoptions(formatter={'all': lambda x: form(x)})
-
-def jb( var, alfa = 0.1):
-    mi3, mi4 = [((var - var.mean())**momenat).mean() for momenat in [3,4]]
-    sigma3, sigma4 = [var.std() ** momenat for momenat in [3,4]]
-    S, K = mi3 / sigma3, mi4 / sigma4
-    JB = len(var) * (np.square(S) + np.square(K - 3) / 4) / 6
-    p = stats.chi2.sf(JB, df=2)
-    if p < alfa:
-        print(f'Uz rizik greške od {alfa * 100}%, odbacujem nultu hipotezu i zaključujem da se raspodela varijable {var.name} statistički značajno razlikuje od normalne')
+
+def formatiraj(vrednosti, decimale = 2):
+    '''Niz brojeva u srpskom zapisu (kao form), formatiran odjednom.
+
+    Cifre se izračunavaju celobrojnom aritmetikom nad celim nizom i upisuju u matricu znakova
+    (jedan red po broju), koja se na kraju čita kao niz stringova. Beskonačne vrednosti, NaN,
+    brojevi van opsega int64 i brojevi čiji je skalirani razlomak na nekoliko ulp od polovine (gde
+    bi zaokruživanje proizvoda a * 10^decimale moglo da se razlikuje od tačnog zaokruživanja u form)
+    formatiraju se pojedinačno, pa je rezultat isti kao form i za granične slučajeve.
+
+    Parametri:
+    ----------
+    vrednosti : array-like
+        Brojevi proizvoljnog oblika.
+    decimale : int, opciono
+        Broj decimala.
+
+    Rezultat:
+    ----------
+    np.ndarray
+        Stringovi istog oblika kao ulaz.'''
+    a = np.asarray(vrednosti, dtype=float)
+    oblik, a = a.shape, a.ravel()
+    skala = 10 ** decimale
+    konacni = np.isfinite(a) & (np.abs(a) < 9e15 / skala)
+    skalirano = np.abs(np.where(konacni, a, 0.0)) * skala
+    pojedinacno = ~konacni | (np.abs(skalirano - np.floor(skalirano) - 0.5) <= 4 * np.spacing(skalirano))
+    cent = np.rint(np.where(pojedinacno, 0.0, skalirano)).astype(np.int64)
+    ceo, dec = cent // skala, cent % skala
+    cifara = len(str(ceo.max())) if len(a) else 1
+    razlomak = decimale + 1 if decimale > 0 else 0
+    W = 1 + cifara + (cifara - 1) // 3 + razlomak
+    znakovi = np.full((len(a), W), ord(' '), dtype=np.uint8)
+    kolona = W - 1
+    for _ in range(decimale):
+        znakovi[:, kolona] = 48 + dec % 10
+        dec //= 10
+        kolona -= 1
+    if decimale > 0:
+        znakovi[:, kolona] = ord(',')
+        kolona -= 1
+    duzina = np.zeros(len(a), dtype=np.int64)
+    for i in range(cifara):
+        ima = (ceo > 0) | (i == 0)
+        if i > 0 and i % 3 == 0:
+            znakovi[:, kolona] = np.where(ima, ord('.'), ord(' '))
+            duzina += ima
+            kolona -= 1
+        znakovi[:, kolona] = np.where(ima, 48 + ceo % 10, ord(' '))
+        duzina += ima
+        ceo //= 10
+        kolona -= 1
+    negativni = np.signbit(a) & ~pojedinacno
+    znakovi[negativni, W - 1 - razlomak - duzina[negativni]] = ord('-')
+    tekst = np.char.lstrip(znakovi.view(f'S{W}').ravel()).astype(str)
+    if pojedinacno.any():
+        ostali = [f'{x:,.{decimale}f}'.translate(_SRPSKI) for x in a[pojedinacno]]
+        tekst = tekst.astype(f'U{max(W, max(map(len, ostali)))}')
+        tekst[pojedinacno] = ostali
+    return tekst.reshape(oblik)
+
+def jb(var, alfa = 0.1, prikaz = False, axis = None):
+    '''Jarque-Bera test normalnosti.
+
+    Momenti se računaju u jednom prolazu (klase.momenti.Momenti), duž zadate ose, pa se test
+    radi odjednom za svaku repliku, stratum ili vektor reziduala.
+
+    Parametri:
+    ----------
+    var : pd.Series, pd.DataFrame, np.ndarray ili Momenti
+        Podaci ili već izračunati (npr. spojeni po blokovima) momenti.
+    alfa : float, opciono
+        Nivo značajnosti za zaključak.
+    prikaz : bool, opciono
+        Da li ispisati zaključak testa.
+    axis : int, opciono
+        Osa duž koje su opservacije; podrazumevano kolone DataFrame-a, odnosno poslednja osa niza.
+
+    Rezultat:
+    ----------
+    pd.Series ili pd.DataFrame
+        JB i p za jednu promenljivu, odnosno tabela sa kolonama JB i p.'''
+    if isinstance(var, Momenti):
+        m = var
     else:
-        print(f'Uz rizik greške od {alfa * 100}%, ne odbacujem nultu hipotezu i zaključujem da se raspodela varijable {var.name} ne razlikuje značajno od normalne')
-    return pd.Series([JB, p], index= ['JB', 'p'])
+        axis = (0 if isinstance(var, pd.DataFrame) else -1) if axis is None else axis
+        m = Momenti.izNiza(var, axis)
+    JB = m.jb
+    p = stats.chi2.sf(JB, df=2)
+    ime = getattr(var, 'name', None)
+    if np.ndim(JB) == 0:
+        if prikaz:
+            if p < alfa:
+                print(f'Uz rizik greške od {alfa * 100}%, odbacujem nultu hipotezu i zaključujem da se raspodela varijable {ime} statistički značajno razlikuje od normalne')
+            else:
+                print(f'Uz rizik greške od {alfa * 100}%, ne odbacujem nultu hipotezu i zaključujem da se raspodela varijable {ime} ne razlikuje značajno od normalne')
+        return pd.Series([float(JB), float(p)], index= ['JB', 'p'])
+    indeks = None
+    if isinstance(var, pd.DataFrame) and np.ndim(JB) == 1:
+        indeks = var.columns if axis % 2 == 0 else var.index
+    rezultat = pd.DataFrame({'JB': np.ravel(JB), 'p': np.ravel(p)}, index=indeks)
+    if prikaz:
+        print(f'Uz rizik greške od {alfa * 100}%, nulta hipoteza o normalnosti odbačena je u {(rezultat["p"] < alfa).sum()} od {len(rezultat)} slučajeva')
+    return rezultat
@@ -0,0 +1,186 @@
+'''Merenje vremena po imenovanim rasponima i brojači za metode iz foldera klase.
+
+Merenje je podrazumevano isključeno: tada raspon() vraća jedan zajednički prazan kontekst,
+a broji() i metode označene sa @meri samo proveravaju jedan globalni indikator.
+
+Primer:
+    with instrumentacija() as izvestaj:
+        psu.regresionoOcenjivanje()
+    izvestaj.tabela()      # vreme po rasponima
+    izvestaj.brojaci()     # broj ONK ocena, bootstrap replika, kopiranih redova...'''
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import pstats
+import threading
+import time
+from collections import Counter, defaultdict
+import pandas as pd
+
+UKLJUCENO = False
+_RASPONI = defaultdict(lambda: [0, 0.0, 0.0])  # putanja -> [poziva, ukupno, sopstveno]
+_BROJACI = Counter()
+_STEK = threading.local()
+_NISTA = contextlib.nullcontext()
+
+
+def ukljuci(stanje = True):
+    '''Uključuje (ili isključuje) merenje.'''
+    global UKLJUCENO
+    UKLJUCENO = bool(stanje)
+
+
+def resetuj():
+    '''Briše sve izmerene raspone i brojače.'''
+    _RASPONI.clear()
+    _BROJACI.clear()
+
+
+class _Raspon:
+    __slots__ = ('naziv', 'putanja', 'pocetak', 'deca')
+
+    def __init__(self, naziv):
+        self.naziv = naziv
+
+    def __enter__(self):
+        stek = _STEK.__dict__.setdefault('stek', [])
+        self.putanja = f'{stek[-1].putanja}/{self.naziv}' if stek else self.naziv
+        self.deca = 0.0
+        stek.append(self)
+        self.pocetak = time.perf_counter()
+        return self
+
+    def __exit__(self, *greska):
+        trajanje = time.perf_counter() - self.pocetak
+        stek = _STEK.stek
+        stek.pop()
+        if stek:
+            stek[-1].deca += trajanje
+        zapis = _RASPONI[self.putanja]
+        zapis[0] += 1
+        zapis[1] += trajanje
+        zapis[2] += trajanje - self.deca
+        return False
+
+
+def raspon(naziv):
+    '''Kontekst koji meri vreme imenovanog raspona (ugnježdeni rasponi čuvaju putanju, npr. PSU.plot/Bootstrapping.fit).'''
+    return _Raspon(naziv) if UKLJUCENO else _NISTA
+
+
+def broji(naziv, koliko = 1):
+    '''Uvećava brojač (npr. 'ONK.fit', 'bootstrap replike', 'kopirani redovi').'''
+    if UKLJUCENO:
+        _BROJACI[naziv] += koliko
+
+
+def meri(funkcija = None, naziv = None):
+    '''Dekorator: svaki poziv funkcije meri se kao raspon (podrazumevani naziv je Klasa.metod).'''
+    if funkcija is None:
+        return functools.partial(meri, naziv=naziv)
+    naziv = funkcija.__qualname__ if naziv is None else naziv
+
+    @functools.wraps(funkcija)
+    def omotac(*args, **kwargs):
+        if not UKLJUCENO:
+            return funkcija(*args, **kwargs)
+        with _Raspon(naziv):
+            return funkcija(*args, **kwargs)
+    return omotac
+
+
+class Izvestaj:
+    '''Snimak izmerenih raspona i brojača.'''
+    def __init__(self):
+        self.osvezi()
+
+    def osvezi(self):
+        '''Ponovo preuzima trenutno stanje merenja.'''
+        self.rasponi = {putanja: list(zapis) for putanja, zapis in _RASPONI.items()}
+        self.brojaciRecnik = dict(_BROJACI)
+
+    def tabela(self):
+        '''Rasponi kao DataFrame: broj poziva, ukupno i sopstveno vreme (bez ugnježdenih raspona) i prosek, u sekundama.'''
+        tabela = pd.DataFrame.from_dict(self.rasponi, orient='index', columns=['poziva', 'ukupno', 'sopstveno'])
+        tabela.index.name = 'raspon'
+        tabela['prosek'] = tabela['ukupno'] / tabela['poziva']
+        return tabela.sort_values('ukupno', ascending=False)
+
+    def brojaci(self):
+        '''Brojači kao pd.Series.'''
+        return pd.Series(self.brojaciRecnik, name='broj', dtype=float).sort_index()
+
+    def uJson(self, putanja = None):
+        '''Izveštaj kao JSON tekst; ako je zadata putanja, upisuje se i u fajl.'''
+        tekst = json.dumps({'rasponi': {p: dict(zip(['poziva', 'ukupno', 'sopstveno'], z)) for p, z in self.rasponi.items()},
+                            'brojaci': self.brojaciRecnik}, ensure_ascii=False, indent=1)
+        if putanja is not None:
+            with open(putanja, 'w', encoding='utf-8') as f:
+                f.write(tekst)
+        return tekst
+
+    def __repr__(self):
+        return f"{self.tabela().to_string()}\n\n{self.brojaci().to_string()}"
+
+
+def izvestaj():
+    '''Trenutno stanje merenja (Izvestaj).'''
+    return Izvestaj()
+
+
+@contextlib.contextmanager
+def instrumentacija():
+    '''Uključuje merenje samo unutar bloka (od nule); vraća izveštaj koji je popunjen posle bloka.'''
+    prethodno = UKLJUCENO
+    resetuj()
+    ukljuci()
+    snimak = Izvestaj()
+    try:
+        yield snimak
+    finally:
+        ukljuci(prethodno)
+        snimak.osvezi()
+
+
+def profil(funkcija, *args, alat = 'cProfile', redova = 25, **kwargs):
+    '''Profilisanje jednog poziva funkcija(*args, **kwargs), uz istovremeno merenje raspona.
+
+    Parametri:
+    ----------
+    alat : str, opciono
+        'cProfile' (standardna biblioteka) ili 'pyinstrument' (ako je instaliran).
+    redova : int, opciono
+        Broj najskupljih funkcija u tekstualnom izveštaju (za cProfile).
+
+    Rezultat:
+    ----------
+    rezultat
+        Povratna vrednost funkcije.
+    tekst : str
+        Izveštaj profajlera.
+    izvestaj : Izvestaj
+        Rasponi i brojači izmereni tokom poziva.'''
+    if alat not in ('cProfile', 'pyinstrument'):
+        raise ValueError("alat mora biti 'cProfile' ili 'pyinstrument'")
+    with instrumentacija() as snimak:
+        if alat == 'cProfile':
+            profajler = cProfile.Profile()
+            rezultat = profajler.runcall(funkcija, *args, **kwargs)
+            izlaz = io.StringIO()
+            pstats.Stats(profajler, stream=izlaz).sort_stats('cumulative').print_stats(redova)
+            tekst = izlaz.getvalue()
+        else:
+            try:
+                from pyinstrument import Profiler
+            except ImportError as e:
+                raise ImportError('Za alat pyinstrument potrebno je instalirati paket pyinstrument') from e
+            profajler = Profiler()
+            profajler.start()
+            try:
+                rezultat = funkcija(*args, **kwargs)
+            finally:
+                profajler.stop()
+            tekst = profajler.output_text()
+    return rezultat, tekst, snimak
@@ -0,0 +1,533 @@
+'''Numeričko jezgro: čiste funkcije nad NumPy nizovima i celobrojnim kodovima grupa.
+
+Funkcije ne koriste pandas, nemaju stanje i ne zavise od klasa, pa se mogu pozivati i iz
+drugih procesa. Klase ONK, Bootstrapping, PSU i SSU pretvaraju ulaze u nizove, pozivaju
+jezgro i tek na kraju dodaju oznake (indekse i nazive kolona) rezultatima.'''
+import heapq
+import numpy as np
+from typing import NamedTuple
+from klase.momenti import grupniMomenti, sredinaVarijansa
+
+
+class OnkRezultat(NamedTuple):
+    '''Ocene ONK modela: koeficijenti, standardne greške, t statistike, ocena varijanse greške i (X'X)^-1.'''
+    b: np.ndarray
+    bstd: np.ndarray
+    tstat: np.ndarray
+    sigma2: float
+    inverzna: np.ndarray
+
+
+def onk(X, y):
+    '''Ocena linearnog modela y = Xb + e metodom običnih najmanjih kvadrata.
+
+    Parametri:
+    ----------
+    X : np.ndarray
+        Matrica m x k (sa kolonom jedinica, ako model ima slobodan član).
+    y : np.ndarray
+        Vektor dužine m.
+
+    Rezultat:
+    ----------
+    OnkRezultat'''
+    X = np.ascontiguousarray(X, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    inverzna = np.linalg.inv(X.T @ X)
+    b = inverzna @ (X.T @ y)
+    res = y - X @ b
+    sigma2 = res @ res / (X.shape[0] - X.shape[1])
+    bstd = np.sqrt(np.diag(inverzna) * sigma2)
+    return OnkRezultat(b, bstd, b / bstd, float(sigma2), inverzna)
+
+
+def onkIzSuma(XtX, Xty, yty, m):
+    '''ONK ocena iz dovoljnih statistika X'X, X'y, y'y i broja opservacija m, bez prolaza kroz podatke
+    (suma kvadrata ostataka je y'y - b'X'y).
+
+    Rezultat:
+    ----------
+    OnkRezultat'''
+    XtX = np.asarray(XtX, dtype=float)
+    Xty = np.asarray(Xty, dtype=float)
+    inverzna = np.linalg.inv(XtX)
+    b = inverzna @ Xty
+    sigma2 = (yty - b @ Xty) / (m - len(b))
+    bstd = np.sqrt(np.diag(inverzna) * sigma2)
+    return OnkRezultat(b, bstd, b / bstd, float(sigma2), inverzna)
+
+
+class RidgeRastav(NamedTuple):
+    '''SVD centrirane (i skalirane) matrice regresora, X = U diag(d) V', sa projekcijom z = U'y i delom
+    sume kvadrata y van prostora kolona; dovoljno za ridge ocene za bilo koji niz kazni.'''
+    m: int
+    sredineX: np.ndarray
+    skale: np.ndarray
+    ybar: float
+    d: np.ndarray
+    V: np.ndarray
+    z: np.ndarray
+    ostatak: float
+    centriran: bool
+
+
+def ridgeRastav(X, y, centriraj = True, standardizuj = True):
+    '''Jedan SVD za celu ridge putanju.
+
+    Parametri:
+    ----------
+    X : np.ndarray
+        Matrica regresora m x p, bez kolone jedinica.
+    y : np.ndarray
+        Vektor dužine m.
+    centriraj : bool, opciono
+        Da li model ima slobodan član (koji se ne kažnjava); tada se X i y centriraju.
+    standardizuj : bool, opciono
+        Da li se kolone X pre kažnjavanja dele standardnim devijacijama (konstantne kolone se ne skaliraju).
+
+    Rezultat:
+    ----------
+    RidgeRastav'''
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    sredineX = X.mean(axis=0) if centriraj else np.zeros(X.shape[1])
+    ybar = y.mean() if centriraj else 0.0
+    Xc = X - sredineX
+    skale = np.ones(X.shape[1])
+    if standardizuj:
+        sd = np.sqrt((Xc * Xc).mean(axis=0))
+        skale = np.where(sd > 0, sd, 1.0)
+    U, d, Vt = np.linalg.svd(Xc / skale, full_matrices=False)
+    rang = d > (d[0] if len(d) else 0) * max(X.shape) * np.finfo(float).eps
+    U, d, V = U[:, rang], d[rang], Vt[rang].T
+    yc = y - ybar
+    z = U.T @ yc
+    return RidgeRastav(len(y), sredineX, skale, float(ybar), d, V, z, float(yc @ yc - z @ z), centriraj)
+
+
+def ridgePutanja(rastav, lambde):
+    '''Ridge ocene za sve kazne odjednom, kao dijagonalna preskaliranja SVD-a:
+    b(λ) = V diag(d / (d² + λ)) z, efektivni stepeni slobode tr H(λ) = Σ d² / (d² + λ) (uz slobodan član)
+    i GCV(λ) = (RSS / m) / (1 - df / m)².
+
+    Rezultat:
+    ----------
+    tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Slobodni članovi (L), koeficijenti u originalnoj skali (L x p), stepeni slobode, RSS i GCV.'''
+    lambde = np.atleast_1d(np.asarray(lambde, dtype=float))
+    d2 = np.square(rastav.d)
+    imenilac = d2 + lambde[:, None]
+    B = ((rastav.d / imenilac) * rastav.z) @ rastav.V.T / rastav.skale
+    b0 = rastav.ybar - B @ rastav.sredineX
+    stepeni = (d2 / imenilac).sum(axis=1) + rastav.centriran
+    rss = rastav.ostatak + np.square(lambde[:, None] / imenilac * rastav.z).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gcv = (rss / rastav.m) / np.square(1 - stepeni / rastav.m)
+    return b0, B, stepeni, rss, gcv
+
+
+def sweep(A, kolone, obrnuto = False):
+    '''Operator sweep (Dempster) nad simetričnom matricom A, na mestu, redom za svaku kolonu.
+
+    Posle sweep-a Gramove matrice [X | y]'[X | y] po kolonama S, element (y, y) je suma kvadrata ostataka
+    regresije y na kolone S; obrnut sweep (obrnuto=True) uklanja kolonu iz modela.'''
+    znak = -1.0 if obrnuto else 1.0
+    for k in kolone:
+        d = A[k, k]
+        red = A[k].copy()
+        kolona = A[:, k].copy()
+        A -= np.outer(kolona, red) / d
+        A[k, :] = znak * red / d
+        A[:, k] = znak * kolona / d
+        A[k, k] = -1.0 / d
+    return A
+
+
+def najboljiPodskupovi(G, clanovi, obavezne = (), najboljih = 1, tolerancija = 1e-10):
+    '''Tačna pretraga svih podskupova članova modela (grupa kolona) metodom grananja i ograničavanja
+    (leaps and bounds) nad Gramovom matricom, sa sweep ažuriranjima umesto ponovnih ocena.
+
+    Pretraga kreće od punog modela i obrnutim sweep-om uklanja po jedan član; svaki podskup se obilazi
+    tačno jednom. Suma kvadrata ostataka ne opada uklanjanjem članova, pa se grana odbacuje kada je RSS
+    njenog najvećeg modela veći od najboljih već nađenih RSS za svaki broj parametara dostižan u grani.
+    Članovi se uklanjaju redom od najvažnijeg (najveći porast RSS), što najranije odbacuje velike grane,
+    a početne granice za sve brojeve parametara daje eliminacija unazad.
+
+    Parametri:
+    ----------
+    G : np.ndarray
+        Gramova matrica [X | y]'[X | y] (y je poslednja kolona).
+    clanovi : list[list[int]]
+        Kolone X svakog člana (npr. sve veštačke promenljive jedne kategorijske promenljive).
+    obavezne : list[int], opciono
+        Kolone koje su uvek u modelu (npr. slobodan član).
+    najboljih : int, opciono
+        Broj najboljih podskupova za svaki broj parametara.
+
+    Rezultat:
+    ----------
+    modeli : list[tuple[float, int, tuple[int]]]
+        (RSS, broj parametara, indeksi članova) najboljih podskupova za svaki broj parametara.
+    cvorova : int
+        Broj obiđenih podskupova.'''
+    G = np.asarray(G, dtype=float)
+    y = G.shape[0] - 1
+    A = G.copy()
+    for k in list(obavezne) + [k for clan in clanovi for k in clan]:
+        if A[k, k] <= tolerancija * G[k, k]:
+            raise ValueError('Matrica dizajna je singularna (kolinearni članovi modela)')
+        sweep(A, [k])
+    porast = [sweep(A.copy(), clan, obrnuto=True)[y, y] for clan in clanovi]
+    redosled = sorted(range(len(clanovi)), key=lambda c: -porast[c])
+    velicine = [len(clanovi[c]) for c in redosled]
+    dostizni = [1] * (len(redosled) + 1)    # bitovi: brojevi parametara koji se mogu ukloniti iz sufiksa
+    for i in range(len(redosled) - 1, -1, -1):
+        dostizni[i] = dostizni[i + 1] | (dostizni[i + 1] << velicine[i])
+
+    najbolji = {}
+    brojac = [0]
+
+    def granica(p):
+        lista = najbolji.get(p, [])
+        return -lista[0][0] if len(lista) >= najboljih else np.inf
+
+    def zapamti(rss, p, clanoviModela):
+        lista = najbolji.setdefault(p, [])
+        if any(z[2] == clanoviModela for z in lista):
+            return
+        zapis = (-rss, brojac[0], clanoviModela)
+        if len(lista) < najboljih:
+            heapq.heappush(lista, zapis)
+        elif rss < -lista[0][0]:
+            heapq.heapreplace(lista, zapis)
+
+    def obidji(A, ukljuceni, p, pocetak):
+        brojac[0] += 1
+        zapamti(A[y, y], p, tuple(sorted(ukljuceni)))
+        for i in range(pocetak, len(redosled)):
+            c = redosled[i]
+            B = sweep(A.copy(), clanovi[c], obrnuto=True)
+            pB = p - velicine[i]
+            maska, rss = dostizni[i + 1], B[y, y]
+            if all(rss >= granica(pB - s) for s in range(maska.bit_length()) if maska >> s & 1):
+                continue
+            obidji(B, ukljuceni - {c}, pB, i + 1)
+
+    # početne granice: unazad eliminacija (uklanja se član sa najmanjim porastom RSS)
+    B, ukljuceni, p = A.copy(), set(range(len(clanovi))), len(obavezne) + sum(velicine)
+    while ukljuceni:
+        kandidati = {c: sweep(B.copy(), clanovi[c], obrnuto=True) for c in ukljuceni}
+        c = min(kandidati, key=lambda c: kandidati[c][y, y])
+        B, p = kandidati[c], p - len(clanovi[c])
+        ukljuceni.discard(c)
+        zapamti(B[y, y], p, tuple(sorted(ukljuceni)))
+    obidji(A, frozenset(range(len(clanovi))), len(obavezne) + sum(velicine), 0)
+    modeli = [(-r, p, c) for p, lista in najbolji.items() for r, _, c in lista]
+    return sorted(modeli, key=lambda m: (m[1], m[0])), brojac[0]
+
+
+def fStatistike(Q, Q0, Y, q):
+    '''F statistike za izostavljanje q kolona iz modela, za svaki red matrice odziva Y odjednom.
+
+    Parametri:
+    ----------
+    Q, Q0 : np.ndarray
+        Ortonormirane baze (QR) kolona punog i redukovanog modela.
+    Y : np.ndarray
+        Odzivi, jedan po redu (B x m).
+    q : int
+        Broj izostavljenih kolona.'''
+    Y = np.atleast_2d(Y)
+    objasnjeno = np.square(Y @ Q).sum(axis=1)
+    objasnjeno0 = np.square(Y @ Q0).sum(axis=1)
+    rss = np.square(Y).sum(axis=1) - objasnjeno
+    return ((objasnjeno - objasnjeno0) / q) / (rss / (Y.shape[1] - Q.shape[1]))
+
+
+def permutovaniOdzivi(yhat0, e0, broj, rng):
+    '''Freedman-Lane odzivi yhat0 + P e0 za broj slučajnih permutacija ostataka redukovanog modela (broj x m).'''
+    indeksi = rng.permuted(np.tile(np.arange(len(e0)), (broj, 1)), axis=1)
+    return yhat0 + e0[indeksi]
+
+
+def zvezdice(tstat, kriticne):
+    '''Oznake značajnosti ('*', '**', '***'): broj kritičnih vrednosti (rastućim redom nivoa
+    poverenja) koje |t| dostiže, ako |t| prelazi prvu od njih.'''
+    t = np.abs(np.asarray(tstat, dtype=float))[:, None]
+    kriticne = np.asarray(kriticne, dtype=float)
+    broj = np.where(t[:, 0] > kriticne[0], (t >= kriticne).sum(axis=1), 0)
+    return np.array(['*' * k for k in broj], dtype=object)
+
+
+def bootstrapMomenti(y, k, n, seed = 42):
+    '''Sredine i standardne devijacije k uzoraka obima n (bez vraćanja unutar uzorka); uzorak i
+    koristi seed + i, isto kao pd.Series.sample(n, random_state=seed + i).
+
+    Rezultat:
+    ----------
+    tuple[np.ndarray, np.ndarray]
+        Sredine i standardne devijacije (ddof=1), po jedna za svaki uzorak.'''
+    y = np.ascontiguousarray(y, dtype=float)
+    N = len(y)
+    sredine, devijacije = np.empty(k), np.empty(k)
+    for i in range(k):
+        uzorak = y[np.random.RandomState(seed + i).choice(N, size=n, replace=False)]
+        sredine[i] = uzorak.mean()
+        devijacije[i] = uzorak.std(ddof=1)
+    return sredine, devijacije
+
+
+def kvantilniIntervali(x, alfa):
+    '''Percentilni intervali (linearna interpolacija kvantila) za sve nivoe značajnosti odjednom.'''
+    alfa = np.atleast_1d(np.asarray(alfa, dtype=float))
+    granice = np.quantile(np.asarray(x, dtype=float), np.concatenate([alfa / 2, 1 - alfa / 2]))
+    return granice[:len(alfa)], granice[len(alfa):]
+
+
+def minimalnaAlfa(x, cilj, alfe):
+    '''Prvi nivo značajnosti iz alfe (redom kojim su zadati) čiji percentilni interval za x sadrži cilj, ili None.'''
+    alfe = np.asarray(alfe, dtype=float)
+    donja, gornja = kvantilniIntervali(x, alfe)
+    sadrzi = np.flatnonzero((donja <= cilj) & (cilj <= gornja))
+    return alfe[sadrzi[0]] if len(sadrzi) else None
+
+
+def bootstrapKolicnici(y, x, k, n, seed = 42):
+    '''Količnici Σy/Σx iz k uzoraka obima n, sa istim izborom jedinica kao bootstrapMomenti (seed + i).'''
+    y = np.ascontiguousarray(y, dtype=float)
+    x = np.ascontiguousarray(x, dtype=float)
+    N = len(y)
+    kolicnici = np.empty(k)
+    for i in range(k):
+        izbor = np.random.RandomState(seed + i).choice(N, size=n, replace=False)
+        kolicnici[i] = y[izbor].sum() / x[izbor].sum()
+    return kolicnici
+
+
+def jackknifeSredina(y):
+    '''Sredine bez i-te jedinice, za sve i odjednom: (Σy - y_i) / (N - 1).'''
+    y = np.asarray(y, dtype=float)
+    return (y.sum() - y) / (len(y) - 1)
+
+
+def jackknifeVarijansa(y):
+    '''Varijanse (ddof=1) bez i-te jedinice, za sve i odjednom:
+    ((N - 1) S² - N / (N - 1) (y_i - ȳ)²) / (N - 2).'''
+    y = np.asarray(y, dtype=float)
+    N = len(y)
+    e = y - y.mean()
+    return (np.dot(e, e) - N / (N - 1) * np.square(e)) / (N - 2)
+
+
+def jackknifeKolicnik(y, x):
+    '''Količnici Σy/Σx bez i-te jedinice, za sve i odjednom: (Σy - y_i) / (Σx - x_i).'''
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    return (y.sum() - y) / (x.sum() - x)
+
+
+def ubrzanje(jackknife):
+    '''Konstanta ubrzanja BCa intervala iz jackknife vrednosti statistike:
+    a = Σd³ / (6 (Σd²)^(3/2)), d_i = θ(.) - θ(i).'''
+    d = jackknife.mean() - jackknife
+    return np.sum(d ** 3) / (6 * np.sum(d ** 2) ** 1.5)
+
+
+def studentizovaniIntervali(sredine, devijacije, theta, s, n, N, alfa):
+    '''Studentizovani bootstrap intervali za sredinu: t* = (ȳ* - θ) / se*, se* = s* sqrt((1 - n/N) / n),
+    a granice su θ - t*(1 - α/2) se i θ - t*(α/2) se, za se iz s.'''
+    alfa = np.atleast_1d(np.asarray(alfa, dtype=float))
+    korekcija = np.sqrt((1 - n / N) / n)
+    t = (np.asarray(sredine, dtype=float) - theta) / (np.asarray(devijacije, dtype=float) * korekcija)
+    se = s * korekcija
+    return theta - np.quantile(t, 1 - alfa / 2) * se, theta - np.quantile(t, alfa / 2) * se
+
+
+def binovanaKde(x, tacaka = 1024, sirina = None, odsecanje = 3):
+    '''Gausova ocena gustine na pravilnoj mreži: linearno binovanje na mrežu i konvolucija sa jezgrom
+    preko FFT-a, u vremenu O(k + M log M) umesto O(k M).
+
+    Parametri:
+    ----------
+    x : np.ndarray
+        Vrednosti (npr. bootstrap sredine).
+    tacaka : int, opciono
+        Broj tačaka mreže M.
+    sirina : float, opciono
+        Širina jezgra; podrazumevano Skotovo pravilo s k^(-1/5) (kao scipy.stats.gaussian_kde).
+    odsecanje : float, opciono
+        Mreža se proteže odsecanje širina jezgra van opsega podataka (kao u seaborn).
+
+    Rezultat:
+    ----------
+    tuple[np.ndarray, np.ndarray]
+        Tačke mreže i gustina u njima.'''
+    x = np.asarray(x, dtype=float)
+    k = len(x)
+    h = x.std(ddof=1) * k ** (-1 / 5) if sirina is None else sirina
+    a, b = x.min() - odsecanje * h, x.max() + odsecanje * h
+    mreza = np.linspace(a, b, tacaka)
+    korak = mreza[1] - mreza[0]
+    polozaj = (x - a) / korak
+    i = np.minimum(polozaj.astype(np.int64), tacaka - 2)
+    w = polozaj - i
+    tezine = np.bincount(i, weights=1 - w, minlength=tacaka) + np.bincount(i + 1, weights=w, minlength=tacaka)
+    pomaci = np.arange(-(tacaka - 1), tacaka) * korak
+    gaus = np.exp(-0.5 * np.square(pomaci / h)) / (h * np.sqrt(2 * np.pi))
+    duzina = 1 << int(np.ceil(np.log2(3 * tacaka)))
+    konvolucija = np.fft.irfft(np.fft.rfft(tezine, duzina) * np.fft.rfft(gaus, duzina), duzina)
+    return mreza, konvolucija[tacaka - 1:2 * tacaka - 1] / k
+
+
+def kolicnicka(y, x, Ytotal, Xtotal, s, N):
+    '''Količnička ocena iz prostog slučajnog uzorka.
+
+    Parametri:
+    ----------
+    y, x : np.ndarray
+        Vrednosti u uzorku.
+    Ytotal, Xtotal : float
+        Totali u populaciji.
+    s : float
+        Suma kvadrata ostataka u populaciji, sum (Y_i - R X_i)^2.
+    N : int
+        Obim populacije.
+
+    Rezultat:
+    ----------
+    tuple[float, float, float]
+        Količnik uzorka Ru, količnik populacije R i standardna greška ocene sredine.'''
+    n = len(y)
+    f = n / N
+    Ru = np.sum(y) / np.sum(x)
+    return Ru, Ytotal / Xtotal, np.sqrt(s * (1 - f) / (n * (N - 1)))
+
+
+def sumaKvadrataOstataka(Y, X, R):
+    '''sum (Y_i - R X_i)^2.'''
+    e = np.asarray(Y, dtype=float) - R * np.asarray(X, dtype=float)
+    return e @ e
+
+
+def korelacije(x, y):
+    '''Pirsonove korelacije svake kolone matrice x sa y.'''
+    xc = x - x.mean(axis=0)
+    yc = y - y.mean()
+    return (xc.T @ yc) / np.sqrt((xc * xc).sum(axis=0) * (yc @ yc))
+
+
+def regresionaOcena(y, x, Xm, b, Ym, N):
+    '''Regresiona ocena sredine iz prostog slučajnog uzorka i njena standardna greška
+    (prosek po nekonstantnim regresorima od sqrt((1 - rho²) s_y² (1 - f) / n)).
+
+    Parametri:
+    ----------
+    y : np.ndarray
+        Zavisna promenljiva u uzorku.
+    x : np.ndarray
+        Matrica regresora u uzorku (n x k).
+    Xm : np.ndarray
+        Sredine regresora u populaciji.
+    b : np.ndarray
+        Koeficijenti modela.
+    Ym : float
+        Sredina Y u populaciji (za s_y²).
+    N : int
+        Obim populacije.'''
+    y = np.asarray(y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    n = len(y)
+    ybarlr = y.mean() + (np.asarray(Xm) - x.mean(axis=0)) @ np.asarray(b)
+    rho = korelacije(x[:, x.std(axis=0, ddof=1) > 0], y)
+    sy = np.sum(np.square(y - Ym)) / (n - 1)
+    return ybarlr, np.sqrt((1 - rho**2) * sy * ((1 - n / N) / n)).mean()
+
+
+def regresionaOcenaIzSuma(G, sume, m, izbor, Xm, b, Ym, N):
+    '''Regresiona ocena sredine i njena standardna greška kao u regresionaOcena, iz Gramove matrice
+    G = Z'Z i suma kolona matrice Z = [X | y] (y je poslednja kolona).
+
+    Parametri:
+    ----------
+    izbor : np.ndarray
+        Pozicije regresora modela među kolonama X.
+    Xm : np.ndarray
+        Sredine regresora modela u populaciji.'''
+    y = G.shape[0] - 1
+    sredine = sume / m
+    kovarijanse = (G - m * np.outer(sredine, sredine)) / (m - 1)
+    ybarlr = sredine[y] + (np.asarray(Xm) - sredine[izbor]) @ np.asarray(b)
+    varijanse = np.diag(kovarijanse)[izbor]
+    promenljive = varijanse > 1e-12 * np.maximum(np.diag(G)[izbor] / m, 1)
+    rho = kovarijanse[izbor, y][promenljive] / np.sqrt(varijanse[promenljive] * kovarijanse[y, y])
+    sy = (G[y, y] - 2 * Ym * sume[y] + m * Ym**2) / (m - 1)
+    return ybarlr, np.sqrt((1 - rho**2) * sy * ((1 - m / N) / m)).mean()
+
+
+def momentiIzSuma(sume, cx, cy):
+    '''Obim, sredine, nepristrasne varijanse i kovarijansa dve promenljive po grupama iz suma pomerenih
+    vrednosti u = x - cx i v = y - cy (kolone: n, Σu, Σv, Σu², Σv², Σuv). Sume se mogu i oduzimati,
+    pa se momenti ažuriraju pri dodavanju i uklanjanju jedinica; za grupe sa manje od dve jedinice
+    varijanse i kovarijansa su NaN.'''
+    n, su, sv, suu, svv, suv = np.asarray(sume, dtype=float).T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Sx2 = np.where(n > 1, (suu - su * su / n) / (n - 1), np.nan)
+        Sy2 = np.where(n > 1, (svv - sv * sv / n) / (n - 1), np.nan)
+        Sxy = np.where(n > 1, (suv - su * sv / n) / (n - 1), np.nan)
+        return n, cx + su / n, cy + sv / n, Sx2, Sy2, Sxy
+
+
+def stratumskiMomenti(kod, y, H):
+    '''Obim, sredina i nepristrasna varijansa y u svakom od H stratuma.'''
+    nh, s1, s2 = grupniMomenti(kod, y, H)
+    sredina, varijansa = sredinaVarijansa(nh, s1, s2)
+    return nh, sredina, np.where(nh > 1, varijansa, np.nan)
+
+
+def stratumskeKorelacije(kod, x, y, H):
+    '''Pirsonova korelacija x i y, kovarijansa i varijansa x u svakom stratumu (np.bincount).'''
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nh, xm, Sx2 = stratumskiMomenti(kod, x, H)
+    _, ym, Sy2 = stratumskiMomenti(kod, y, H)
+    Sxy = (np.bincount(kod, weights=(x - xm[kod]) * (y - ym[kod]), minlength=H)) / (nh - 1)
+    return Sxy / np.sqrt(Sx2 * Sy2), Sxy, Sx2
+
+
+def stratifikovana(Nh, ybarh, S2h, N, f):
+    '''Stratifikovana ocena sredine i njena standardna greška (oblik iz SSU.stratifikovanaOcena).'''
+    return Nh @ ybarh / N, np.sqrt(((1 - f) / N) * (Nh / N) @ S2h)
+
+
+def posebnaKolicnicka(Nh, nh, f, Yh, Xh, yh, xh, S2h, Sx2h, rho):
+    '''Posebna količnička ocena totala (količnik u svakom stratumu) i njena standardna greška.'''
+    Rh = Yh / Xh
+    total = (yh / xh) @ Xh
+    V = (np.square(Nh) * (1 - f) / nh) @ (S2h + np.square(Rh) * Sx2h - 2 * Rh * rho * np.sqrt(S2h) * np.sqrt(Sx2h))
+    return total, np.sqrt(V)
+
+
+def kombinovanaKolicnicka(Nh, nh, fh, N, ybarh, xbarh, S2h, Sx2h, Sxyh, Xtotal):
+    '''Kombinovana količnička ocena totala (jedan količnik stratifikovanih sredina) i njena standardna greška.'''
+    Rc = (Nh @ ybarh / N) / (Nh @ xbarh / N)
+    V = (np.square(Nh) * (1 - fh) / nh) @ (S2h + Rc**2 * Sx2h - 2 * Rc * Sxyh)
+    return Rc * Xtotal, np.sqrt(V)
+
+
+def regresijaPoGrupama(kod, x, y, H):
+    '''Slobodan član i nagib proste regresije y na x posebno u svakoj grupi (u zatvorenom obliku).'''
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    nh, xm, _ = stratumskiMomenti(kod, x, H)
+    _, ym, _ = stratumskiMomenti(kod, y, H)
+    dx = x - xm[kod]
+    b1 = np.bincount(kod, weights=dx * (y - ym[kod]), minlength=H) / np.bincount(kod, weights=dx * dx, minlength=H)
+    return ym - b1 * xm, b1
+
+
+def regresionaPoStratumima(Nh, nh, N, ybarh, b1, Xbarh, xbarh, S2h, rho):
+    '''Posebna regresiona ocena: sredine po stratumima, ocena sredine populacije i njena standardna greška.'''
+    Wh = Nh / N
+    ybarlrh = ybarh + b1 * (Xbarh - xbarh)
+    V = (np.square(Wh) * (1 - nh / Nh) / nh) @ (S2h * (1 - np.square(rho)))
+    return ybarlrh, Wh @ ybarlrh, np.sqrt(V)
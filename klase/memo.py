@@ -0,0 +1,95 @@
+'''Zajednička memorija rezultata (LRU sa ograničenjem zauzeća) i otisci ulaznih podataka za ključeve.'''
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+
+def otisak(*objekti):
+    '''Otisak sadržaja: za pandas objekte heš vrednosti, indeksa, naziva i tipova kolona, za nizove
+    heš bajtova, a za ostale vrednosti njihov repr.'''
+    h = hashlib.sha1()
+    for obj in objekti:
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+            opis = (list(obj.columns), [str(t) for t in obj.dtypes]) if isinstance(obj, pd.DataFrame) else (obj.name, str(obj.dtype))
+            h.update(repr(opis).encode())
+        elif isinstance(obj, np.ndarray):
+            h.update(repr((obj.shape, str(obj.dtype))).encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+        else:
+            h.update(repr(obj).encode())
+    return h.hexdigest()
+
+
+def velicina(obj):
+    '''Približno zauzeće memorije objekta u bajtovima (pandas objekti i nizovi bez dubokog prebrojavanja).'''
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(index=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sum(velicina(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sum(velicina(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class Memo:
+    '''Memorija rezultata sa izbacivanjem najdavnije korišćenih (LRU) kada zauzeće pređe kapacitet.
+
+    Vrednosti se ne kopiraju, pa ih korisnici treba da tretiraju kao nepromenljive.
+
+    Parametri
+    ----------
+    kapacitet : int, opciono
+        Najveće ukupno zauzeće u bajtovima; 0 isključuje pamćenje.'''
+    def __init__(self, kapacitet = 256 * 2**20):
+        self.kapacitet = kapacitet
+        self._zapisi = OrderedDict()
+        self._brava = threading.Lock()
+        self.zauzeto = 0
+        self.pogoci = 0
+        self.promasaji = 0
+
+    def uzmi(self, kljuc):
+        '''Zapamćena vrednost (i označava je kao poslednju korišćenu) ili None.'''
+        with self._brava:
+            zapis = self._zapisi.get(kljuc)
+            if zapis is None:
+                self.promasaji += 1
+                return None
+            self._zapisi.move_to_end(kljuc)
+            self.pogoci += 1
+            return zapis[0]
+
+    def zapamti(self, kljuc, vrednost):
+        '''Pamti vrednost; vrednosti veće od celog kapaciteta se ne pamte.'''
+        bajtova = velicina(vrednost)
+        if bajtova > self.kapacitet:
+            return vrednost
+        with self._brava:
+            if kljuc in self._zapisi:
+                self.zauzeto -= self._zapisi.pop(kljuc)[1]
+            self._zapisi[kljuc] = (vrednost, bajtova)
+            self.zauzeto += bajtova
+            while self.zauzeto > self.kapacitet:
+                self.zauzeto -= self._zapisi.popitem(last=False)[1][1]
+        return vrednost
+
+    def isprazni(self):
+        '''Briše sve zapamćene vrednosti i brojače.'''
+        with self._brava:
+            self._zapisi.clear()
+            self.zauzeto = self.pogoci = self.promasaji = 0
+
+    def __len__(self):
+        return len(self._zapisi)
+
+    def __repr__(self):
+        return (f"Memo | zapisa={len(self)} | zauzeto={self.zauzeto / 2**20:.1f}/{self.kapacitet / 2**20:.0f} MB"
+                f" | pogoci={self.pogoci} | promasaji={self.promasaji}")
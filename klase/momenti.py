@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from typing import NamedTuple
+
+
+def kodiraj(df, kolone):
+    '''Kodira svaku kombinaciju vrednosti zadatih kolona jednim celim brojem (mešovita osnova).
+
+    Parametri:
+    ----------
+    df : pd.DataFrame
+    kolone : list[str]
+        Kategorijske kolone čije se kombinacije kodiraju.
+
+    Rezultat:
+    ----------
+    kodovi : np.ndarray
+        Celobrojni kod ćelije za svaki red, od 0 do prod(velicine) - 1.
+    velicine : tuple[int]
+        Broj kategorija svake kolone.
+    kategorije : list[pd.Index]
+        Kategorije svake kolone, redosledom kojim su kodirane.'''
+    kodovi = np.zeros(len(df), dtype=np.int64)
+    velicine, kategorije = [], []
+    for kol in kolone:
+        if isinstance(df[kol].dtype, pd.CategoricalDtype):
+            k = df[kol].cat.codes.to_numpy()
+            kat = df[kol].cat.categories
+        else:
+            k, kat = pd.factorize(df[kol], sort=True)
+        if (k < 0).any():
+            raise ValueError(f'Kolona {kol} sadrži nedostajuće vrednosti')
+        kodovi = kodovi * len(kat) + k
+        velicine.append(len(kat))
+        kategorije.append(pd.Index(kat))
+    return kodovi, tuple(velicine), kategorije
+
+
+def grupniMomenti(kodovi, y, G):
+    '''Broj jedinica, suma i suma kvadrata y po grupama, u jednom prolazu (np.bincount).
+
+    Parametri:
+    ----------
+    kodovi : np.ndarray
+        Celobrojni kod grupe za svaki red.
+    y : np.ndarray
+        Vrednosti promenljive.
+    G : int
+        Ukupan broj grupa.
+
+    Rezultat:
+    ----------
+    tuple[np.ndarray, np.ndarray, np.ndarray]
+        n, suma y i suma y² za svaku grupu.'''
+    y = np.asarray(y, dtype=float)
+    n = np.bincount(kodovi, minlength=G).astype(float)
+    s1 = np.bincount(kodovi, weights=y, minlength=G)
+    s2 = np.bincount(kodovi, weights=y * y, minlength=G)
+    return n, s1, s2
+
+
+def sredinaVarijansa(n, s1, s2):
+    '''Sredine i nepristrasne varijanse po grupama iz suma; za grupe sa manje od dve jedinice varijansa je 0.'''
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sredina = np.where(n > 0, s1 / n, np.nan)
+        varijansa = np.where(n > 1, (s2 - s1 * s1 / n) / (n - 1), 0.0)
+    return sredina, np.maximum(varijansa, 0.0)
+
+
+class Momenti(NamedTuple):
+    '''Centralni momenti do četvrtog reda: broj jedinica, sredina i sume M_k = sum (x - sredina)^k, k = 2, 3, 4.
+
+    Sva polja su nizovi istog oblika (jedan element po grupi, replici ili stratumu), pa se momenti
+    delova podataka računaju nezavisno i spajaju metodom spoji (formule Pébay-a), bez ponovnog
+    prolaza kroz podatke.'''
+    n: np.ndarray
+    sredina: np.ndarray
+    M2: np.ndarray
+    M3: np.ndarray
+    M4: np.ndarray
+
+    @classmethod
+    def izNiza(cls, x, axis = -1):
+        '''Momenti duž zadate ose: odstupanja od sredine računaju se jednom i koriste za sve tri sume.'''
+        x = np.asarray(x, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sredina = x.mean(axis=axis, keepdims=True)
+        d = x - sredina
+        d2 = d * d
+        sredina = sredina.squeeze(axis)
+        n = np.full(sredina.shape, x.shape[axis], dtype=float)
+        return cls(n, sredina, d2.sum(axis=axis), (d2 * d).sum(axis=axis), (d2 * d2).sum(axis=axis))
+
+    @classmethod
+    def poBlokovima(cls, x, blok = 1_000_000):
+        '''Momenti 1-D niza (ili memorijski mapiranog niza) koji se obrađuje u blokovima od po blok elemenata.'''
+        rezultat = None
+        for pocetak in range(0, len(x), blok):
+            deo = cls.izNiza(x[pocetak:pocetak + blok])
+            rezultat = deo if rezultat is None else rezultat.spoji(deo)
+        return rezultat
+
+    def spoji(self, drugi):
+        '''Momenti unije dva disjunktna skupa podataka.'''
+        na, nb = self.n, drugi.n
+        n = na + nb
+        m = np.maximum(n, 1)
+        delta = drugi.sredina - self.sredina
+        sredina = np.where(na > 0, self.sredina + delta * nb / m, drugi.sredina)
+        delta = np.where((na > 0) & (nb > 0), delta, 0.0)
+        M2 = self.M2 + drugi.M2 + delta**2 * na * nb / m
+        M3 = (self.M3 + drugi.M3 + delta**3 * na * nb * (na - nb) / m**2
+              + 3 * delta * (na * drugi.M2 - nb * self.M2) / m)
+        M4 = (self.M4 + drugi.M4 + delta**4 * na * nb * (na * na - na * nb + nb * nb) / m**3
+              + 6 * delta**2 * (na * na * drugi.M2 + nb * nb * self.M2) / m**2
+              + 4 * delta * (na * drugi.M3 - nb * self.M3) / m)
+        return Momenti(n, sredina, M2, M3, M4)
+
+    @property
+    def varijansa(self):
+        '''Nepristrasna varijansa, M2 / (n - 1).'''
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.M2 / (self.n - 1)
+
+    @property
+    def asimetrija(self):
+        '''Koeficijent asimetrije (M3 / n) / s³, sa s iz nepristrasne varijanse (kao u funkcije.jb).'''
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.M3 / self.n / self.varijansa**1.5
+
+    @property
+    def spljostenost(self):
+        '''Koeficijent spljoštenosti (M4 / n) / s⁴.'''
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.M4 / self.n / self.varijansa**2
+
+    @property
+    def jb(self):
+        '''Jarque-Bera statistika n (S² + (K - 3)² / 4) / 6.'''
+        return self.n * (np.square(self.asimetrija) + np.square(self.spljostenost - 3) / 4) / 6
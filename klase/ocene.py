@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+from klase.funkcije import stats
+from typing import NamedTuple
+
+
+def intervali(ocena, stdev, alfa, df):
+    '''Granice intervala poverenja zasnovanih na Studentovoj raspodeli, za sve nivoe značajnosti odjednom.
+
+    Parametri:
+    ----------
+    ocena : float
+        Procena sredine ili totala.
+    stdev : float
+        Standardna greška procene.
+    alfa : float ili list
+        Nivoi značajnosti.
+    df : int
+        Broj stepeni slobode.
+
+    Rezultat:
+    ----------
+    tuple[np.ndarray, np.ndarray]
+        Donje i gornje granice, po jedna za svaki nivo značajnosti.'''
+    alfa = np.atleast_1d(np.asarray(alfa, dtype=float))
+    t = stats.t.ppf(1 - alfa / 2, df)
+    return ocena - t * stdev, ocena + t * stdev
+
+
+class Ocena(NamedTuple):
+    '''Numerički rezultat jednog ocenjivanja, bez ikakvog formatiranja.
+
+    Atributi
+    ----------
+    naziv : str
+        Oznaka ocene (npr. 'sredina', 'total').
+    ocena : float
+        Vrednost ocene.
+    std : float
+        Standardna greška ocene.
+    alfa : tuple[float]
+        Nivoi značajnosti za koje su računati intervali.
+    donja, gornja : np.ndarray
+        Granice intervala poverenja, po jedna za svaki nivo značajnosti (samo za čitanje).
+    parametar : float
+        Prava vrednost parametra (NaN ako nije poznata).'''
+    naziv: str
+    ocena: float
+    std: float
+    alfa: tuple
+    donja: np.ndarray
+    gornja: np.ndarray
+    parametar: float = np.nan
+
+    @classmethod
+    def izracunaj(cls, naziv, ocena, std, alfa, df, parametar=np.nan):
+        '''Formira ocenu i računa intervale poverenja za sve nivoe značajnosti.'''
+        donja, gornja = intervali(ocena, std, alfa, df)
+        donja.setflags(write=False)
+        gornja.setflags(write=False)
+        return cls(naziv, float(ocena), float(std), tuple(np.atleast_1d(alfa).tolist()), donja, gornja, float(parametar))
+
+    @property
+    def pristrasnost(self):
+        '''Razlika ocene i prave vrednosti parametra.'''
+        return self.ocena - self.parametar
+
+    @property
+    def skg(self):
+        '''Srednja kvadratna greška: kvadrat pristrasnosti uvećan za varijansu ocene.'''
+        return self.pristrasnost**2 + self.std**2
+
+    @property
+    def raspon(self):
+        '''Širine intervala poverenja.'''
+        return self.gornja - self.donja
+
+    @property
+    def sadrzi(self):
+        '''Da li interval za svaki nivo značajnosti sadrži pravu vrednost parametra.'''
+        return (self.donja <= self.parametar) & (self.parametar <= self.gornja)
+
+
+def tabela(ocene):
+    '''Spaja ocene u "tidy" DataFrame sa po jednim redom za svaku kombinaciju ocene i nivoa značajnosti.
+
+    Parametri:
+    ----------
+    ocene : Ocena, list[Ocena] ili dict[str, Ocena]
+
+    Rezultat:
+    ----------
+    pd.DataFrame
+        Kolone: naziv, alfa, ocena, std, donja, gornja, raspon, parametar, sadrzi, pristrasnost, skg.'''
+    if isinstance(ocene, Ocena):
+        ocene = [ocene]
+    elif isinstance(ocene, dict):
+        ocene = list(ocene.values())
+    redovi = []
+    for o in ocene:
+        k = len(o.alfa)
+        redovi.append(pd.DataFrame({
+            'naziv': [o.naziv] * k,
+            'alfa': o.alfa,
+            'ocena': o.ocena,
+            'std': o.std,
+            'donja': o.donja,
+            'gornja': o.gornja,
+            'raspon': o.raspon,
+            'parametar': o.parametar,
+            'sadrzi': o.sadrzi,
+            'pristrasnost': o.pristrasnost,
+            'skg': o.skg}))
+    return pd.concat(redovi, ignore_index=True)
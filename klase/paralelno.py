@@ -0,0 +1,79 @@
+'''Izvršavanje mnogo ocenjivanja nad jednom zajedničkom populacijom, redom ili u bazenu niti.
+
+Ocene (Ocena, ONK Model) su nepromenljive, a ONK.oceni, ONK.oceniSig i PSU/SSU metode *Ocena ne
+menjaju objekte nad kojima se pozivaju. Populacija (DataFrame ili Populacija) se zato deli između
+niti bez kopiranja, a zajednička memorija ONK.MODELI i statistike Populacije zaštićene su bravama.
+
+Podrazumevano se ocenjuje redom (radnika=1). Niti ne ubrzavaju tipična ocenjivanja: za uzorke od
+nekoliko stotina jedinica vreme odlazi na pandas i Python kod koji drži GIL (40 regresionih ocena
+PSU nad TU podacima sporije je u 8 niti nego redom). Više niti ima smisla samo na višejezgarnim mašinama
+kada preovlađuju velike NumPy/BLAS operacije (npr. ONK nad uzorcima od 10^5 jedinica), i to treba
+proveriti merenjem.
+
+Primer:
+    ocene = oceneUzoraka(df, df['obrazovanje'], df['plata'], 400, range(100), metod='regresionaOcena')
+    ocene.groupby(['naziv', 'alfa'])['sadrzi'].mean()    # pokrivenost intervala poverenja'''
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from klase.Sampling import PSU
+from klase.ocene import tabela
+
+
+def paralelno(funkcija, argumenti, radnika = 1):
+    '''Poziva funkcija(*a) za svaki element a iz argumenti, redom ili u bazenu niti.
+
+    Parametri:
+    ----------
+    funkcija : callable
+        Funkcija koja ne menja zajedničke objekte.
+    argumenti : iterable
+        Argumenti poziva; element koji nije tuple prosleđuje se kao jedini argument.
+    radnika : int ili None, opciono
+        Broj niti; 1 (podrazumevano) izvršava pozive redom, bez niti, a None bira broj niti kao
+        ThreadPoolExecutor.
+
+    Rezultat:
+    ----------
+    list
+        Rezultati redom argumenata; prvi izuzetak (i iz niti) se ponovo podiže.'''
+    argumenti = [a if isinstance(a, tuple) else (a,) for a in argumenti]
+    if radnika == 1:
+        return [funkcija(*a) for a in argumenti]
+    with ThreadPoolExecutor(max_workers=radnika) as bazen:
+        return list(bazen.map(lambda a: funkcija(*a), argumenti))
+
+
+def oceneUzoraka(df, X, Y, n, seeds, metod = 'kolicnickaOcena', klasa = PSU, parametri = None, radnika = 1, **argumenti):
+    '''Ocene iz po jednog uzorka za svaki seed nad istom populacijom (redom ili u nitima, kao paralelno).
+
+    Parametri:
+    ----------
+    df : pd.DataFrame ili Populacija
+        Zajednička populacija (ne menja se i ne kopira između niti).
+    X, Y, n :
+        Kao za PSU/SSU.
+    seeds : iterable[int]
+        Seed svakog uzorka.
+    metod : str, opciono
+        Metoda ocenjivanja koja vraća dict[str, Ocena] (npr. 'kolicnickaOcena', 'regresionaOcena',
+        'stratifikovanaOcena').
+    klasa : type, opciono
+        PSU ili SSU.
+    parametri : dict, opciono
+        Parametri metode ocenjivanja.
+    radnika : int ili None, opciono
+        Broj niti (kao u paralelno; podrazumevano redom).
+    **argumenti :
+        Ostali parametri konstruktora (npr. kategorije, stratumi, alfa).
+
+    Rezultat:
+    ----------
+    pd.DataFrame
+        Tabela ocena (klase.ocene.tabela) sa kolonom seed.'''
+    parametri = {} if parametri is None else parametri
+
+    def oceni(seed):
+        uzorak = klasa(df, X, Y, n, seed=seed, **argumenti)
+        return tabela(getattr(uzorak, metod)(**parametri)).assign(seed=seed)
+
+    return pd.concat(paralelno(oceni, list(seeds), radnika), ignore_index=True)
@@ -0,0 +1,58 @@
+from klase.funkcije import *
+from klase.instrumentacija import meri
+
+
+def podesiPrikaz():
+    '''Postavlja srpski zapis brojeva (funkcija form) kao podrazumevani prikaz pandas i numpy vrednosti.
+
+    Uvoz paketa ne menja globalna podešavanja; notebook ovu funkciju poziva jednom, na početku.'''
+    pd.options.display.float_format = form
+    np.set_printoptions(formatter={'float_kind': form})
+
+
+@meri
+def formatirajTabelu(tabela, decimale = 2):
+    '''Kopija tabele (DataFrame ili Series) u kojoj su sve realne kolone zamenjene stringovima u srpskom zapisu.
+
+    Svaka kolona se formatira odjednom (funkcija formatiraj), pa je cena prikaza velike tabele
+    nekoliko operacija nad nizovima, a ne poziv formatera za svaku ćeliju.'''
+    if isinstance(tabela, pd.Series):
+        if not pd.api.types.is_float_dtype(tabela.dtype):
+            return tabela
+        return pd.Series(formatiraj(tabela.to_numpy(), decimale), index=tabela.index, name=tabela.name)
+    tabela = tabela.copy()
+    for i, tip in enumerate(tabela.dtypes):
+        if pd.api.types.is_float_dtype(tip):
+            tabela.isetitem(i, formatiraj(tabela.iloc[:, i].to_numpy(), decimale))
+    return tabela
+
+
+def prikazi(naslov, tabela):
+    '''Ispisuje naslov (ako je zadat) i prikazuje tabelu u srpskom zapisu brojeva; van IPython okruženja tabela se ispisuje kao tekst.'''
+    if naslov is not None:
+        print(naslov)
+    try:
+        from IPython.display import display
+    except ImportError:
+        display = print
+    display(formatirajTabelu(tabela) if isinstance(tabela, (pd.DataFrame, pd.Series)) else tabela)
+
+
+def tabelaIntervala(ocena):
+    '''Tabela intervala poverenja za jednu ocenu (klasa Ocena), u obliku koji koriste PSU i SSU; brojevi se formatiraju tek pri prikazu.'''
+    intervali = []
+    for a, donja, gornja, raspon in zip(ocena.alfa, ocena.donja, ocena.gornja, ocena.raspon):
+        red = [ocena.ocena, ocena.std, f'{(1 - a)*100:.1f}%', donja, gornja, raspon]
+        if not np.isnan(ocena.parametar):
+            red.append('DA' if donja <= ocena.parametar <= gornja else 'NE')
+        intervali.append(red)
+
+    kolone = ['Ocena', 'Standardna devijacija', 'Interval', 'Donja granica', 'Gornja granica', 'Raspon']
+    if not np.isnan(ocena.parametar):
+        kolone.append('Sadrži pravu vrednost')
+    return pd.DataFrame(intervali, columns=kolone).set_index('Interval')
+
+
+def tabelaVrednosti(vrednosti):
+    '''Tabela sa jednom kolonom 'Vrednost' od rečnika {naziv: broj}.'''
+    return pd.DataFrame({'Vrednost': [float(v) for v in vrednosti.values()]}, index=list(vrednosti.keys()))
@@ -0,0 +1,149 @@
+import hashlib
+from collections import OrderedDict
+from typing import NamedTuple, Callable
+import numpy as np
+import pandas as pd
+
+IZVEDENE = {'satnica': lambda df: df['plata'].to_numpy(dtype=float) / (df['satiRada'].to_numpy(dtype=float) * (52 / 12))}
+
+_MEMO = OrderedDict()
+MEMO_KAPACITET = 64
+
+
+def kolona(df, ime):
+    '''Vrednosti kolone kao realan niz; izvedene kolone (IZVEDENE, npr. satnica) računaju se iz ostalih.'''
+    if ime in df.columns:
+        return df[ime].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return IZVEDENE[ime](df)
+
+
+def otisak(df):
+    '''Otisak sadržaja DataFrame-a (heš svih vrednosti i indeksa), za ključ memoizacije.'''
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes()).hexdigest()
+
+
+def satiRada(df, maska):
+    '''Izbacuje ispitanike bez podatka o satima rada i one koji prethodne nedelje nisu radili.'''
+    sati = kolona(df, 'satiRada')
+    with np.errstate(invalid='ignore'):
+        return maska & ~np.isnan(sati) & (sati > 0)
+
+
+def radnoDoba(df, maska, granice = (('Muskarac', 65), ('Zena', 60))):
+    '''Zadržava ispitanike mlađe od starosne granice za penzionisanje svog pola
+    (granice su parovi (pol, granica) ili rečnik).'''
+    granice = dict(granice)
+    kodovi, pol = pd.factorize(df['zene'])
+    granica = np.array([granice.get(p, -np.inf) for p in pol] + [-np.inf])[kodovi]
+    return maska & (df['starost'].to_numpy(dtype=float) < granica)
+
+
+def satnica(df, maska, minimum = 55):
+    '''Zadržava ispitanike čija je zarada po satu veća od minimuma.'''
+    with np.errstate(invalid='ignore'):
+        return maska & (kolona(df, 'satnica') > minimum)
+
+
+def iqr(df, maska, promenljive = ('satiRada', 'satnica'), koeficijent = 1.5):
+    '''Redom za svaku promenljivu izbacuje autlajere van [Q1 - k IQR, Q3 + k IQR];
+    kvartili se računaju na jedinicama koje su preostale posle prethodnih promenljivih.'''
+    for var in promenljive:
+        x = kolona(df, var)
+        Q1, Q3 = np.quantile(x[maska], [0.25, 0.75])
+        with np.errstate(invalid='ignore'):
+            maska = maska & (x >= Q1 - koeficijent * (Q3 - Q1)) & (x <= Q3 + koeficijent * (Q3 - Q1))
+    return maska
+
+
+class Faza(NamedTuple):
+    '''Imenovani korak pripreme: funkcija (df, maska, **parametri) -> nova maska; parametri su opcioni.'''
+    naziv: str
+    funkcija: Callable
+    parametri: dict = None
+
+
+FAZE = [Faza('satiRada', satiRada),
+        Faza('radnoDoba', radnoDoba, {'granice': (('Muskarac', 65), ('Zena', 60))}),
+        Faza('satnica', satnica, {'minimum': 55}),
+        Faza('iqr', iqr, {'promenljive': ('satiRada', 'satnica'), 'koeficijent': 1.5})]
+
+
+def _kljuc(*delovi):
+    return hashlib.sha1(repr(delovi).encode()).hexdigest()
+
+
+def _zapamti(kljuc, vrednost):
+    _MEMO[kljuc] = vrednost
+    _MEMO.move_to_end(kljuc)
+    while len(_MEMO) > MEMO_KAPACITET:
+        _MEMO.popitem(last=False)
+
+
+class Priprema:
+    '''Priprema LSMS podataka kao niz imenovanih faza čiji je rezultat jedna logička maska redova.
+
+    Faze se ne primenjuju na kopije tabele: svaka dobija masku preostalih redova i vraća novu,
+    pa se redovi izbacuju samo jednom, na kraju. Maska svake faze pamti se (zajednički za sve
+    objekte) pod ključem koji čine otisak ulaznih podataka, ključ prethodne faze, naziv, funkcija
+    (modul i kvalifikovano ime) i parametri, pa se pri promeni parametra ili funkcije jedne faze
+    ponovo računaju samo ta faza i faze posle nje.
+
+    Parametri
+    ----------
+    faze : list[Faza], opciono
+        Koraci pripreme; podrazumevano koraci iz notebook-a (FAZE).
+
+    Atributi
+    ----------
+    izvestaj : pd.DataFrame
+        Broj preostalih redova posle svake faze i da li je faza uzeta iz memorije (posle poziva primeni).'''
+    def __init__(self, faze = None):
+        self.faze = list(FAZE if faze is None else faze)
+        self.izvestaj = None
+
+    def primeni(self, df, zadrziSatnicu = False, **parametri):
+        '''Primenjuje sve faze na df i vraća očišćene podatke, u obliku koji koriste Bootstrapping, ONK, PSU i SSU.
+
+        Parametri:
+        ----------
+        df : pd.DataFrame
+            Sirovi podaci (npr. ucitavanje.ucitaj()).
+        zadrziSatnicu : bool, opciono
+            Da li rezultat sadrži izvedenu kolonu satnica.
+        parametri : dict
+            Izmene parametara po fazama, npr. iqr={'koeficijent': 2}.
+
+        Rezultat:
+        ----------
+        pd.DataFrame
+            Izabrani redovi sa celobrojnim obrazovanjem i satima rada i novim indeksom 0..n-1.'''
+        nepoznate = set(parametri) - {faza.naziv for faza in self.faze}
+        if nepoznate:
+            raise ValueError(f'Nepoznate faze: {sorted(nepoznate)}')
+        kljuc = otisak(df)
+        maska = np.ones(len(df), dtype=bool)
+        redovi = []
+        for faza in self.faze:
+            p = {**(faza.parametri or {}), **parametri.get(faza.naziv, {})}
+            kljuc = _kljuc(kljuc, faza.naziv, faza.funkcija.__module__, faza.funkcija.__qualname__, sorted(p.items()))
+            iz_memorije = kljuc in _MEMO
+            if iz_memorije:
+                _MEMO.move_to_end(kljuc)
+                maska = _MEMO[kljuc]
+            else:
+                maska = faza.funkcija(df, maska, **p)
+                maska.flags.writeable = False
+                _zapamti(kljuc, maska)
+            redovi.append((faza.naziv, int(maska.sum()), iz_memorije))
+        self.izvestaj = pd.DataFrame(redovi, columns=['faza', 'preostalo', 'iz memorije']).set_index('faza')
+
+        rezultat = df[maska].reset_index(drop=True)
+        if zadrziSatnicu:
+            rezultat['satnica'] = kolona(rezultat, 'satnica')
+        rezultat['obrazovanje'] = rezultat['obrazovanje'].astype(int)
+        rezultat['satiRada'] = rezultat['satiRada'].astype(int)
+        return rezultat
+
+    def __repr__(self):
+        return f"Priprema | faze={[faza.naziv for faza in self.faze]}"
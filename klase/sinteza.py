@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from klase.ONK import ONK
+from klase.Kalibracija import STAROSNE_GRUPE, ucitajRegionPol
+from klase.Populacija import Populacija
+from klase.ucitavanje import ucitaj
+from klase.priprema import Priprema
+
+KATEGORIJE = ['region', 'urban', 'zene']
+NUMERICKE = ['starost', 'satiRada', 'obrazovanje']
+
+
+def ciljneFrekvencije(N, margine = None):
+    '''Broj jedinica po ćelijama region x pol x starosna grupa, srazmerno marginama i sa zbirom tačno N
+    (zaokruživanje metodom najvećih ostataka).'''
+    margine = ucitajRegionPol() if margine is None else margine
+    udeo = margine.to_numpy() / margine.sum() * N
+    broj = np.floor(udeo).astype(np.int64)
+    broj[np.argsort(broj - udeo)[:N - broj.sum()]] += 1
+    return pd.Series(broj, index=margine.index)
+
+
+def _koeficijenti(model, kolona, kategorije):
+    '''Koeficijent veštačke promenljive za svaku kategoriju kolone (0 za baznu kategoriju).'''
+    return np.array([model.b.get(f'{kolona}_{k}', 0.0) for k in kategorije])
+
+
+def sintetickaPopulacija(N, folder, df = None, margine = None, blok = 1 << 18, seed = 42):
+    '''Sintetička populacija proizvoljne veličine, napravljena od TU.dta i margina iz foldera podaci.
+
+    Postupak:
+    - ukupno N jedinica raspoređuje se po ćelijama region x pol x starosna grupa tačno srazmerno
+      marginama (regionPol2007.csv); svaki blok dobija slučajan deo preostalih jedinica svake ćelije
+      (multivarijatna hipergeometrijska raspodela), pa su margine tačne, a redosled jedinica slučajan;
+    - kovarijate se uzimaju od slučajnog donora iz iste ćelije (ako ćelija nema donora, iz istog
+      regiona i pola, sa godinama izvučenim uniformno iz starosne grupe);
+    - plata je predikcija ONK modela ocenjenog na donorima plus rezidual drugog slučajnog donora iz
+      istog bazena kao za kovarijate (iste ćelije, odnosno istog regiona i pola za ćelije bez donora),
+      pa se čuva i zajednička raspodela zarade i kovarijata i heteroskedastičnost po grupama.
+
+    Kolone se upisuju blok po blok direktno u .npy fajlove (np.lib.format.open_memmap), u formatu
+    kolonskog keša, pa generisanje nikada ne drži celu populaciju u memoriji.
+
+    Parametri:
+    ----------
+    N : int
+        Broj jedinica populacije.
+    folder : str
+        Folder u koji se upisuje populacija (postojeći se zamenjuje).
+    df : pd.DataFrame, opciono
+        Donori; podrazumevano očišćeni podaci iz TU.dta (Priprema).
+    margine : pd.Series, opciono
+        Totali po (region, zene, starosnaGrupa); podrazumevano ucitajRegionPol().
+    blok : int, opciono
+        Broj jedinica koje se generišu odjednom.
+    seed : int, opciono
+        Seed za reprodukciju.
+
+    Rezultat:
+    ----------
+    Populacija'''
+    rng = np.random.default_rng(seed)
+    df = Priprema().primeni(ucitaj()) if df is None else df
+    ciljevi = ciljneFrekvencije(N, margine)
+
+    model = ONK()
+    model.fit(df[NUMERICKE + KATEGORIJE], df['plata'], kategorije=KATEGORIJE)
+    reziduali = (model.y - model.x @ model.b).to_numpy()
+
+    kategorije = {kol: df[kol].cat.categories for kol in ['zene', 'region', 'urban', 'obr3']}
+    kodovi = {kol: df[kol].cat.codes.to_numpy() for kol in kategorije}
+    granice = np.array([int(g[:2]) for g in STAROSNE_GRUPE])
+
+    region = kategorije['region'].get_indexer(ciljevi.index.get_level_values('region'))
+    pol = kategorije['zene'].get_indexer(ciljevi.index.get_level_values('zene'))
+    grupa = pd.Index(STAROSNE_GRUPE).get_indexer(ciljevi.index.get_level_values('starosnaGrupa'))
+    if (region < 0).any() or (pol < 0).any():
+        raise ValueError('Margine sadrže region ili pol kojih nema u podacima')
+
+    Z, G = len(kategorije['zene']), len(granice)
+    donorPol = kodovi['region'] * Z + kodovi['zene']
+    donorCelija = donorPol * G + np.searchsorted(granice, df['starost'].to_numpy(), side='right') - 1
+    bazeni, tacni = [], []
+    for r, p, g in zip(region, pol, grupa):
+        bazen = np.flatnonzero(donorCelija == (r * Z + p) * G + g)
+        tacni.append(len(bazen) > 0)
+        bazeni.append(bazen if len(bazen) else np.flatnonzero(donorPol == r * Z + p))
+    if any(len(bazen) == 0 for bazen in bazeni):
+        raise ValueError('Neki region i pol iz margina nemaju nijednog donora')
+    velicine = np.array([len(b) for b in bazeni])
+    pocetak = np.concatenate([[0], np.cumsum(velicine)[:-1]])
+    bazeni = np.concatenate(bazeni)
+    tacni = np.array(tacni)
+
+    b = model.b
+    doprinos = {kol: _koeficijenti(model, kol, kategorije[kol]) for kol in KATEGORIJE}
+    minimum = df['plata'].min()
+
+    if os.path.isdir(folder):
+        shutil.rmtree(folder)
+    roditelj = os.path.dirname(os.path.abspath(folder))
+    os.makedirs(roditelj, exist_ok=True)
+    privremeni = tempfile.mkdtemp(dir=roditelj)
+    tipovi = {'zene': np.int8, 'starost': df['starost'].dtype, 'satiRada': df['satiRada'].dtype, 'plata': np.int32,
+              'region': np.int8, 'urban': np.int8, 'obr3': np.int8, 'obrazovanje': df['obrazovanje'].dtype}
+    nizovi = {kol: np.lib.format.open_memmap(os.path.join(privremeni, f'{kol}.npy'), mode='w+', dtype=tip, shape=(N,))
+              for kol, tip in tipovi.items()}
+
+    preostalo = ciljevi.to_numpy().copy()
+    for od in range(0, N, blok):
+        m = min(blok, N - od)
+        broj = rng.multivariate_hypergeometric(preostalo, m)
+        preostalo -= broj
+        celija = rng.permutation(np.repeat(np.arange(len(broj)), broj))
+
+        donor = bazeni[pocetak[celija] + rng.integers(0, velicine[celija])]
+        drugi = bazeni[pocetak[celija] + rng.integers(0, velicine[celija])]
+        starost = df['starost'].to_numpy()[donor].copy()
+        van = ~tacni[celija]
+        starost[van] = granice[grupa[celija[van]]] + rng.integers(0, 5, van.sum())
+
+        deo = {'zene': pol[celija], 'region': region[celija], 'urban': kodovi['urban'][donor],
+               'obr3': kodovi['obr3'][donor], 'starost': starost,
+               'satiRada': df['satiRada'].to_numpy()[donor], 'obrazovanje': df['obrazovanje'].to_numpy()[donor]}
+        plata = b['const'] + sum(b[kol] * deo[kol].astype(float) for kol in NUMERICKE)
+        plata += sum(doprinos[kol][deo[kol]] for kol in KATEGORIJE)
+        deo['plata'] = np.maximum(np.rint(plata + reziduali[drugi]), minimum)
+
+        for kol, niz in nizovi.items():
+            niz[od:od + m] = deo[kol]
+        for niz in nizovi.values():
+            niz.flush()
+    del nizovi
+
+    meta = {'kolone': ['zene', 'starost', 'satiRada', 'plata', 'region', 'urban', 'obr3', 'obrazovanje'], 'redova': N,
+            'kategorije': {kol: {'vrednosti': kat.tolist(), 'uredjene': bool(df[kol].cat.ordered)} for kol, kat in kategorije.items()}}
+    with open(os.path.join(privremeni, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    os.replace(privremeni, folder)
+    return Populacija(folder, blok)
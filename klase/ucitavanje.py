@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+KOREN = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+TU = os.path.join(KOREN, 'TU.dta')
+KES = os.path.join(KOREN, '.kes')
+
+
+def hesFajla(putanja, blok = 1 << 20):
+    '''SHA-256 sadržaja fajla, čitanog u blokovima.'''
+    h = hashlib.sha256()
+    with open(putanja, 'rb') as f:
+        for deo in iter(lambda: f.read(blok), b''):
+            h.update(deo)
+    return h.hexdigest()
+
+
+def _hesIzvora(putanja, kes):
+    '''Heš izvornog fajla; pamti se uz veličinu i vreme izmene, pa se fajl ponovo čita samo kada se promeni.'''
+    indeks = os.path.join(kes, 'indeks.json')
+    try:
+        with open(indeks, encoding='utf-8') as f:
+            zapisi = json.load(f)
+    except (OSError, ValueError):
+        zapisi = {}
+    stanje = os.stat(putanja)
+    kljuc = os.path.abspath(putanja)
+    zapis = zapisi.get(kljuc)
+    if zapis is not None and zapis['velicina'] == stanje.st_size and zapis['izmenjen'] == stanje.st_mtime_ns:
+        return zapis['hes']
+    hes = hesFajla(putanja)
+    zapisi[kljuc] = {'velicina': stanje.st_size, 'izmenjen': stanje.st_mtime_ns, 'hes': hes}
+    os.makedirs(kes, exist_ok=True)
+    with open(indeks, 'w', encoding='utf-8') as f:
+        json.dump(zapisi, f, ensure_ascii=False, indent=1)
+    return hes
+
+
+def sacuvajKolone(df, folder):
+    '''Čuva DataFrame kao kolonski keš: po jedan .npy fajl za svaku kolonu i meta.json sa tipovima.
+
+    Kategorijske kolone se čuvaju kao celobrojni kodovi (najmanji dovoljan tip), a kategorije u
+    meta.json. Keš se prvo upisuje u privremeni folder, pa se premešta, tako da nikada nije poluupisan.'''
+    roditelj = os.path.dirname(os.path.abspath(folder))
+    os.makedirs(roditelj, exist_ok=True)
+    privremeni = tempfile.mkdtemp(dir=roditelj)
+    meta = {'kolone': list(df.columns), 'redova': len(df), 'kategorije': {}}
+    for kol in df.columns:
+        vrednosti = df[kol]
+        if isinstance(vrednosti.dtype, pd.CategoricalDtype):
+            kategorije = vrednosti.cat.categories
+            tip = np.int8 if len(kategorije) < 127 else np.int16 if len(kategorije) < 32767 else np.int32
+            niz = vrednosti.cat.codes.to_numpy().astype(tip)
+            meta['kategorije'][kol] = {'vrednosti': kategorije.tolist(), 'uredjene': bool(vrednosti.cat.ordered)}
+        else:
+            niz = vrednosti.to_numpy()
+        np.save(os.path.join(privremeni, f'{kol}.npy'), niz, allow_pickle=False)
+    with open(os.path.join(privremeni, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    if os.path.isdir(folder):
+        shutil.rmtree(privremeni)
+    else:
+        os.replace(privremeni, folder)
+    return folder
+
+
+def folderKesa(putanja = TU, kes = KES):
+    '''Folder kolonskog keša za dati .dta fajl; keš se pravi pri prvom pozivu (i kada se izvor promeni).'''
+    folder = os.path.join(kes, f'{os.path.splitext(os.path.basename(putanja))[0]}-{_hesIzvora(putanja, kes)[:16]}')
+    if not os.path.isfile(os.path.join(folder, 'meta.json')):
+        sacuvajKolone(pd.read_stata(putanja), folder)
+    return folder
+
+
+def ucitajNizove(folder, kolone = None):
+    '''Kolone iz kolonskog keša kao memorijski mapirani nizovi (kategorijske kao kodovi).
+
+    Rezultat:
+    ----------
+    nizovi : dict[str, np.memmap]
+    meta : dict
+        Redosled kolona, broj redova i kategorije kategorijskih kolona.'''
+    with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    kolone = meta['kolone'] if kolone is None else list(kolone)
+    nepoznate = set(kolone) - set(meta['kolone'])
+    if nepoznate:
+        raise KeyError(f'Keš nema kolone: {sorted(nepoznate)}')
+    return {kol: np.load(os.path.join(folder, f'{kol}.npy'), mmap_mode='r') for kol in kolone}, meta
+
+
+def rasporedNizova(folder, kolone = None):
+    '''Položaj kolona kolonskog keša u fajlovima, bez mapiranja (za čitanje delova sa np.fromfile).
+
+    Rezultat:
+    ----------
+    raspored : dict[str, tuple[str, np.dtype, int]]
+        Putanja .npy fajla, tip elemenata i pomeraj prvog elementa u bajtovima.
+    meta : dict
+        Kao u ucitajNizove.'''
+    with open(os.path.join(folder, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    kolone = meta['kolone'] if kolone is None else list(kolone)
+    nepoznate = set(kolone) - set(meta['kolone'])
+    if nepoznate:
+        raise KeyError(f'Keš nema kolone: {sorted(nepoznate)}')
+    raspored = {}
+    for kol in kolone:
+        putanja = os.path.join(folder, f'{kol}.npy')
+        with open(putanja, 'rb') as f:
+            citaj = np.lib.format.read_array_header_1_0 if np.lib.format.read_magic(f) == (1, 0) else np.lib.format.read_array_header_2_0
+            _, _, tip = citaj(f)
+            raspored[kol] = (putanja, tip, f.tell())
+    return raspored, meta
+
+
+def ucitaj(putanja = TU, kolone = None, kes = KES):
+    '''Učitava LSMS podatke (podrazumevano TU.dta) iz kolonskog keša.
+
+    Pri prvom učitavanju .dta fajl se jednom parsira i pretvara u keš (folder .kes, ključ je heš
+    izvornog fajla); svako sledeće učitavanje samo mapira tražene kolone. Kolone region, zene, urban
+    i obr3 vraćaju se kao kategorijske (celobrojni kodovi), a numeričke kolone sa tipovima iz izvora.
+
+    Parametri:
+    ----------
+    putanja : str, opciono
+        Putanja do .dta fajla.
+    kolone : list[str], opciono
+        Kolone koje se učitavaju; podrazumevano sve.
+    kes : str, opciono
+        Folder za keš.
+
+    Rezultat:
+    ----------
+    pd.DataFrame'''
+    nizovi, meta = ucitajNizove(folderKesa(putanja, kes), kolone)
+    podaci = {}
+    for kol, niz in nizovi.items():
+        if kol in meta['kategorije']:
+            kat = meta['kategorije'][kol]
+            podaci[kol] = pd.Categorical.from_codes(niz, categories=kat['vrednosti'], ordered=kat['uredjene'])
+        else:
+            podaci[kol] = niz
+    return pd.DataFrame(podaci, copy=False)